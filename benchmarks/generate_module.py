@@ -0,0 +1,45 @@
+import argparse
+from pathlib import Path
+
+HEADER = '''"""Synthetic module generated for benchmarks"""
+
+import dataclasses
+import os
+from typing import Optional
+
+'''
+
+
+def generate_module(size: int) -> str:
+    """A module with `size` top-level definitions: classes, functions and values referencing each other"""
+    chunks = [HEADER]
+    for number in range(size):
+        kind = number % 4
+        if kind == 0:
+            chunks.append(f"\n\nVALUE_{number} = {{'key': {number}, 'path': os.sep}}\n")
+        elif kind == 1:
+            base = f"Klass{number - 4}" if number >= 5 else "object"
+            chunks.append(
+                f"\n\n# Comment for Klass{number}\n"
+                f"@dataclasses.dataclass\n"
+                f"class Klass{number}({base}):\n"
+                f"    value: Optional[int] = None\n\n"
+                f"    def method(self):\n"
+                f"        return VALUE_{number - 1}\n"
+            )
+        elif kind == 2:
+            chunks.append(
+                f'\n\ndef function_{number}(klass: Klass{number - 1}) -> dict:\n    """Docstring"""\n'
+                f"    return {{'value': klass.method(), 'other': VALUE_{number - 2}}}\n"
+            )
+        else:
+            chunks.append(f"\n\nasync def async_function_{number}():\n    return function_{number - 1}\n")
+    return "".join(chunks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic module for benchmarks")
+    parser.add_argument("size", type=int, help="Number of top-level definitions")
+    parser.add_argument("output_path", type=Path)
+    args = parser.parse_args()
+    args.output_path.write_text(generate_module(args.size))
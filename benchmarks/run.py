@@ -0,0 +1,222 @@
+"""Benchmark CodeSplitter on synthetic modules and compare the results with a committed baseline.
+
+python -m benchmarks.run                      # run and compare with benchmarks/baseline.json
+python -m benchmarks.run --update-baseline    # run and overwrite the baseline
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generate_module import generate_module
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# Differences smaller than this (in seconds) are noise, whatever the ratio
+MIN_TIME_DELTA = 0.05
+
+
+def _instrument(phases: dict, subprocesses: list) -> None:
+    """Attribute the wall time of each service to a phase. Nested calls are counted in the outermost phase"""
+    from src.backends.fast_import_git_backend import FastImportGitBackend
+    from src.backends.shell_git_backend import ShellGitBackend
+    from src.entities.split_plan import SplitPlan
+    from src.services.analyze_symbols_service import AnalyzeSymbolsService
+    from src.services.attach_import_statements_service import (
+        AttachImportStatementsService,
+    )
+    from src.services.commit_split_plan_service import CommitSplitPlanService
+    from src.services.load_file_service import LoadFileService
+    from src.services.move_blocks_to_new_files_service import (
+        MoveBlocksToNewFilesService,
+    )
+    from src.services.update_init_file_service import UpdateInitFileService
+
+    stack = []
+
+    def timed(phase, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if stack:
+                return function(*args, **kwargs)
+            stack.append(phase)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+                stack.pop()
+
+        return wrapper
+
+    for phase, cls, name in [
+        ("load", LoadFileService, "execute"),
+        ("analyze", AnalyzeSymbolsService, "execute"),
+        ("move", MoveBlocksToNewFilesService, "execute"),
+        ("init_update", UpdateInitFileService, "execute"),
+        ("import_attachment", AttachImportStatementsService, "execute"),
+        ("write", SplitPlan, "write"),
+        ("git", CommitSplitPlanService, "execute"),
+        ("git", FastImportGitBackend, "__init__"),
+        ("git", FastImportGitBackend, "create_branch"),
+        ("git", FastImportGitBackend, "close"),
+        ("git", ShellGitBackend, "__init__"),
+        ("git", ShellGitBackend, "create_branch"),
+    ]:
+        setattr(cls, name, timed(phase, getattr(cls, name)))
+
+    popen_init = subprocess.Popen.__init__
+
+    @functools.wraps(popen_init)
+    def counting_popen_init(self, *args, **kwargs):
+        subprocesses.append(args[0] if args else kwargs.get("args"))
+        popen_init(self, *args, **kwargs)
+
+    subprocess.Popen.__init__ = counting_popen_init
+
+
+def run_case(size: int, git_commit: bool, git_backend: str) -> dict:
+    """Split a generated module in a temporary git repository. Runs in a fresh process to measure its peak RSS"""
+    phases, subprocesses = {}, []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        Path("pkg").mkdir()
+        Path("pkg/models.py").write_text(generate_module(size))
+        if git_commit:
+            for command in ["init --quiet", "add .", "commit --quiet -m init"]:
+                subprocess.run(f"git {command}", shell=True, check=True)
+
+        from src.code_splitter import CodeSplitter
+        from src.types.git_backend_type import GitBackendType
+
+        _instrument(phases, subprocesses)
+        splitter = CodeSplitter(
+            original_file_path=Path("pkg/models.py"),
+            git_commit=git_commit,
+            target_block_types=["class", "function"],
+            git_backend_type=GitBackendType(git_backend),
+        )
+        start = time.perf_counter()
+        splitter.execute()
+        total = time.perf_counter() - start
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "wall_time": {"total": total, **phases},
+        "peak_rss_mib": max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+        "subprocess_count": len(subprocesses),
+    }
+
+
+def run_case_in_subprocess(size: int, git_commit: bool, git_backend: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent))
+    for key in ["AUTHOR", "COMMITTER"]:
+        env.setdefault(f"GIT_{key}_NAME", "benchmark")
+        env.setdefault(f"GIT_{key}_EMAIL", "benchmark@example.com")
+    command = [sys.executable, "-m", "benchmarks.run", "--case", str(size), "--git-backend", git_backend]
+    if git_commit:
+        command.append("--git")
+    result = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return json.loads(result.stdout.decode("utf-8").splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for case, result in results.items():
+        if case not in baseline:
+            continue
+        expected = baseline[case]
+        for phase, seconds in result["wall_time"].items():
+            baseline_seconds = expected["wall_time"].get(phase, 0.0)
+            if seconds > baseline_seconds * threshold and seconds - baseline_seconds > MIN_TIME_DELTA:
+                regressions.append(f"{case}: {phase} took {seconds:.3f}s (baseline {baseline_seconds:.3f}s)")
+        if result["peak_rss_mib"] > expected["peak_rss_mib"] * threshold:
+            regressions.append(
+                f"{case}: peak RSS {result['peak_rss_mib']:.1f}MiB (baseline {expected['peak_rss_mib']:.1f}MiB)"
+            )
+        if result["subprocess_count"] > expected["subprocess_count"]:
+            regressions.append(
+                f"{case}: {result['subprocess_count']} subprocesses (baseline {expected['subprocess_count']})"
+            )
+    return regressions
+
+
+def report(results: dict) -> None:
+    print(f"{'case':<24}{'total [s]':>10}{'us/def':>10}{'scaling':>9}{'RSS [MiB]':>11}{'procs':>7}  phases [s]")
+    previous = {}
+    for case, result in results.items():
+        size, mode = case.split("-", 1)
+        size = int(size)
+        total = result["wall_time"]["total"]
+        # Exponent of the growth of the total time since the previous size: 1.0 is linear, 2.0 is quadratic
+        scaling = ""
+        if mode in previous:
+            previous_size, previous_total = previous[mode]
+            scaling = f"{math.log(total / previous_total) / math.log(size / previous_size):.2f}"
+        previous[mode] = (size, total)
+        phases = " ".join(
+            f"{phase}={seconds:.3f}" for phase, seconds in result["wall_time"].items() if phase != "total"
+        )
+        print(
+            f"{case:<24}{total:>10.3f}{total / size * 1e6:>10.0f}{scaling:>9}"
+            f"{result['peak_rss_mib']:>11.1f}{result['subprocess_count']:>7}  {phases}"
+        )
+
+
+def _csv_to_sizes(value: str) -> list[int]:
+    return [int(size) for size in value.split(",") if size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark python-code-splitter on synthetic modules")
+    parser.add_argument("--sizes", type=_csv_to_sizes, default=[10, 100, 1000, 10000])
+    # NOTE: With --git every move is a commit of the whole remaining module, so the git cases are smaller by default
+    parser.add_argument("--git-sizes", type=_csv_to_sizes, default=[10, 100, 1000])
+    parser.add_argument("--git-backends", type=lambda value: value.split(","), default=["fast-import"])
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed ratio to the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--case", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--git", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--git-backend", default="fast-import", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        print(json.dumps(run_case(args.case, args.git, args.git_backend)))
+        return
+
+    results = {}
+    for size in args.sizes:
+        results[f"{size}-no-git"] = run_case_in_subprocess(size, git_commit=False, git_backend="fast-import")
+    for git_backend in args.git_backends:
+        for size in args.git_sizes:
+            results[f"{size}-git-{git_backend}"] = run_case_in_subprocess(
+                size, git_commit=True, git_backend=git_backend
+            )
+    report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}. Run with --update-baseline to create it.")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Round-trip every module of the interpreter through load, plan and render, and check that nothing is lost.
+
+python -m benchmarks.stress                       # the .py files of the stdlib and site-packages
+python -m benchmarks.stress path/to/dir --jobs 8  # the .py files under the given paths
+
+For each file, the blocks must add up to the original bytes exactly, every generated module must compile, and the
+package must bind the same public names as the original module. Files the interpreter itself can't compile are
+only checked for conservation.
+"""
+
+import argparse
+import ast
+import contextlib
+import io
+import os
+import sys
+import sysconfig
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src import instrumentation
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.sinks.memory_sink import MemorySink
+from src.types.block_type import BlockType
+from src.types.loader_type import LoaderType
+
+# Statements whose bodies bind names at the top level, e.g. `try: import x` or `if sys.platform == ...:`
+_CONDITIONAL_NODE_TYPES = tuple(getattr(ast, name) for name in ("If", "Try", "TryStar") if hasattr(ast, name))
+
+
+def default_roots() -> list[Path]:
+    paths = sysconfig.get_paths()
+    return [Path(paths[key]) for key in ("stdlib", "purelib", "platlib") if Path(paths[key]).is_dir()]
+
+
+def find_files(roots: Iterable[Path]) -> list[Path]:
+    """The .py files under the roots, each once even when the roots overlap"""
+    files = {}
+    for root in roots:
+        for path in [root] if root.is_file() else root.rglob("*.py"):
+            if path.is_file():
+                files.setdefault(path.resolve(), path)
+    return sorted(files.values())
+
+
+def _target_names(target: ast.expr) -> Iterable[str]:
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for element in target.elts:
+            yield from _target_names(element)
+    elif isinstance(target, ast.Starred):
+        yield from _target_names(target.value)
+
+
+def public_names(statements: list[ast.stmt]) -> set[str]:
+    """Names bound by the top-level statements, including those of conditional blocks, that don't start with _"""
+    names = set()
+    for node in statements:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(name for target in node.targets for name in _target_names(target))
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            names.update(_target_names(node.target))
+        elif isinstance(node, ast.Import):
+            names.update(alias.asname or alias.name.partition(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names.update(alias.asname or alias.name for alias in node.names if alias.name != "*")
+        elif hasattr(ast, "TypeAlias") and isinstance(node, ast.TypeAlias):
+            names.add(node.name.id)
+        elif isinstance(node, _CONDITIONAL_NODE_TYPES):
+            names |= public_names(node.body + node.orelse)
+            for handler in getattr(node, "handlers", []):
+                names |= public_names(handler.body)
+            names |= public_names(getattr(node, "finalbody", []))
+    return {name for name in names if not name.startswith("_")}
+
+
+def check_file(path: Path, loader_type: LoaderType, target_block_types: list[str]) -> dict:
+    """Split one file in memory. Return its size, the time the pipeline took, and why it failed or was skipped"""
+    result = {"path": str(path), "bytes": 0, "seconds": 0.0, "error": None, "skipped": None}
+    try:
+        data = path.read_bytes()
+    except OSError as e:
+        result["skipped"] = f"unreadable: {e}"
+        return result
+    result["bytes"] = len(data)
+    if not path.stem.isidentifier():
+        # Scripts like `python-config.py`, whose split modules couldn't import each other
+        result["skipped"] = "not a module name"
+        return result
+    try:
+        original_tree = ast.parse(data, filename=str(path))
+        compile(original_tree, str(path), "exec", dont_inherit=True)
+    except (SyntaxError, ValueError):
+        original_tree = None
+
+    # NOTE: The output only depends on the name of the module, not on where it is
+    module_path = Path("stress") / path.name
+    start = time.perf_counter()
+    try:
+        original_file = LoadFileService(file_path=module_path, loader_type=loader_type, source_data=data).execute()
+        load_end = time.perf_counter()
+        if b"".join(block.data for block in original_file.blocks) != data:
+            result["error"] = "the blocks don't add up to the original bytes"
+            return result
+        load_seconds = load_end - start
+        start = time.perf_counter()
+        plan = PlanSplitService(original_file=original_file, target_block_types=target_block_types).execute()
+        sink = MemorySink()
+        plan.write(sink)
+        result["seconds"] = load_seconds + time.perf_counter() - start
+    except Exception as e:
+        if original_tree is None:
+            result["skipped"] = f"not compilable by this interpreter, nor splittable: {e}"
+        else:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    if original_tree is None:
+        result["skipped"] = "not compilable by this interpreter"
+        return result
+    init_tree = None
+    for output_path, output_data in sink.files.items():
+        if output_path.suffix != ".py":
+            continue
+        try:
+            tree = ast.parse(output_data, filename=str(output_path))
+            compile(tree, str(output_path), "exec", dont_inherit=True)
+        except (SyntaxError, ValueError) as e:
+            result["error"] = f"{output_path} doesn't compile: {e}"
+            return result
+        if output_path == plan.init_file.path:
+            init_tree = tree
+    missing_names = public_names(original_tree.body) - public_names(init_tree.body)
+    if missing_names:
+        result["error"] = f"the package doesn't bind {', '.join(sorted(missing_names))}"
+    return result
+
+
+def check_shard(paths: list[Path], loader_type: LoaderType, target_block_types: list[str]) -> list[dict]:
+    # NOTE: Silence the warnings of the auto loader falling back to tokenize
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [check_file(path, loader_type, target_block_types) for path in paths]
+
+
+def run(
+    paths: list[Path],
+    jobs: Optional[int],
+    shard_size: int,
+    loader_type: LoaderType,
+    target_block_types: list[str],
+) -> list[dict]:
+    shards = [paths[index : index + shard_size] for index in range(0, len(paths), shard_size)]
+    if jobs == 1:
+        return [result for shard in shards for result in check_shard(shard, loader_type, target_block_types)]
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=instrumentation.clear_sinks) as executor:
+        futures = [executor.submit(check_shard, shard, loader_type, target_block_types) for shard in shards]
+        for done, future in enumerate(as_completed(futures), start=1):
+            results += future.result()
+            print(f"\r{done}/{len(shards)} shards", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return results
+
+
+def report(results: list[dict], wall_time: float, jobs: int, top: int) -> None:
+    checked = [result for result in results if not result["skipped"] and not result["error"]]
+    skipped = [result for result in results if result["skipped"]]
+    failed = [result for result in results if result["error"]]
+    total_bytes = sum(result["bytes"] for result in results)
+    pipeline_time = sum(result["seconds"] for result in results)
+    print(f"{len(results)} files, {total_bytes / 2**20:.1f} MiB in {wall_time:.1f}s with {jobs} jobs")
+    print(f"passed: {len(checked)}, skipped: {len(skipped)}, failed: {len(failed)}")
+    if pipeline_time:
+        print(
+            f"pipeline: {len(results) / pipeline_time:.0f} files/s, "
+            f"{total_bytes / 2**20 / pipeline_time:.2f} MiB/s per job, "
+            f"{pipeline_time / len(results) * 1e3:.2f} ms/file on average"
+        )
+    print(f"\n{'time [ms]':>10}{'size [KiB]':>12}{'MiB/s':>8}  slowest files")
+    for result in sorted(results, key=lambda result: result["seconds"], reverse=True)[:top]:
+        throughput = result["bytes"] / 2**20 / result["seconds"] if result["seconds"] else 0.0
+        print(f"{result['seconds'] * 1e3:>10.1f}{result['bytes'] / 1024:>12.1f}{throughput:>8.2f}  {result['path']}")
+    for result in skipped:
+        print(f"SKIPPED {result['path']}: {result['skipped']}")
+    for result in failed:
+        print(f"FAILED {result['path']}: {result['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split every module of the interpreter in memory and check the output")
+    parser.add_argument("paths", nargs="*", type=Path, help="Files or directories (default: stdlib and site-packages)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: the number of CPUs)")
+    parser.add_argument("--shard-size", type=int, default=32, help="Files sent to a worker at once")
+    parser.add_argument(
+        "--loader", choices=[loader_type.value for loader_type in LoaderType], default=LoaderType.AUTO.value
+    )
+    parser.add_argument(
+        "--targets", type=lambda value: value.split(","), default=[BlockType.CLASS.value, BlockType.FUNCTION.value]
+    )
+    parser.add_argument("--limit", type=int, default=0, help="Only check the first files")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest files to print")
+    args = parser.parse_args()
+
+    paths = find_files(args.paths or default_roots())
+    if args.limit:
+        paths = paths[: args.limit]
+    jobs = args.jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = run(paths, jobs, args.shard_size, LoaderType(args.loader), args.targets)
+    report(results, time.perf_counter() - start, jobs, args.top)
+    if any(result["error"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
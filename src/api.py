@@ -0,0 +1,92 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from src import instrumentation
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.sinks.memory_sink import MemorySink
+from src.types.block_type import BlockType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+
+DEFAULT_TARGETS = (BlockType.CLASS.value, BlockType.FUNCTION.value)
+
+
+def split_source(
+    source: Union[str, bytes],
+    module_path: Union[str, Path],
+    targets: Iterable[str] = DEFAULT_TARGETS,
+    loader: LoaderType = LoaderType.AUTO,
+    lazy_init: bool = False,
+    group: bool = False,
+    max_lines: int = 0,
+    max_modules: int = 0,
+    min_value_size: int = 0,
+    value_sidecars: bool = False,
+    layout: LayoutType = LayoutType.FLAT,
+    type_checking_imports: bool = False,
+) -> dict[str, str]:
+    """Split a module given as text (or bytes, honoring its coding cookie) as if it were at module_path.
+
+    The path is only used to name the output files and the modules they import from, so it must be relative to
+    the import root, e.g. `pkg/models.py`. Return the content of each output file by its POSIX path. The module itself
+    is replaced by the package, so it is not part of the result. Raise LoadFileService.ParseError on invalid sources.
+    """
+    file_path = Path(module_path)
+    if file_path.is_absolute() or file_path.suffix != ".py":
+        raise ValueError(f"Error: '{module_path}' must be a relative path to a .py file.")
+    source_data = source.encode("utf-8") if isinstance(source, str) else bytes(source)
+    original_file = LoadFileService(file_path=file_path, loader_type=loader, source_data=source_data).execute()
+    plan = PlanSplitService(
+        original_file=original_file,
+        target_block_types=list(targets),
+        lazy_init=lazy_init,
+        group=group,
+        max_lines=max_lines,
+        max_modules=max_modules,
+        min_value_size=min_value_size,
+        value_sidecars=value_sidecars,
+        layout_type=layout,
+        type_checking_imports=type_checking_imports,
+    ).execute()
+    sink = MemorySink()
+    plan.write(sink)
+    encoding = original_file.blocks[0].source.encoding if original_file.blocks else "utf-8"
+    return {path.as_posix(): data.decode(encoding) for path, data in sink.files.items()}
+
+
+def _split_item(item: tuple[Union[str, bytes], Union[str, Path]], options: dict) -> dict[str, str]:
+    source, module_path = item
+    return split_source(source, module_path, **options)
+
+
+def split_many(
+    items: Iterable[tuple[Union[str, bytes], Union[str, Path]]],
+    jobs: Optional[int] = 1,
+    **options,
+) -> Iterator[tuple[str, dict[str, str]]]:
+    """Split (source, module_path) pairs with the options of split_source, yielding (module_path, outputs) in order.
+
+    Items are consumed lazily. With jobs other than 1 (None for the number of CPUs), they are split in worker
+    processes, with a bounded number in flight so that memory doesn't grow with the length of the input.
+    """
+    if jobs == 1:
+        for item in items:
+            yield str(item[1]), _split_item(item, options)
+        return
+    workers = jobs or os.cpu_count() or 1
+    # NOTE: Enough work in flight to keep every worker busy while the caller consumes the results
+    window = 4 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=instrumentation.clear_sinks) as executor:
+        pending = deque()
+        for item in items:
+            pending.append((str(item[1]), executor.submit(_split_item, item, options)))
+            if len(pending) >= window:
+                module_path, future = pending.popleft()
+                yield module_path, future.result()
+        while pending:
+            module_path, future = pending.popleft()
+            yield module_path, future.result()
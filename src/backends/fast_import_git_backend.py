@@ -0,0 +1,96 @@
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+from src import instrumentation
+from src.backends.git_backend import GitBackend
+
+
+def _quote_path(path: str) -> str:
+    if path.startswith('"') or "\n" in path:
+        return '"' + path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return path
+
+
+class FastImportGitBackend(GitBackend):
+    """Stream the whole commit series into a single `git fast-import` session"""
+
+    class FastImportError(Exception):
+        pass
+
+    def __init__(self, work_tree_path: Optional[Path] = None):
+        super().__init__(work_tree_path)
+        self.branch_name: Optional[str] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.parent = self.git("rev-parse --verify HEAD").strip()
+        # The commit the index was read from, kept after self.parent is consumed by the first commit
+        self.start_commit = self.parent
+        self.author = self.git("var GIT_AUTHOR_IDENT").strip()
+        self.committer = self.git("var GIT_COMMITTER_IDENT").strip()
+
+    def create_branch(self, branch_name: str) -> None:
+        if self.git(f"branch --list {branch_name}").strip():
+            raise GitBackend.BranchExistsError(
+                f"Failed to create the branch: a branch named '{branch_name}' already exists."
+            )
+        self._start(branch_name)
+
+    def use_current_branch(self) -> None:
+        self._start(self.git("symbolic-ref --short HEAD").strip())
+
+    def _start(self, branch_name: str) -> None:
+        self.branch_name = branch_name
+        print("git fast-import --quiet --done")
+        self.started_at = time.perf_counter()
+        self.process = subprocess.Popen(
+            ["git", "fast-import", "--quiet", "--done"],
+            cwd=self.work_tree_path or self.top_level,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+
+    def _write(self, data: bytes) -> None:
+        try:
+            self.process.stdin.write(data)
+        except BrokenPipeError:
+            self._wait()
+            raise
+
+    def _write_data(self, data: bytes) -> None:
+        self._write(b"data %d\n" % len(data) + data + b"\n")
+
+    def commit(self, message: str, changes: dict[Path, Optional[bytes]]) -> None:
+        assert self.process, "Error: create_branch() must be called before commit()."
+        instrumentation.count_commit(changes)
+        # NOTE: `git commit -m` stores the message with a trailing newline
+        self._write(f"commit refs/heads/{self.branch_name}\n".encode("utf-8"))
+        self._write(f"author {self.author}\ncommitter {self.committer}\n".encode("utf-8"))
+        self._write_data(f"{message}\n".encode("utf-8"))
+        if self.parent:
+            self._write(f"from {self.parent}\n".encode("utf-8"))
+            self.parent = None
+        for path, data in changes.items():
+            if data is None:
+                self._write(f"D {_quote_path(self.git_path(path))}\n".encode("utf-8"))
+                continue
+            self._write(f"M 100644 inline {_quote_path(self.git_path(path))}\n".encode("utf-8"))
+            self._write_data(data)
+
+    def _wait(self) -> None:
+        _, stderr = self.process.communicate()
+        instrumentation.record_span("subprocess", time.perf_counter() - self.started_at)
+        if self.process.returncode != 0:
+            raise FastImportGitBackend.FastImportError(f"Failed to execute the command: git fast-import. {stderr=}")
+
+    def close(self) -> None:
+        if not self.process:
+            return
+        self._write(b"done\n")
+        self._wait()
+        # Switch to the new branch and update the index like `git checkout -b` would: only the entries that differ
+        # between the two commits change, so staged changes to other files are kept
+        self.git(f"symbolic-ref HEAD refs/heads/{self.branch_name}")
+        self.git(f"read-tree -m {self.start_commit} HEAD")
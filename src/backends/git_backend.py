@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from src.utils import git
+
+
+class GitBackend(ABC):
+    """Create a branch and record a series of commits from in-memory snapshots"""
+
+    class BranchExistsError(Exception):
+        pass
+
+    def __init__(self, work_tree_path: Optional[Path] = None):
+        # NOTE: Paths are relative to the current directory, while git runs in the work tree
+        # (the current one by default)
+        self.top_level = Path(git("rev-parse --show-toplevel").strip())
+        self.work_tree_path = work_tree_path
+
+    def git(self, sub_command: str, input: Optional[bytes] = None) -> str:
+        return git(sub_command, input=input, cwd=self.work_tree_path)
+
+    def git_path(self, path: Path) -> str:
+        # Convert a path to the repository-relative form expected by git plumbing commands
+        return path.resolve().relative_to(self.top_level).as_posix()
+
+    @abstractmethod
+    def create_branch(self, branch_name: str) -> None:
+        pass
+
+    def use_current_branch(self) -> None:
+        """Commit on top of the checked out branch instead of creating a new one"""
+
+    @abstractmethod
+    def commit(self, message: str, changes: dict[Path, Optional[bytes]]) -> None:
+        """Commit the new content of each path (None removes the path) on top of the previous commit"""
+
+    def close(self) -> None:
+        pass
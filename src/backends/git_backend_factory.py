@@ -0,0 +1,13 @@
+from pathlib import Path
+from typing import Optional
+
+from src.backends.fast_import_git_backend import FastImportGitBackend
+from src.backends.git_backend import GitBackend
+from src.backends.shell_git_backend import ShellGitBackend
+from src.types.git_backend_type import GitBackendType
+
+
+def create_git_backend(git_backend_type: GitBackendType, work_tree_path: Optional[Path] = None) -> GitBackend:
+    if git_backend_type == GitBackendType.SHELL:
+        return ShellGitBackend(work_tree_path)
+    return FastImportGitBackend(work_tree_path)
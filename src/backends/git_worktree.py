@@ -0,0 +1,69 @@
+import fcntl
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.backends.git_backend import GitBackend
+from src.utils import git
+
+# NOTE: flock() locks are held per open file, so this also serializes the threads of one process
+_thread_lock = threading.Lock()
+
+
+@contextmanager
+def ref_lock() -> Iterator[None]:
+    """Serialize the creation and removal of branches and worktrees, across threads and splitter processes.
+    git locks each ref on its own, but `worktree add -b` updates several files that concurrent runs would race on"""
+    lock_path = Path(git("rev-parse --git-common-dir").strip()).resolve() / "split-refs.lock"
+    with _thread_lock, open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class GitWorktree:
+    """A temporary worktree with a new branch checked out at HEAD, so that a split can be committed without touching
+    the current checkout. Removed on exit, along with the branch when the block failed"""
+
+    def __init__(self, branch_name: str):
+        self.branch_name = branch_name
+        self.temp_dir_path: Optional[Path] = None
+        self.path: Optional[Path] = None
+
+    def __enter__(self) -> "GitWorktree":
+        self.temp_dir_path = Path(tempfile.mkdtemp(prefix="split-worktree-"))
+        self.path = self.temp_dir_path / "tree"
+        try:
+            with ref_lock():
+                if git(f"branch --list {self.branch_name}").strip():
+                    raise GitBackend.BranchExistsError(
+                        f"Failed to create the branch: a branch named '{self.branch_name}' already exists."
+                    )
+                # NOTE: Nothing is checked out: the commits are made from in-memory snapshots through the index alone
+                git(f"worktree add --quiet --no-checkout -b {self.branch_name} {self.path} HEAD")
+        except BaseException:
+            shutil.rmtree(self.temp_dir_path, ignore_errors=True)
+            raise
+        try:
+            git("read-tree HEAD", cwd=self.path)
+        except BaseException:
+            self._remove(keep_branch=False)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._remove(keep_branch=exc_type is None)
+
+    def _remove(self, keep_branch: bool) -> None:
+        try:
+            with ref_lock():
+                git(f"worktree remove --force {self.path}")
+                if not keep_branch:
+                    git(f"branch -D {self.branch_name}")
+        finally:
+            shutil.rmtree(self.temp_dir_path, ignore_errors=True)
@@ -0,0 +1,19 @@
+from pathlib import Path
+from typing import Optional
+
+from src import instrumentation
+from src.backends.git_backend import GitBackend
+from src.utils import git_stage
+
+
+class ShellGitBackend(GitBackend):
+    """Run one git command per staged file and per commit"""
+
+    def create_branch(self, branch_name: str) -> None:
+        self.git(f"checkout -b {branch_name}")
+
+    def commit(self, message: str, changes: dict[Path, Optional[bytes]]) -> None:
+        instrumentation.count_commit(changes)
+        for path, data in changes.items():
+            git_stage(self.git_path(path), data, cwd=self.work_tree_path)
+        self.git(f'commit -m "{message}"')
@@ -1,15 +1,23 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 
-from src.entities.block import Block
-from src.entities.file import File
-from src.services.attach_import_statements_service import AttachImportStatementsService
-from src.services.load_file_service import LoadFileService
-from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
-from src.services.update_init_file_service import UpdateInitFileService
+from src import instrumentation
+from src.entities.import_time_report import ImportTimeReport
+from src.entities.plan_manifest import PlanManifest
+from src.instrumentation import instrumented
+from src.plan_cache import PlanCache
+from src.services.apply_split_plans_service import ApplySplitPlansService
+from src.services.build_import_index_service import BuildImportIndexService
+from src.services.measure_import_time_service import MeasureImportTimeService
+from src.services.plan_file_service import PlanFileService
+from src.services.write_plan_manifest_service import WritePlanManifestService
+from src.sinks.output_sink import OutputSink
 from src.types.block_type import BlockType
-from src.utils import git
+from src.types.git_backend_type import GitBackendType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+from src.utils import to_branch_name, to_module_name
 
 
 @dataclass(frozen=True)
@@ -17,53 +25,108 @@ class CodeSplitter:
     original_file_path: Path
     git_commit: bool
     target_block_types: Literal[BlockType.CLASS, BlockType.FUNCTION]
+    git_backend_type: GitBackendType = GitBackendType.FAST_IMPORT
+    loader_type: LoaderType = LoaderType.AUTO
+    cache: Optional[PlanCache] = None
+    # Where the output files go. The working tree by default
+    sink: Optional[OutputSink] = None
+    # Write the plan to this JSON file instead of applying it
+    plan_output_path: Optional[Path] = None
+    # Also rewrite `from <module> import <name>` statements of the other files under the current directory
+    rewrite_importers: bool = False
+    # Check that the generated modules compile and import before committing anything, and maybe write their .pyc
+    verify: bool = False
+    write_bytecode: bool = False
+    # Commit on a new branch in a temporary worktree instead of checking it out, without writing the output files
+    worktree: bool = False
+    # Import the moved names in __init__.py on first access
+    lazy_init: bool = False
+    # Group mutually dependent blocks into shared modules, and pack the rest under the budgets (0 for no limit)
+    group: bool = False
+    max_lines: int = 0
+    max_modules: int = 0
+    # Leave the values smaller than this many bytes in __init__.py, and store the moved plain data in JSON files
+    min_value_size: int = 0
+    value_sidecars: bool = False
+    # How the modules are placed in the new package
+    layout_type: LayoutType = LayoutType.FLAT
+    # Import the names only annotations use under `if TYPE_CHECKING:`
+    type_checking_imports: bool = False
+    # Compare the median import time of the module before and after the split over this many runs. 0 to skip
+    measure_import: int = 0
+    # Fail when the package imports slower than the original module by more than this many percent
+    import_tolerance: float = 0.0
 
+    @instrumented
     def execute(self):
-        # 1. Load the target file
-        original_file: File = LoadFileService(file_path=self.original_file_path).execute()
+        # 1. Load the target file and plan the whole split in memory
+        with instrumentation.span("CodeSplitter.plan"):
+            plan = PlanFileService(
+                file_path=self.original_file_path,
+                target_block_types=self.target_block_types,
+                loader_type=self.loader_type,
+                cache=self.cache,
+                lazy_init=self.lazy_init,
+                group=self.group,
+                max_lines=self.max_lines,
+                max_modules=self.max_modules,
+                min_value_size=self.min_value_size,
+                value_sidecars=self.value_sidecars,
+                layout_type=self.layout_type,
+                type_checking_imports=self.type_checking_imports,
+            ).execute()
+            if self.cache:
+                self.cache.evict()
+        branch_name = to_branch_name(self.original_file_path)
 
-        # 2 Create new git branch
-        if self.git_commit:
-            branch_name = "split/" + str(self.original_file_path).replace("/", "_").replace(".py", "")
-            git(f"checkout -b {branch_name}")
+        # 2. Dry run: only write the plan manifest
+        if self.plan_output_path:
+            with instrumentation.span("CodeSplitter.write_manifest"):
+                manifest = PlanManifest(branch_name=branch_name, plans=[plan])
+                WritePlanManifestService(manifest_path=self.plan_output_path, manifest=manifest).execute()
+            return
 
-        # 3. Move class and function definitions from the original file to new files one by one
-        def git_commit_for_each_move(new_file: File, old_file: File, block: Block):
-            if self.git_commit:
-                # NOTE: Committed temporarily to avoid creating diffs for reviewers
-                git(f"add {new_file.path} {old_file.path}")
-                git(f'commit -m "[Auto] Move {block.type} {block.name} to {new_file.path}."')
+        # 3. Find the files importing from the original module
+        import_index = None
+        if self.rewrite_importers:
+            with instrumentation.span("CodeSplitter.index_imports"):
+                import_index = BuildImportIndexService(root_path=Path("."), cache=self.cache).execute()
 
-        original_file, moved_files = MoveBlocksToNewFilesService(
-            original_file=original_file,
-            target_block_types=self.target_block_types,
-            handler_for_each_move=git_commit_for_each_move,
-        ).execute()
+        # 4. Measure the import time of the original module while it still exists
+        module_name = to_module_name(self.original_file_path)
+        before_runs = None
+        if self.measure_import:
+            assert self.sink is None, "Error: Measuring the import time needs the output files in the working tree."
+            with instrumentation.span("CodeSplitter.measure_import"):
+                before_runs = MeasureImportTimeService(module_name=module_name, repeat=self.measure_import).execute()
 
-        # 4. Move the original file to __init__.py
-        init_file_path = original_file.path.parent / original_file.path.stem / "__init__.py"
-        git(f"mv {original_file.path} {init_file_path}")
-        if self.git_commit:
-            git(f"add {init_file_path}")
-            git(f'commit -m "[Auto] git mv {original_file.path} {init_file_path}"')
-        init_file = File(path=init_file_path, blocks=original_file.blocks)
+        # 5. Commit the planned snapshots to a new git branch, and write every output file exactly once
+        with instrumentation.span("CodeSplitter.apply"):
+            ApplySplitPlansService(
+                plans=[plan],
+                git_commit=self.git_commit,
+                branch_name=branch_name,
+                git_backend_type=self.git_backend_type,
+                sink=self.sink,
+                import_index=import_index,
+                verify=self.verify,
+                write_bytecode=self.write_bytecode,
+                worktree=self.worktree,
+            ).execute()
 
-        # 5. Attach import statements for moved files to the __init__.py file
-        ## sort by block type and block name
-        moved_files = sorted(moved_files, key=lambda file: (file.blocks[0].type.value, file.blocks[0].name))
-        UpdateInitFileService(
-            init_file=init_file,
-            moved_files=moved_files,
-        ).execute()
-        if self.git_commit:
-            git(f"add {init_file.path}")
-            git(f'commit -m "[Auto] Attached import statements for moved files to {init_file.path}."')
-
-        # 6. Attache import statements to each file
-        AttachImportStatementsService(
-            moved_files=moved_files,
-            init_file=init_file,
-        ).execute()
-        if self.git_commit:
-            git(f"add {init_file_path.parent}")
-            git(f'commit -m "[Auto] Attached import statements for the moved files to {init_file.path.parent}."')
+        # 6. Import the package that replaced it, and compare
+        if before_runs is not None:
+            with instrumentation.span("CodeSplitter.measure_import"):
+                after_runs = MeasureImportTimeService(module_name=module_name, repeat=self.measure_import).execute()
+            report = ImportTimeReport(
+                module_name=module_name,
+                before_runs=before_runs,
+                after_runs=after_runs,
+                tolerance=self.import_tolerance,
+            )
+            print(report.format())
+            if report.is_regression:
+                raise ImportTimeReport.RegressionError(
+                    f"Error: Importing {module_name} got {report.change:.1f}% slower "
+                    f"(tolerance {self.import_tolerance:.1f}%)."
+                )
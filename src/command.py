@@ -1,6 +1,10 @@
 import argparse
 from pathlib import Path
 
+from src.types.git_backend_type import GitBackendType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+
 
 def _csv_to_list(value):
     return value.split(",")
@@ -8,8 +12,150 @@ def _csv_to_list(value):
 
 def get_args():
     parser = argparse.ArgumentParser(description="Python Code Splitter")
-    parser.add_argument("file_path", type=Path, help="Path to the Python file to split")
+    parser.add_argument(
+        "file_path",
+        type=Path,
+        nargs="?",
+        help="Path to the Python file to split, or to a directory with --recursive",
+    )
+    parser.add_argument(
+        "--plan", type=Path, default=None, help="Write the split plan to this JSON file instead of applying it"
+    )
+    parser.add_argument("--apply", type=Path, default=None, help="Apply a split plan written by --plan")
+    parser.add_argument(
+        "--resync",
+        action="store_true",
+        help="Update a package split from file_path before with a newer version of file_path, "
+        "rewriting changed modules",
+    )
+    parser.add_argument(
+        "--rewrite-importers",
+        action="store_true",
+        help="Also make the other files under the current directory import the moved names from the new modules",
+    )
+    parser.add_argument(
+        "--lazy-init",
+        action="store_true",
+        help="Import the moved names in __init__.py on first access (PEP 562) instead of at import time",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compile and import every generated module in isolated interpreters before committing or writing anything",
+    )
+    parser.add_argument(
+        "--write-bytecode",
+        action="store_true",
+        help="With --verify, also write the compiled .pyc files of the generated modules",
+    )
+    parser.add_argument(
+        "--group",
+        action="store_true",
+        help="Put mutually dependent classes and functions in one module instead of one module each",
+    )
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        default=0,
+        help="With --group, also pack neighbouring groups into modules of up to this many lines",
+    )
+    parser.add_argument(
+        "--max-modules",
+        type=int,
+        default=0,
+        help="With --group, also pack neighbouring groups into at most this many modules",
+    )
+    parser.add_argument(
+        "--type-checking-imports",
+        action="store_true",
+        help="Import the names the moved code only uses in annotations that are never evaluated under "
+        "`if TYPE_CHECKING:`, to break import cycles. Don't use it with libraries that evaluate annotations at runtime",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=[layout_type.value for layout_type in LayoutType],
+        default=LayoutType.FLAT.value,
+        help="Where the modules go in the new package: all together, in subpackages named after the first two "
+        "letters of their names, or in a subpackage per block type, to keep directories small",
+    )
+    parser.add_argument(
+        "--min-value-size",
+        type=int,
+        default=0,
+        metavar="BYTES",
+        help="With --targets value, leave the assignments smaller than this many bytes in __init__.py",
+    )
+    parser.add_argument(
+        "--value-sidecars",
+        action="store_true",
+        help="With --targets value, store the moved values that are plain JSON data (dicts with str keys, lists, "
+        "strings, numbers...) in .json files next to their modules, loaded on first access. Declare the .json files as "
+        "package data, e.g. setuptools package-data, so that they are shipped with the package",
+    )
+    parser.add_argument(
+        "--measure-import",
+        type=int,
+        default=0,
+        metavar="RUNS",
+        help="Import the module before and after the split in this many fresh interpreters, and compare the medians",
+    )
+    parser.add_argument(
+        "--import-tolerance",
+        type=float,
+        default=0.0,
+        metavar="PERCENT",
+        help="Exit with an error when the split package imports slower than this with --measure-import (default: 0)",
+    )
+    parser.add_argument("--recursive", action="store_true", help="Split every Python file under the directory")
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Number of worker processes for --recursive (default: number of CPUs)"
+    )
+    parser.add_argument("--min-lines", type=int, default=0, help="Skip files with fewer lines with --recursive")
+    parser.add_argument(
+        "--min-size", type=int, default=0, help="Skip files smaller than this many bytes with --recursive"
+    )
+    parser.add_argument(
+        "--loader",
+        choices=[loader_type.value for loader_type in LoaderType],
+        default=LoaderType.AUTO.value,
+        help="How top-level statements are found: with the ast module, by streaming tokens, or automatically by size",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the plan cache")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Directory of the plan cache")
+    parser.add_argument(
+        "--cache-size", type=int, default=256, help="Size of the plan cache in MiB (least recently used first out)"
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Write the duration of each phase and the I/O counters to this JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        help="Write a cProfile dump, a tracemalloc snapshot and the report to this directory",
+    )
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        default=None,
+        help="Write the output files to this tar or zip archive instead of the working tree",
+    )
     parser.add_argument("--git", action="store_true", help="Enable git commit")
+    parser.add_argument(
+        "--git-backend",
+        choices=[backend_type.value for backend_type in GitBackendType],
+        default=GitBackendType.FAST_IMPORT.value,
+        help="How commits are created: one `git fast-import` session, or one shell command per git operation",
+    )
+    parser.add_argument(
+        "--worktree",
+        action="store_true",
+        help="With --git, commit each file on its own branch in a temporary git worktree, several at once, "
+        "leaving the current checkout untouched",
+    )
     parser.add_argument(
         "--targets",
         type=_csv_to_list,
@@ -17,4 +163,43 @@ def get_args():
         help="Target block types to split (comma-separated values)",
     )
     args = parser.parse_args()
+    if (args.file_path is None) == (args.apply is None):
+        parser.error("either file_path or --apply is required")
+    if args.resync and (args.recursive or args.plan or args.apply):
+        parser.error("--resync can't be combined with --recursive, --plan or --apply")
+    if args.archive and args.git:
+        parser.error("--archive can't be combined with --git")
+    if args.write_bytecode and not args.verify:
+        parser.error("--write-bytecode requires --verify")
+    if args.verify and args.resync:
+        parser.error("--verify can't be combined with --resync")
+    if (args.max_lines or args.max_modules) and not args.group:
+        parser.error("--max-lines and --max-modules require --group")
+    if (args.min_value_size or args.value_sidecars) and "value" not in args.targets:
+        parser.error("--min-value-size and --value-sidecars require --targets value")
+    if args.measure_import and (args.recursive or args.plan or args.apply or args.resync or args.archive):
+        parser.error("--measure-import can't be combined with --recursive, --plan, --apply, --resync or --archive")
+    if args.worktree and not args.git:
+        parser.error("--worktree requires --git")
+    if args.worktree and (args.plan or args.resync or args.write_bytecode or args.measure_import):
+        parser.error("--worktree can't be combined with --plan, --resync, --write-bytecode or --measure-import")
     return args
+
+
+def get_serve_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python-code-splitter serve",
+        description="Answer JSON-RPC 2.0 requests (one JSON object per line) to plan and apply splits, "
+        "keeping the plans in memory between requests",
+    )
+    parser.add_argument("--socket", type=Path, default=None, help="Listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=None, help="Number of requests handled at once")
+    parser.add_argument(
+        "--memory-size", type=int, default=256, help="Estimated size of the plans kept in memory in MiB"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the plan cache")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Directory of the plan cache")
+    parser.add_argument(
+        "--cache-size", type=int, default=256, help="Size of the plan cache in MiB (least recently used first out)"
+    )
+    return parser.parse_args(argv)
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src import instrumentation
+from src.entities.plan_manifest import PlanManifest
+from src.entities.split_plan import SplitPlan
+from src.instrumentation import instrumented
+from src.plan_cache import PlanCache
+from src.services.apply_split_plans_service import ApplySplitPlansService
+from src.services.build_import_index_service import BuildImportIndexService
+from src.services.load_file_service import LoadFileService
+from src.services.plan_file_service import PlanFileService
+from src.services.write_plan_manifest_service import WritePlanManifestService
+from src.sinks.output_sink import OutputSink
+from src.types.block_type import BlockType
+from src.types.git_backend_type import GitBackendType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+
+
+def plan_file(file_path: Path, min_lines: int = 0, **options) -> tuple[Optional[SplitPlan], Optional[str]]:
+    """Load and plan a single file with the options of PlanFileService. Runs in a worker process, so it must not
+    touch the output files or git. Return the plan, or None and why the file couldn't be parsed"""
+    try:
+        plan = PlanFileService(file_path=file_path, **options).execute()
+    except LoadFileService.ParseError as e:
+        return None, str(e)
+    if sum(block.line_count for block in plan.original_file.blocks) < min_lines or not plan.moved_files:
+        return None, None
+    return plan, None
+
+
+def _plan_file_in_worker(
+    file_path: Path, **options
+) -> tuple[tuple[Optional[SplitPlan], Optional[str]], instrumentation.Report]:
+    # Measure the worker's share of the run, so the parent can merge it into its own sinks
+    with instrumentation.collect() as report:
+        return plan_file(file_path, **options), report
+
+
+def _replay_reports(
+    results: Iterator[tuple[tuple[Optional[SplitPlan], Optional[str]], instrumentation.Report]],
+) -> Iterator[tuple[Optional[SplitPlan], Optional[str]]]:
+    for result, report in results:
+        report.replay()
+        yield result
+
+
+@dataclass(frozen=True)
+class DirectorySplitter:
+    class UnparsedFilesError(Exception):
+        pass
+
+    dir_path: Path
+    git_commit: bool
+    target_block_types: list[BlockType]
+    git_backend_type: GitBackendType = GitBackendType.FAST_IMPORT
+    loader_type: LoaderType = LoaderType.AUTO
+    cache: Optional[PlanCache] = None
+    # Where the output files go. The working tree by default
+    sink: Optional[OutputSink] = None
+    # Number of worker processes. None means the number of CPUs
+    jobs: Optional[int] = None
+    min_lines: int = 0
+    min_size: int = 0
+    # Write the plans to this JSON file instead of applying them
+    plan_output_path: Optional[Path] = None
+    # Also rewrite `from <module> import <name>` statements of the other files under the current directory
+    rewrite_importers: bool = False
+    # Check that the generated modules compile and import before committing anything, and maybe write their .pyc
+    verify: bool = False
+    write_bytecode: bool = False
+    # Commit each file on its own branch in a temporary worktree, several at once, without writing the output files
+    worktree: bool = False
+    # Import the moved names in __init__.py on first access
+    lazy_init: bool = False
+    # Group mutually dependent blocks into shared modules, and pack the rest under the budgets (0 for no limit)
+    group: bool = False
+    max_lines: int = 0
+    max_modules: int = 0
+    # Leave the values smaller than this many bytes in __init__.py, and store the moved plain data in JSON files
+    min_value_size: int = 0
+    value_sidecars: bool = False
+    # How the modules are placed in the new packages
+    layout_type: LayoutType = LayoutType.FLAT
+    # Import the names only annotations use under `if TYPE_CHECKING:`
+    type_checking_imports: bool = False
+
+    def find_file_paths(self) -> list[Path]:
+        file_paths = []
+        for file_path in sorted(self.dir_path.rglob("*.py")):
+            if any(part.startswith(".") for part in file_path.relative_to(self.dir_path).parts):
+                continue
+            # NOTE: A package's __init__.py can't be split, and neither can a module whose package already exists
+            if file_path.name == "__init__.py" or file_path.with_suffix("").exists():
+                continue
+            if file_path.stat().st_size < self.min_size:
+                continue
+            file_paths.append(file_path)
+        return file_paths
+
+    def _plan_options(self) -> dict:
+        """The options of plan_file, the same for every file"""
+        return {
+            "min_lines": self.min_lines,
+            "target_block_types": self.target_block_types,
+            "loader_type": self.loader_type,
+            "cache": self.cache,
+            "lazy_init": self.lazy_init,
+            "group": self.group,
+            "max_lines": self.max_lines,
+            "max_modules": self.max_modules,
+            "min_value_size": self.min_value_size,
+            "value_sidecars": self.value_sidecars,
+            "layout_type": self.layout_type,
+            "type_checking_imports": self.type_checking_imports,
+        }
+
+    def _plan_results(self, file_paths: list[Path]) -> Iterator[tuple[Optional[SplitPlan], Optional[str]]]:
+        # Parse and plan each file in a worker process. Results are yielded in the order of file_paths
+        if self.jobs == 1:
+            yield from map(partial(plan_file, **self._plan_options()), file_paths)
+            return
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=instrumentation.clear_sinks) as executor:
+            worker = partial(_plan_file_in_worker, **self._plan_options())
+            yield from _replay_reports(executor.map(worker, file_paths, chunksize=4))
+
+    def plan(self, file_paths: list[Path], parse_errors: list[str]) -> Iterator[Optional[SplitPlan]]:
+        """Plan the files in order. Those that can't be parsed are skipped, and why is added to parse_errors"""
+        for plan, parse_error in self._plan_results(file_paths):
+            if parse_error is not None:
+                print(parse_error)
+                parse_errors.append(parse_error)
+            yield plan
+
+    @instrumented
+    def execute(self):
+        # 1. Find the target files
+        file_paths = self.find_file_paths()
+        branch_name = "split/" + ("_".join(self.dir_path.parts) or Path.cwd().name)
+
+        # 2. Plan the files in parallel
+        parse_errors = []
+        plans = (plan for plan in self.plan(file_paths, parse_errors) if plan is not None)
+
+        # 3. Dry run: only write the plan manifest
+        if self.plan_output_path:
+            manifest = PlanManifest(branch_name=branch_name, plans=list(plans))
+            WritePlanManifestService(manifest_path=self.plan_output_path, manifest=manifest).execute()
+        else:
+            # 4. Find the files importing from the original modules
+            import_index = None
+            if self.rewrite_importers:
+                import_index = BuildImportIndexService(root_path=Path("."), cache=self.cache, jobs=self.jobs).execute()
+
+            # 5. Commit and write the plans one by one in a deterministic order
+            ApplySplitPlansService(
+                plans=plans,
+                git_commit=self.git_commit,
+                branch_name=branch_name,
+                git_backend_type=self.git_backend_type,
+                sink=self.sink,
+                import_index=import_index,
+                verify=self.verify,
+                write_bytecode=self.write_bytecode,
+                jobs=self.jobs,
+                worktree=self.worktree,
+            ).execute()
+
+        if self.cache:
+            self.cache.evict()
+        # NOTE: One file that can't be parsed doesn't stop the others from being split
+        if parse_errors:
+            raise DirectorySplitter.UnparsedFilesError(
+                f"Error: Failed to parse {len(parse_errors)} of {len(file_paths)} files:\n" + "\n".join(parse_errors)
+            )
@@ -1,18 +1,73 @@
+import keyword
 from dataclasses import dataclass
 
+from src.entities.source import Source
 from src.types.block_type import BlockType
 from src.types.lines import Lines
 from src.utils import to_snake_case
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Block:
+    """Lines [start, end) of a shared source buffer"""
+
+    __slots__ = ("type", "name", "source", "start", "end")
+
     type: BlockType
     name: str
-    lines: Lines
+    source: Source
+    start: int
+    end: int
+
+    @classmethod
+    def from_lines(cls, type: BlockType, name: str, lines: Lines) -> "Block":
+        """Create a block that owns its own (generated) content"""
+        source = Source.from_text("".join(lines))
+        return cls(type=type, name=name, source=source, start=0, end=source.line_count)
+
+    def __reduce__(self):
+        return Block, (self.type, self.name, self.source, self.start, self.end)
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return NotImplemented
+        if (self.type, self.name, self.line_count) != (other.type, other.name, other.line_count):
+            return False
+        if self.source is other.source and self.start == other.start:
+            return True
+        if self.source.encoding == other.source.encoding:
+            return self.data == other.data
+        return self.text == other.text
+
+    def __hash__(self):
+        # NOTE: Equal blocks have the same number of lines and the same first line, so the rest doesn't need to be
+        #       hashed. The first line tells apart the many one-line statements of a module, named "other" alike
+        first_line = self.source.text(self.start, min(self.start + 1, self.end))
+        return hash((self.type, self.name, self.line_count, first_line))
+
+    def __repr__(self):
+        return f"Block(type={self.type}, name={self.name!r}, lines={self.lines!r})"
+
+    @property
+    def line_count(self) -> int:
+        return self.end - self.start
+
+    @property
+    def data(self) -> memoryview:
+        return self.source.slice(self.start, self.end)
+
+    @property
+    def text(self) -> str:
+        return self.source.text(self.start, self.end)
+
+    @property
+    def lines(self) -> Lines:
+        return self.source.lines(self.start, self.end)
 
     @property
     def file_name(self):
-        if self.type == BlockType.CLASS:
-            return f"{to_snake_case(self.name)}.py"
-        return f"{self.name}.py"
+        module_name = to_snake_case(self.name) if self.type == BlockType.CLASS else self.name
+        # NOTE: `class And` can't be imported from `and.py`, and `def __init__` must not replace the package itself
+        if keyword.iskeyword(module_name) or module_name == "__init__":
+            module_name += "_"
+        return f"{module_name}.py"
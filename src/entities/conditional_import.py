@@ -0,0 +1,27 @@
+import re
+from dataclasses import dataclass
+
+_RELATIVE_FROM = re.compile(r"^(\s*from\s+)(?=\.)", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class ConditionalImport:
+    """A name bound by an `if TYPE_CHECKING:` or `try: import ...` block of the original file. The files using it get
+    a copy of the whole block, so that they bind it the same way"""
+
+    # Position of the block among all imports of the original file, shared by the names it binds
+    position: int
+    bound_name: str
+    # The statement, without the comments before it
+    text: str
+    # Names the block itself needs, e.g. TYPE_CHECKING
+    uses: frozenset[str]
+
+    is_future = False
+    is_star = False
+
+    def statement(self, level_offset: int = 0) -> str:
+        """The block, with its relative imports adjusted for a file moved `level_offset` packages deeper"""
+        if not level_offset:
+            return self.text
+        return _RELATIVE_FROM.sub(lambda match: match.group(1) + "." * level_offset, self.text)
@@ -2,14 +2,33 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from src.entities.block import Block
+from src.sinks.output_sink import OutputSink
 
 
 @dataclass(frozen=True)
 class File:
+    __slots__ = ("path", "blocks")
+
     path: Path
     blocks: list[Block]
 
-    def write(self):
-        with self.path.open(mode="w") as f:
-            for block in self.blocks:
-                f.writelines(block.lines)
+    def __reduce__(self):
+        return File, (self.path, self.blocks)
+
+    def render(self) -> str:
+        return "".join(block.text for block in self.blocks)
+
+    def render_bytes(self) -> bytes:
+        blocks = self.blocks
+        if blocks and blocks[0].start == 0 and blocks[-1].end == blocks[0].source.line_count:
+            source = blocks[0].source
+            if all(
+                block.source is source and block.end == next_block.start
+                for block, next_block in zip(blocks, blocks[1:])
+            ):
+                # NOTE: The file is the whole source buffer, so no copy is needed
+                return source.data
+        return b"".join(block.data for block in blocks)
+
+    def write(self, sink: OutputSink):
+        sink.write(self.path, self.render_bytes())
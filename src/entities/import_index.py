@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ImportIndex:
+    """The files of a source tree that import names from each module"""
+
+    # Absolute module name -> files with a `from <module> import ...` statement (relative imports are resolved)
+    # NOTE: Kept as strings, since building 100k Path objects costs more than the rest of a warm run
+    importer_paths: dict[str, list[str]]
+
+    def importers(self, module: str) -> list[Path]:
+        return [Path(path) for path in self.importer_paths.get(module, [])]
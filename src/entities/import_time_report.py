@@ -0,0 +1,92 @@
+import statistics
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    """One line of `python -X importtime`, in microseconds"""
+
+    self_us: int
+    cumulative_us: int
+    # The module whose import triggered this one. None for the top-level imports
+    parent: Optional[str]
+
+
+# Module name -> its import time, for one interpreter run
+ImportRun = dict[str, ImportTime]
+
+
+@dataclass(frozen=True)
+class ImportTimeReport:
+    """Compare the import time of a module before the split with that of the package it was split into"""
+
+    class RegressionError(Exception):
+        pass
+
+    module_name: str
+    before_runs: list[ImportRun]
+    after_runs: list[ImportRun]
+    # Allowed slowdown of the package, in percent of the original import time
+    tolerance: float = 0.0
+
+    @staticmethod
+    def median(runs: list[ImportRun], name: str, self_time: bool = False) -> float:
+        return statistics.median(
+            run[name].self_us if self_time else run[name].cumulative_us for run in runs if name in run
+        )
+
+    @property
+    def before_us(self) -> float:
+        return self.median(self.before_runs, self.module_name)
+
+    @property
+    def after_us(self) -> float:
+        return self.median(self.after_runs, self.module_name)
+
+    @property
+    def change(self) -> float:
+        """Change of the import time in percent. Negative when the package is faster"""
+        return (self.after_us - self.before_us) / self.before_us * 100 if self.before_us else 0.0
+
+    @property
+    def is_regression(self) -> bool:
+        return self.change > self.tolerance
+
+    def offenders(self, count: int = 10) -> list[tuple[str, float, float, Optional[tuple[str, float]]]]:
+        """The slowest generated submodules: (name, cumulative, self, slowest import triggered by it)"""
+        prefix = self.module_name + "."
+        names = {name for run in self.after_runs for name in run if name.startswith(prefix)}
+        offenders = []
+        for name in names:
+            children = {child for run in self.after_runs for child, time in run.items() if time.parent == name}
+            slowest_child = max(
+                ((child, self.median(self.after_runs, child)) for child in children),
+                key=lambda item: item[1],
+                default=None,
+            )
+            offenders.append(
+                (
+                    name,
+                    self.median(self.after_runs, name),
+                    self.median(self.after_runs, name, self_time=True),
+                    slowest_child,
+                )
+            )
+        return sorted(offenders, key=lambda offender: (-offender[1], offender[0]))[:count]
+
+    def format(self) -> str:
+        lines = [
+            f"Import time of {self.module_name} (median of {len(self.after_runs)} runs):",
+            f"  before: {self.before_us / 1000:.2f} ms",
+            f"  after:  {self.after_us / 1000:.2f} ms ({self.change:+.1f}%, tolerance {self.tolerance:+.1f}%)",
+        ]
+        offenders = self.offenders()
+        if offenders:
+            lines.append("Slowest submodules:")
+        for name, cumulative_us, self_us, slowest_child in offenders:
+            line = f"  {name}: {cumulative_us / 1000:.2f} ms (self {self_us / 1000:.2f} ms)"
+            if slowest_child:
+                line += f", slowest import {slowest_child[0]} {slowest_child[1] / 1000:.2f} ms"
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ImportedName:
+    """A single name bound by an import statement of the original file"""
+
+    # Position of the name among all imports of the original file
+    position: int
+    is_from: bool
+    module: Optional[str]
+    name: str
+    asname: Optional[str] = None
+    level: int = 0
+
+    @property
+    def bound_name(self) -> str:
+        if self.asname:
+            return self.asname
+        return self.name if self.is_from else self.name.split(".")[0]
+
+    @property
+    def is_future(self) -> bool:
+        return self.is_from and self.module == "__future__"
+
+    @property
+    def is_star(self) -> bool:
+        return self.is_from and self.name == "*"
+
+    def statement(self, level_offset: int = 0) -> str:
+        """Render the import statement, adjusting relative imports for a file moved `level_offset` packages deeper"""
+        alias = f" as {self.asname}" if self.asname else ""
+        if not self.is_from:
+            return f"import {self.name}{alias}\n"
+        dots = "." * (self.level + level_offset) if self.level else ""
+        return f"from {dots}{self.module or ''} import {self.name}{alias}\n"
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+from src.entities.split_plan import SplitPlan
+
+
+@dataclass(frozen=True)
+class PlanManifest:
+    """Split plans to apply later, and the git branch to commit them to"""
+
+    branch_name: str
+    plans: list[SplitPlan]
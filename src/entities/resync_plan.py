@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.entities.file import File
+from src.sinks.output_sink import OutputSink
+
+
+@dataclass(frozen=True)
+class ResyncPlan:
+    """Output files of a resync: only the moved files that must be regenerated, and the ones that no longer exist"""
+
+    original_file: File
+    # None when __init__.py is the same as the recorded one
+    init_file: Optional[File]
+    changed_files: list[File]
+    removed_paths: list[Path]
+    split_manifest_file: File
+
+    @property
+    def files(self) -> list[File]:
+        init_files = [self.init_file] if self.init_file else []
+        return [*init_files, *self.changed_files, self.split_manifest_file]
+
+    def write(self, sink: OutputSink):
+        for file in self.files:
+            file.write(sink)
+        for path in self.removed_paths:
+            sink.remove(path)
+        sink.remove(self.original_file.path)
@@ -0,0 +1,57 @@
+import io
+import tokenize
+from array import array
+from typing import Optional
+
+from src.types.lines import Lines
+
+
+class Source:
+    """The raw bytes of a file shared by all its blocks, with an index of where each line starts"""
+
+    __slots__ = ("data", "encoding", "line_offsets")
+
+    def __init__(self, data: bytes, encoding: str = "utf-8", line_offsets: Optional[array] = None):
+        self.data = data
+        self.encoding = encoding
+        self.line_offsets = line_offsets if line_offsets is not None else self._index_lines(data)
+
+    def __reduce__(self):
+        return Source, (self.data, self.encoding, self.line_offsets)
+
+    @staticmethod
+    def _index_lines(data: bytes) -> array:
+        # line_offsets[i] is the offset of the line i (0-based), and the last item is the size of the data
+        line_offsets = array("Q", [0])
+        find = data.find
+        position = find(b"\n")
+        while position != -1:
+            line_offsets.append(position + 1)
+            position = find(b"\n", position + 1)
+        if line_offsets[-1] != len(data):
+            line_offsets.append(len(data))
+        return line_offsets
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Source":
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        return cls(data=data, encoding=encoding)
+
+    @classmethod
+    def from_text(cls, text: str) -> "Source":
+        return cls(data=text.encode("utf-8"))
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets) - 1
+
+    def slice(self, start: int, end: int) -> memoryview:
+        """Bytes of the lines [start, end) without copying them"""
+        return memoryview(self.data)[self.line_offsets[start] : self.line_offsets[end]]
+
+    def text(self, start: int, end: int) -> str:
+        return str(self.slice(start, end), self.encoding)
+
+    def lines(self, start: int, end: int) -> Lines:
+        data, offsets, encoding = self.data, self.line_offsets, self.encoding
+        return [str(data[offsets[number] : offsets[number + 1]], encoding) for number in range(start, end)]
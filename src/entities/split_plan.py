@@ -0,0 +1,61 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from src.entities.file import File
+from src.entities.symbol_table import SymbolTable
+from src.sinks.output_sink import OutputSink
+from src.types.block_type import BlockType
+from src.utils import to_module_name
+
+
+@dataclass(frozen=True)
+class SplitPlan:
+    """Final content of every output file of a split, computed in memory before anything is written"""
+
+    original_file: File
+    target_block_types: list[BlockType]
+    # The original content left after the moves, placed at __init__.py without any import statements attached
+    residual_file: File
+    init_file: File
+    moved_files: list[File]
+    # NOTE: Not available for plans read back from a manifest
+    symbol_table: Optional[SymbolTable] = None
+    # Content hashes and symbols of the moved blocks, used by --resync
+    split_manifest_file: Optional[File] = None
+    # Values smaller than this many bytes were left in __init__.py
+    min_value_size: int = 0
+    # JSON files the moved values are read from, next to their modules
+    data_files: list[File] = field(default_factory=list)
+    # The empty __init__.py files of the subpackages the modules are placed in
+    package_files: list[File] = field(default_factory=list)
+
+    @property
+    def new_dir_path(self) -> Path:
+        return self.init_file.path.parent
+
+    @property
+    def files(self) -> list[File]:
+        files = [self.init_file, *self.package_files, *self.moved_files, *self.data_files]
+        if self.split_manifest_file:
+            files.append(self.split_manifest_file)
+        return files
+
+    def moved_name_modules(self) -> dict[str, str]:
+        """Submodule each moved name can be imported from, as recorded in the split manifest"""
+        if not self.split_manifest_file:
+            return {}
+        split_manifest = json.loads(self.split_manifest_file.render())
+        return {
+            name: to_module_name(self.new_dir_path / moved_file["path"])
+            for moved_file in split_manifest["moved_files"]
+            for block in moved_file["blocks"]
+            for name in block["defines"]
+        }
+
+    def write(self, sink: OutputSink):
+        # Flush each output path exactly once, then remove the original file
+        for file in self.files:
+            file.write(sink)
+        sink.remove(self.original_file.path)
@@ -0,0 +1,38 @@
+from dataclasses import dataclass, field
+from typing import Union
+
+from src.entities.block import Block
+from src.entities.conditional_import import ConditionalImport
+from src.entities.file import File
+from src.entities.imported_name import ImportedName
+from src.utils import to_module_name
+
+
+@dataclass(frozen=True)
+class SymbolTable:
+    """Names defined and used by each top-level block of a file, and the names bound by its imports"""
+
+    defines: dict[Block, frozenset[str]]
+    uses: dict[Block, frozenset[str]]
+    # Bound name -> imports (or conditional import blocks) binding it
+    imports: dict[str, list[Union[ImportedName, ConditionalImport]]]
+    # Imports needed by every file regardless of usage: `from __future__ import ...` and `from x import *`
+    global_imports: list[ImportedName]
+    # Names used only by annotations that are never evaluated, e.g. strings, which type checkers still need
+    annotation_uses: dict[Block, frozenset[str]] = field(default_factory=dict)
+
+    def bound_names(self) -> frozenset[str]:
+        """Every top-level name the file binds, which the package it is split into binds as well"""
+        return frozenset(name for names in self.defines.values() for name in names) | frozenset(self.imports)
+
+    def defined_names(self, files: list[File]) -> frozenset[str]:
+        return frozenset(name for file in files for block in file.blocks for name in self.defines.get(block, ()))
+
+    def name_modules(self, files: list[File]) -> dict[str, str]:
+        """Resolve the module each top-level name can be imported from, once the blocks are placed in the files"""
+        name_modules = {}
+        for file in files:
+            module_name = to_module_name(file.path)
+            for block in file.blocks:
+                name_modules.update((name, module_name) for name in self.defines.get(block, ()))
+        return name_modules
@@ -0,0 +1,54 @@
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ModuleCheck:
+    """Result of compiling or importing one generated module"""
+
+    path: Path
+    module_name: str
+    # "compile" or "import"
+    stage: str
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def is_cycle(self) -> bool:
+        return self.error is not None and "circular import" in self.error
+
+
+@dataclass(frozen=True)
+class VerificationReport:
+    """Whether the generated modules compile and import, checked before anything is committed"""
+
+    class VerificationError(Exception):
+        pass
+
+    checks: list[ModuleCheck]
+    # Compiled bytecode to write next to the generated modules: __pycache__ path -> .pyc content
+    bytecode: dict[Path, bytes] = field(default_factory=dict)
+
+    @property
+    def failures(self) -> list[ModuleCheck]:
+        return [check for check in self.checks if check.error is not None]
+
+    def format(self) -> str:
+        lines = []
+        for stage, label in (("compile", "Compiled"), ("import", "Imported")):
+            checks = [check for check in self.checks if check.stage == stage]
+            if not checks:
+                continue
+            median = statistics.median(check.seconds for check in checks)
+            slowest = max(checks, key=lambda check: check.seconds)
+            lines.append(
+                f"{label} {len(checks)} modules: median {median * 1000:.1f} ms, "
+                f"slowest {slowest.module_name} {slowest.seconds * 1000:.1f} ms"
+            )
+        for check in self.failures:
+            kind = "circular import" if check.is_cycle else f"{check.stage} error"
+            lines.append(f"  {check.path}: {kind} ({check.seconds * 1000:.1f} ms)")
+            lines += [f"    {line}" for line in check.error.splitlines()]
+        return "\n".join(lines)
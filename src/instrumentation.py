@@ -0,0 +1,166 @@
+import cProfile
+import functools
+import json
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+# NOTE: Nothing is measured unless a sink is registered, so the instrumented code pays almost nothing by default
+_sinks: list["MetricsSink"] = []
+
+
+class MetricsSink(ABC):
+    """Receive the measurements of a run. Register one with add_sink() or collect() to plug in your own metrics"""
+
+    @abstractmethod
+    def record_span(self, name: str, seconds: float) -> None:
+        """A timed step has finished. Nested steps are reported too, so durations are inclusive"""
+
+    @abstractmethod
+    def record_count(self, name: str, value: int) -> None:
+        pass
+
+
+# NOTE: Compared by identity, so that remove_sink() removes this very report
+@dataclass(eq=False)
+class Report(MetricsSink):
+    """Aggregate the spans by name (call count and total seconds) and sum the counters"""
+
+    spans: dict[str, dict] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def record_span(self, name: str, seconds: float) -> None:
+        span = self.spans.setdefault(name, {"count": 0, "seconds": 0.0})
+        span["count"] += 1
+        span["seconds"] += seconds
+
+    def record_count(self, name: str, value: int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: "Report") -> None:
+        for name, span in other.spans.items():
+            merged = self.spans.setdefault(name, {"count": 0, "seconds": 0.0})
+            merged["count"] += span["count"]
+            merged["seconds"] += span["seconds"]
+        for name, value in other.counters.items():
+            self.record_count(name, value)
+
+    def replay(self) -> None:
+        """Forward the measurements to the active sinks, e.g. those of a worker process to the parent's"""
+        for sink in _sinks:
+            if isinstance(sink, Report):
+                sink.merge(self)
+                continue
+            # NOTE: Other sinks see one span per name with the total duration
+            for name, span in self.spans.items():
+                sink.record_span(name, span["seconds"])
+            for name, value in self.counters.items():
+                sink.record_count(name, value)
+
+    def to_dict(self) -> dict:
+        return {"spans": dict(sorted(self.spans.items())), "counters": dict(sorted(self.counters.items()))}
+
+    def write(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def add_sink(sink: MetricsSink) -> None:
+    _sinks.append(sink)
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    _sinks.remove(sink)
+
+
+def clear_sinks() -> None:
+    # Forked worker processes inherit the parent's sinks, which must not see the measurements twice
+    _sinks.clear()
+
+
+@contextmanager
+def collect(sink: Optional[MetricsSink] = None) -> Iterator[MetricsSink]:
+    """Send the measurements taken in the block to the sink (a new Report by default)"""
+    sink = sink if sink is not None else Report()
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
+
+
+def record_span(name: str, seconds: float) -> None:
+    for sink in _sinks:
+        sink.record_span(name, seconds)
+
+
+def count(name: str, value: int = 1) -> None:
+    for sink in _sinks:
+        sink.record_count(name, value)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if not _sinks:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def instrumented(function: Callable) -> Callable:
+    """Time each call of a method as a span named after its qualified name, e.g. `LoadFileService.execute`"""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _sinks:
+            return function(*args, **kwargs)
+        with span(function.__qualname__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def count_read(data: bytes) -> None:
+    count("files_read")
+    count("bytes_read", len(data))
+
+
+def count_written(size: int) -> None:
+    count("files_written")
+    count("bytes_written", size)
+
+
+def count_commit(changes: dict[Path, Optional[bytes]]) -> None:
+    count("commits")
+    count("bytes_committed", sum(len(data) for data in changes.values() if data is not None))
+
+
+@contextmanager
+def profile(dir_path: Path, report: Optional[Report] = None) -> Iterator[None]:
+    """Run the block under cProfile and tracemalloc, and dump the results (and the report) to dir_path"""
+    dir_path.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Open with `python -m pstats` or a viewer such as snakeviz
+        profiler.dump_stats(dir_path / "profile.pstats")
+        snapshot.dump(str(dir_path / "tracemalloc.snapshot"))
+        lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", ""]
+        lines += [str(statistic) for statistic in snapshot.statistics("lineno")[:50]]
+        (dir_path / "tracemalloc.txt").write_text("\n".join(lines) + "\n")
+        if report is not None:
+            report.write(dir_path / "report.json")
@@ -1,11 +1,151 @@
+import sys
+from contextlib import nullcontext, redirect_stdout
+
+from src import instrumentation
 from src.code_splitter import CodeSplitter
-from src.command import get_args
+from src.command import get_args, get_serve_args
+from src.directory_splitter import DirectorySplitter
+from src.entities.import_time_report import ImportTimeReport
+from src.entities.verification_report import VerificationReport
+from src.plan_applier import PlanApplier
+from src.plan_cache import PlanCache
+from src.plan_store import PlanStore
+from src.sinks.archive_sink import ArchiveSink
+from src.split_resyncer import SplitResyncer
+from src.split_server import SplitServer
+from src.types.git_backend_type import GitBackendType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+
+
+def _cache(args):
+    if args.no_cache:
+        return None
+    return PlanCache(dir_path=args.cache_dir or PlanCache.default_dir_path(), max_bytes=args.cache_size * 1024 * 1024)
+
+
+def serve(args):
+    server = SplitServer(
+        store=PlanStore(max_bytes=args.memory_size * 1024 * 1024, cache=_cache(args)), workers=args.workers
+    )
+    if args.socket:
+        try:
+            server.serve_unix(args.socket)
+        except SplitServer.SocketPathError as e:
+            sys.exit(str(e))
+        return
+    # NOTE: stdout carries the responses, so the output of git and of the services goes to stderr
+    stdout = sys.stdout.buffer
+    with redirect_stdout(sys.stderr):
+        server.serve_stdio(sys.stdin.buffer, stdout)
+
+
+def run(args):
+    cache = _cache(args)
+    sink = ArchiveSink(archive_path=args.archive) if args.archive else None
+
+    if args.apply:
+        PlanApplier(
+            manifest_path=args.apply,
+            git_commit=args.git,
+            git_backend_type=GitBackendType(args.git_backend),
+            sink=sink,
+            rewrite_importers=args.rewrite_importers,
+            verify=args.verify,
+            write_bytecode=args.write_bytecode,
+            worktree=args.worktree,
+        ).execute()
+        return
+
+    if args.resync:
+        SplitResyncer(
+            original_file_path=args.file_path,
+            git_commit=args.git,
+            git_backend_type=GitBackendType(args.git_backend),
+            loader_type=LoaderType(args.loader),
+            sink=sink,
+        ).execute()
+        return
+
+    if args.recursive:
+        DirectorySplitter(
+            dir_path=args.file_path,
+            git_commit=args.git,
+            target_block_types=args.targets,
+            git_backend_type=GitBackendType(args.git_backend),
+            loader_type=LoaderType(args.loader),
+            cache=cache,
+            sink=sink,
+            jobs=args.jobs,
+            min_lines=args.min_lines,
+            min_size=args.min_size,
+            plan_output_path=args.plan,
+            rewrite_importers=args.rewrite_importers,
+            verify=args.verify,
+            write_bytecode=args.write_bytecode,
+            worktree=args.worktree,
+            lazy_init=args.lazy_init,
+            group=args.group,
+            max_lines=args.max_lines,
+            max_modules=args.max_modules,
+            min_value_size=args.min_value_size,
+            value_sidecars=args.value_sidecars,
+            layout_type=LayoutType(args.layout),
+            type_checking_imports=args.type_checking_imports,
+        ).execute()
+        return
+
+    CodeSplitter(
+        original_file_path=args.file_path,
+        git_commit=args.git,
+        target_block_types=args.targets,
+        git_backend_type=GitBackendType(args.git_backend),
+        loader_type=LoaderType(args.loader),
+        cache=cache,
+        sink=sink,
+        plan_output_path=args.plan,
+        rewrite_importers=args.rewrite_importers,
+        verify=args.verify,
+        write_bytecode=args.write_bytecode,
+        worktree=args.worktree,
+        lazy_init=args.lazy_init,
+        group=args.group,
+        max_lines=args.max_lines,
+        max_modules=args.max_modules,
+        min_value_size=args.min_value_size,
+        value_sidecars=args.value_sidecars,
+        layout_type=LayoutType(args.layout),
+        type_checking_imports=args.type_checking_imports,
+        measure_import=args.measure_import,
+        import_tolerance=args.import_tolerance,
+    ).execute()
 
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve(get_serve_args(sys.argv[2:]))
+        return
+
     args = get_args()
+    try:
+        if not args.report and not args.profile:
+            run(args)
+            return
 
-    CodeSplitter(original_file_path=args.file_path, git_commit=args.git, target_block_types=args.targets).execute()
+        with instrumentation.collect() as report:
+            try:
+                with instrumentation.profile(args.profile, report) if args.profile else nullcontext():
+                    run(args)
+            finally:
+                # NOTE: Also written when the split package imports too slowly
+                if args.report:
+                    report.write(args.report)
+    except (
+        ImportTimeReport.RegressionError,
+        VerificationReport.VerificationError,
+        DirectorySplitter.UnparsedFilesError,
+    ) as e:
+        sys.exit(str(e))
 
 
 if __name__ == "__main__":
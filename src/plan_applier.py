@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.instrumentation import instrumented
+from src.services.apply_split_plans_service import ApplySplitPlansService
+from src.services.build_import_index_service import BuildImportIndexService
+from src.services.read_plan_manifest_service import ReadPlanManifestService
+from src.sinks.output_sink import OutputSink
+from src.types.git_backend_type import GitBackendType
+
+
+@dataclass(frozen=True)
+class PlanApplier:
+    manifest_path: Path
+    git_commit: bool
+    git_backend_type: GitBackendType = GitBackendType.FAST_IMPORT
+    # Where the output files go. The working tree by default
+    sink: Optional[OutputSink] = None
+    # Also rewrite `from <module> import <name>` statements of the other files under the current directory
+    rewrite_importers: bool = False
+    # Check that the generated modules compile and import before committing anything, and maybe write their .pyc
+    verify: bool = False
+    write_bytecode: bool = False
+    # Commit each file on its own branch in a temporary worktree, several at once, without writing the output files
+    worktree: bool = False
+
+    @instrumented
+    def execute(self):
+        # 1. Read the plans, checking that the source files haven't changed since planning
+        manifest = ReadPlanManifestService(manifest_path=self.manifest_path).execute()
+
+        # 2. Find the files importing from the original modules
+        import_index = None
+        if self.rewrite_importers:
+            import_index = BuildImportIndexService(root_path=Path(".")).execute()
+
+        # 3. Commit the planned snapshots to a new git branch, and write every output file exactly once
+        ApplySplitPlansService(
+            plans=manifest.plans,
+            git_commit=self.git_commit,
+            branch_name=manifest.branch_name,
+            git_backend_type=self.git_backend_type,
+            sink=self.sink,
+            import_index=import_index,
+            verify=self.verify,
+            write_bytecode=self.write_bytecode,
+            worktree=self.worktree,
+        ).execute()
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional
+
+from src import instrumentation
+
+PACKAGE_NAME = "python-code-splitter"
+
+
+@lru_cache(maxsize=None)
+def _tool_fingerprint() -> str:
+    """The tool version, plus the size and mtime of every module so that a source checkout invalidates on edits"""
+    try:
+        version = metadata.version(PACKAGE_NAME)
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for path in sorted(Path(__file__).parent.rglob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class PlanCache:
+    """Pickled values on disk keyed by content hash, evicted in least-recently-used order over a byte budget.
+    Entries are written atomically, so several processes can share the directory."""
+
+    dir_path: Path
+    max_bytes: int = 256 * 1024 * 1024
+
+    @staticmethod
+    def default_dir_path() -> Path:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(cache_home) / PACKAGE_NAME
+
+    @staticmethod
+    def key(data: bytes, *options: Any) -> str:
+        digest = hashlib.sha256(f"{_tool_fingerprint()}:{options!r}:".encode("utf-8"))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.dir_path / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[Any]:
+        entry_path = self._entry_path(key)
+        try:
+            with entry_path.open(mode="rb") as f:
+                value = pickle.load(f)
+            # NOTE: The mtime of an entry is its last access time for the LRU eviction
+            os.utime(entry_path)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Missing, evicted by another process in the meantime, or written by an incompatible version
+            instrumentation.count("cache_misses")
+            return None
+        instrumentation.count("cache_hits")
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self.dir_path.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.dir_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._entry_path(key))
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache fits in the byte budget"""
+        entries = []
+        for entry_path in self.dir_path.glob("*.pickle"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_bytes -= size
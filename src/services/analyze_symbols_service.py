@@ -0,0 +1,214 @@
+import ast
+import io
+import keyword
+import tokenize
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from src.entities.block import Block
+from src.entities.conditional_import import ConditionalImport
+from src.entities.file import File
+from src.entities.imported_name import ImportedName
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
+from src.types.block_type import BlockType
+
+
+def _bound_names(node: ast.AST) -> set[str]:
+    """Names bound at module level by a top-level statement, including inside if/try/with/for bodies"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        is_from = isinstance(node, ast.ImportFrom)
+        return {ImportedName(0, is_from, None, alias.name, alias.asname).bound_name for alias in node.names}
+    if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign, ast.For, ast.AsyncFor, ast.With, ast.AsyncWith)):
+        targets = getattr(node, "targets", None) or [getattr(node, "target", None)]
+        targets += [item.optional_vars for item in getattr(node, "items", [])]
+        names = {
+            target.id
+            for target_node in targets
+            if target_node is not None
+            for target in ast.walk(target_node)
+            if isinstance(target, ast.Name)
+        }
+    elif type(node).__name__ == "TypeAlias":
+        names = {node.name.id}
+    else:
+        names = set()
+    for field in ("body", "orelse", "finalbody", "handlers"):
+        for child in getattr(node, field, []):
+            names |= _bound_names(child)
+    return names
+
+
+def _subscript_name(node: ast.expr) -> Optional[str]:
+    """`Literal` for `Literal` and `typing.Literal`"""
+    if isinstance(node, ast.Name):
+        return node.id
+    return node.attr if isinstance(node, ast.Attribute) else None
+
+
+def _annotation_names(annotation: ast.expr) -> tuple[set[str], set[str]]:
+    """Names an annotation evaluates, and names in its strings, which are forward references never evaluated"""
+    names, string_names = set(), set()
+    nodes = [annotation]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                expression = ast.parse(node.value.strip(), mode="eval").body
+            except SyntaxError:
+                continue
+            string_names |= set().union(*_annotation_names(expression))
+        elif isinstance(node, ast.Subscript) and _subscript_name(node.value) == "Literal":
+            # NOTE: The strings of Literal[...] are values, as are the metadata of Annotated[...]
+            nodes.append(node.value)
+        elif isinstance(node, ast.Subscript) and _subscript_name(node.value) == "Annotated":
+            nodes.append(node.value)
+            nodes.append(node.slice.elts[0] if isinstance(node.slice, ast.Tuple) else node.slice)
+        else:
+            nodes.extend(ast.iter_child_nodes(node))
+    return names, string_names
+
+
+def _used_names(statement: ast.stmt, is_future_annotations: bool) -> tuple[set[str], set[str]]:
+    """Names a top-level statement uses at runtime, and names only its annotations use that are never evaluated.
+    As in the interpreter, annotations are evaluated unless `from __future__ import annotations`, except those of
+    local variables and strings, which never are"""
+    names, annotation_names = set(), set()
+
+    def add_annotation(annotation: ast.expr, is_evaluated: bool) -> None:
+        evaluated_names, string_names = _annotation_names(annotation)
+        (names if is_evaluated else annotation_names).update(evaluated_names)
+        annotation_names.update(string_names)
+
+    # NOTE: Iterative, as deeply nested expressions would exceed the recursion limit
+    nodes: list[tuple[ast.AST, bool]] = [(statement, False)]
+    while nodes:
+        node, is_local = nodes.pop()
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            for argument in [
+                *arguments.posonlyargs,
+                *arguments.args,
+                arguments.vararg,
+                *arguments.kwonlyargs,
+                arguments.kwarg,
+            ]:
+                if argument is not None and argument.annotation is not None:
+                    add_annotation(argument.annotation, not is_future_annotations)
+            if node.returns is not None:
+                add_annotation(node.returns, not is_future_annotations)
+            children = [*node.decorator_list, *arguments.defaults, *filter(None, arguments.kw_defaults)]
+            nodes += [(child, is_local) for child in children + getattr(node, "type_params", [])]
+            nodes += [(child, True) for child in node.body]
+        elif isinstance(node, ast.ClassDef):
+            children = [*node.decorator_list, *node.bases, *node.keywords]
+            nodes += [(child, is_local) for child in children + getattr(node, "type_params", [])]
+            # NOTE: Class bodies run when the class is defined, even in a function
+            nodes += [(child, False) for child in node.body]
+        elif isinstance(node, ast.AnnAssign):
+            add_annotation(node.annotation, not is_local and not is_future_annotations)
+            nodes += [(child, is_local) for child in (node.target, node.value) if child is not None]
+        else:
+            nodes += [(child, is_local) for child in ast.iter_child_nodes(node)]
+    return names, annotation_names - names
+
+
+@dataclass(frozen=True)
+class AnalyzeSymbolsService:
+    file: File
+    # Tell apart the names only annotations that are never evaluated use, or count every name as used at runtime
+    type_checking_imports: bool = False
+
+    @staticmethod
+    def _token_names(block: Block) -> set[str]:
+        # Fallback for blocks the interpreter can't parse: every identifier is considered used
+        readline = io.StringIO(block.text).readline
+        try:
+            return {
+                token.string
+                for token in tokenize.generate_tokens(readline)
+                if token.type == tokenize.NAME and not keyword.iskeyword(token.string)
+            }
+        except tokenize.TokenError:
+            return set()
+
+    @instrumented
+    def execute(self) -> SymbolTable:
+        """Record which names each block defines and uses. Blocks are parsed one by one to bound memory usage"""
+        defines: dict[Block, set[str]] = defaultdict(set)
+        uses: dict[Block, set[str]] = defaultdict(set)
+        annotation_uses: dict[Block, set[str]] = defaultdict(set)
+        imports: dict[str, list[Union[ImportedName, ConditionalImport]]] = defaultdict(list)
+        global_imports: list[ImportedName] = []
+        position = 0
+        is_future_annotations = False
+
+        for block in self.file.blocks:
+            try:
+                nodes = ast.parse(block.text).body
+            except SyntaxError:
+                if block.name != "other":
+                    defines[block].add(block.name)
+                uses[block] |= self._token_names(block)
+                continue
+            for node in nodes:
+                if isinstance(node, (ast.Import, ast.ImportFrom)) and block.type == BlockType.IMPORT:
+                    for alias in node.names:
+                        imported_name = ImportedName(
+                            position=position,
+                            is_from=isinstance(node, ast.ImportFrom),
+                            module=getattr(node, "module", None),
+                            name=alias.name,
+                            asname=alias.asname,
+                            level=getattr(node, "level", 0),
+                        )
+                        position += 1
+                        is_future_annotations |= imported_name.is_future and imported_name.name == "annotations"
+                        if imported_name.is_future or imported_name.is_star:
+                            global_imports.append(imported_name)
+                        else:
+                            imports[imported_name.bound_name].append(imported_name)
+                    continue
+                if (
+                    isinstance(node, (ast.If, ast.Try, getattr(ast, "TryStar", ast.Try)))
+                    and block.type == BlockType.CONDITIONAL_IMPORT
+                ):
+                    # NOTE: Bound like imports, so the files using the names get their own copy of the block
+                    text = "".join(block.text.splitlines(keepends=True)[node.lineno - 1 : node.end_lineno])
+                    bound_names = _bound_names(node)
+                    node_uses = {child.id for child in ast.walk(node) if isinstance(child, ast.Name)} - bound_names
+                    for bound_name in sorted(bound_names):
+                        imports[bound_name].append(
+                            ConditionalImport(
+                                position=position, bound_name=bound_name, text=text, uses=frozenset(node_uses)
+                            )
+                        )
+                    position += 1
+                    continue
+                defines[block] |= _bound_names(node)
+                if not self.type_checking_imports:
+                    uses[block] |= {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+                    continue
+                node_uses, node_annotation_uses = _used_names(node, is_future_annotations)
+                uses[block] |= node_uses
+                annotation_uses[block] |= node_annotation_uses
+
+        return SymbolTable(
+            defines={block: frozenset(names) for block, names in defines.items()},
+            uses={block: frozenset(names) for block, names in uses.items()},
+            annotation_uses={
+                block: frozenset(names - uses.get(block, set()))
+                for block, names in annotation_uses.items()
+                if names - uses.get(block, set())
+            },
+            imports=dict(imports),
+            global_imports=global_imports,
+        )
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from src.backends.git_backend_factory import create_git_backend
+from src.backends.git_worktree import GitWorktree
+from src.entities.import_index import ImportIndex
+from src.entities.split_plan import SplitPlan
+from src.entities.verification_report import VerificationReport
+from src.instrumentation import instrumented
+from src.services.commit_split_plan_service import CommitSplitPlanService
+from src.services.rewrite_importers_service import RewriteImportersService
+from src.services.verify_split_plans_service import VerifySplitPlansService
+from src.sinks.output_sink import OutputSink
+from src.sinks.staged_directory_sink import StagedDirectorySink
+from src.types.git_backend_type import GitBackendType
+from src.utils import to_branch_name, to_module_name
+
+
+@dataclass(frozen=True)
+class ApplySplitPlansService:
+    plans: Iterable[SplitPlan]
+    git_commit: bool
+    branch_name: str
+    git_backend_type: GitBackendType = GitBackendType.FAST_IMPORT
+    # Where the output files go. Staged and renamed into the working tree on success by default
+    sink: Optional[OutputSink] = None
+    # Rewrite the importers of the split modules found in this index
+    import_index: Optional[ImportIndex] = None
+    # Check that the generated modules compile and import before committing anything, and maybe write their .pyc
+    verify: bool = False
+    write_bytecode: bool = False
+    # Number of workers of the verification and of the worktrees. None means the number of CPUs
+    jobs: Optional[int] = None
+    # Commit each plan on its own branch (named after its file instead of branch_name) in a temporary worktree,
+    # several at once, without writing the output files or touching the current checkout
+    worktree: bool = False
+
+    def _commit_in_worktree(self, plan: SplitPlan) -> None:
+        with GitWorktree(to_branch_name(plan.original_file.path)) as worktree:
+            backend = create_git_backend(self.git_backend_type, worktree.path)
+            backend.use_current_branch()
+            CommitSplitPlanService(plan=plan, backend=backend).execute()
+            if self.import_index is not None:
+                importer_files = RewriteImportersService(
+                    import_index=self.import_index,
+                    moved_name_modules={to_module_name(plan.original_file.path): plan.moved_name_modules()},
+                    excluded_paths={plan.original_file.path, *[file.path for file in plan.files]},
+                ).execute()
+                if importer_files:
+                    backend.commit(
+                        "[Auto] Import the moved names from their new modules.",
+                        {file.path: file.render_bytes() for file in importer_files},
+                    )
+            backend.close()
+
+    @instrumented
+    def execute(self) -> None:
+        sink = self.sink or StagedDirectorySink()
+        plans = self.plans
+        try:
+            # 1. Compile and import the generated modules before anything is committed or written
+            bytecode = {}
+            if self.verify:
+                plans = list(plans)
+                report = VerifySplitPlansService(
+                    plans=plans, write_bytecode=self.write_bytecode, jobs=self.jobs
+                ).execute()
+                print(report.format())
+                if report.failures:
+                    raise VerificationReport.VerificationError(
+                        f"Error: {len(report.failures)} generated modules failed to compile or import."
+                    )
+                bytecode = report.bytecode
+
+            if self.worktree:
+                # NOTE: git does the work in subprocesses, so threads are enough to keep the CPUs busy
+                with ThreadPoolExecutor(max_workers=self.jobs or os.cpu_count()) as executor:
+                    list(executor.map(self._commit_in_worktree, plans))
+                return
+
+            # 2. Create new git branch
+            backend = None
+            if self.git_commit:
+                backend = create_git_backend(self.git_backend_type)
+                backend.create_branch(self.branch_name)
+
+            # 3. Commit the planned snapshots in review-friendly units, and write every output file exactly once
+            moved_name_modules, split_paths = {}, set()
+            for plan in plans:
+                if backend:
+                    CommitSplitPlanService(plan=plan, backend=backend).execute()
+                plan.write(sink)
+                if self.import_index is not None:
+                    moved_name_modules[to_module_name(plan.original_file.path)] = plan.moved_name_modules()
+                    split_paths |= {plan.original_file.path, *[file.path for file in plan.files]}
+
+            # NOTE: Bytecode is only written, never committed
+            for path, data in bytecode.items():
+                sink.write(path, data)
+
+            # 4. Import the moved names straight from their submodules in the rest of the tree
+            if self.import_index is not None:
+                importer_files = RewriteImportersService(
+                    import_index=self.import_index, moved_name_modules=moved_name_modules, excluded_paths=split_paths
+                ).execute()
+                if backend and importer_files:
+                    backend.commit(
+                        "[Auto] Import the moved names from their new modules.",
+                        {file.path: file.render_bytes() for file in importer_files},
+                    )
+                for file in importer_files:
+                    file.write(sink)
+
+            if backend:
+                backend.close()
+        except BaseException:
+            sink.abort()
+            raise
+        # 5. Make the output files visible all at once
+        sink.commit()
@@ -1,23 +1,37 @@
 from dataclasses import dataclass
 
+from src.entities.block import Block
 from src.entities.file import File
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
 from src.services.generate_import_statement_service import (
     GenerateImportStatementService,
 )
+from src.types.block_type import BlockType
 
 
 @dataclass(frozen=True)
 class AttachImportStatementsService:
     moved_files: list[File]
     init_file: File
+    symbol_table: SymbolTable
+    name_modules: dict[str, str]
 
-    def execute(self) -> None:
+    @instrumented
+    def execute(self) -> list[File]:
+        original_dir_path = self.init_file.path.parent.parent
+        files = []
         for moved_file in self.moved_files:
             import_statement = GenerateImportStatementService(
-                moved_files=self.moved_files,
-                init_file=self.init_file,
-                exclude_file=moved_file,
+                symbol_table=self.symbol_table,
+                file=moved_file,
+                name_modules=self.name_modules,
+                level_offset=len(moved_file.path.relative_to(original_dir_path).parts) - 1,
             ).execute()
-            text = moved_file.path.read_text()
-            text = "".join(import_statement) + text
-            moved_file.path.write_text(text)
+            if moved_file.blocks and moved_file.blocks[0].source.encoding not in ("utf-8", "utf-8-sig"):
+                # NOTE: The moved blocks keep the bytes of the original file, so they need its coding cookie too
+                encoding = moved_file.blocks[0].source.encoding
+                import_statement = [f"# -*- coding: {encoding} -*-\n", *import_statement]
+            import_block = Block.from_lines(type=BlockType.IMPORT, name="other", lines=import_statement)
+            files.append(File(path=moved_file.path, blocks=[import_block, *moved_file.blocks]))
+        return files
@@ -0,0 +1,114 @@
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src import instrumentation
+from src.entities.import_index import ImportIndex
+from src.instrumentation import instrumented
+from src.plan_cache import PlanCache
+from src.utils import to_module_name
+
+# NOTE: Matched on raw bytes instead of parsing every file. The few files that are rewritten are parsed later.
+_FROM_IMPORT_PATTERN = re.compile(rb"^[ \t]*from[ \t]+(\.*)[ \t]*([A-Za-z_][\w.]*)?[ \t]+import\b", re.MULTILINE)
+# Below this number of files to scan, starting worker processes costs more than it saves
+_MIN_FILES_PER_PROCESS_POOL = 512
+
+
+def resolve_module(module: Optional[str], level: int, file_path: Path) -> Optional[str]:
+    """Resolve the module of `from <dots><module> import ...` in the file to an absolute module name"""
+    if not level:
+        return module
+    package = to_module_name(file_path).split(".")
+    if file_path.name != "__init__.py":
+        package = package[:-1]
+    if level - 1 > len(package):
+        return None
+    parts = package[: len(package) - (level - 1)] + ([module] if module else [])
+    return ".".join(part for part in parts if part) or None
+
+
+def scan_imported_modules(file_path: str) -> list[str]:
+    """Modules the file imports names from. May include false positives, e.g. from docstrings"""
+    try:
+        with open(file_path, mode="rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    if b"import" not in data:
+        return []
+    modules = set()
+    for match in _FROM_IMPORT_PATTERN.finditer(data):
+        module = match[2].decode("ascii") if match[2] else None
+        if match[1]:
+            module = resolve_module(module, len(match[1]), Path(file_path))
+        if module:
+            modules.add(module)
+    return sorted(modules)
+
+
+@dataclass(frozen=True)
+class BuildImportIndexService:
+    root_path: Path
+    # The modules imported by each file are cached by the size and mtime of the file
+    cache: Optional[PlanCache] = None
+    # Number of worker processes. None means the number of CPUs
+    jobs: Optional[int] = None
+
+    def find_files(self) -> Iterator[tuple[str, os.stat_result]]:
+        """Yield the path and the stat of every Python file, skipping hidden directories"""
+        dir_paths = [str(self.root_path)]
+        while dir_paths:
+            try:
+                entries = list(os.scandir(dir_paths.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dir_paths.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    try:
+                        yield entry.path, entry.stat()
+                    except OSError:
+                        continue
+
+    def _scan(self, file_paths: list[str]) -> list[list[str]]:
+        if self.jobs == 1 or len(file_paths) < _MIN_FILES_PER_PROCESS_POOL:
+            return [scan_imported_modules(file_path) for file_path in file_paths]
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=instrumentation.clear_sinks) as executor:
+            return list(executor.map(scan_imported_modules, file_paths, chunksize=256))
+
+    @instrumented
+    def execute(self) -> ImportIndex:
+        """Index the `from ... import` statements of every Python file under the root, scanning only changed files"""
+        cache_key = PlanCache.key(str(self.root_path.resolve()).encode("utf-8"), "import-index")
+        cached_entries = (self.cache.get(cache_key) if self.cache else None) or {}
+
+        # 1. Reuse the entries of the files whose size and mtime are unchanged
+        entries, stale_file_paths = {}, []
+        for file_path, stat in self.find_files():
+            cached_entry = cached_entries.get(file_path)
+            if cached_entry and cached_entry[0] == stat.st_size and cached_entry[1] == stat.st_mtime_ns:
+                entries[file_path] = cached_entry
+            else:
+                entries[file_path] = (stat.st_size, stat.st_mtime_ns, None)
+                stale_file_paths.append(file_path)
+
+        # 2. Scan the others in parallel
+        for file_path, modules in zip(stale_file_paths, self._scan(stale_file_paths)):
+            entries[file_path] = (*entries[file_path][:2], modules)
+        instrumentation.count("import_index_files_scanned", len(stale_file_paths))
+        if self.cache and (stale_file_paths or len(entries) != len(cached_entries)):
+            self.cache.put(cache_key, entries)
+
+        # 3. Invert the index
+        importer_paths = defaultdict(list)
+        for file_path, (_, _, modules) in entries.items():
+            for module in modules:
+                importer_paths[module].append(file_path)
+        return ImportIndex(importer_paths=dict(importer_paths))
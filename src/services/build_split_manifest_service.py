@@ -0,0 +1,99 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
+from src.types.block_type import BlockType
+from src.types.layout_type import LayoutType
+
+SPLIT_MANIFEST_NAME = ".split-manifest.json"
+SPLIT_MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class BuildSplitManifestService:
+    original_file: File
+    target_block_types: list[BlockType]
+    # The residual file placed at __init__.py, and the moved files before their import statements are attached
+    residual_file: File
+    moved_files: list[File]
+    symbol_table: SymbolTable
+    lazy_init: bool = False
+    group: bool = False
+    max_lines: int = 0
+    max_modules: int = 0
+    min_value_size: int = 0
+    value_sidecars: bool = False
+    layout_type: LayoutType = LayoutType.FLAT
+    type_checking_imports: bool = False
+    # The JSON files the moved values are read from
+    data_file_paths: tuple[Path, ...] = ()
+    # The generated __init__.py, whose hash lets a resync skip rewriting it
+    init_file: Optional[File] = None
+
+    @staticmethod
+    def file_from_data(dir_path: Path, data: dict) -> File:
+        text = json.dumps(data, indent=2) + "\n"
+        return File(
+            path=dir_path / SPLIT_MANIFEST_NAME,
+            blocks=[Block.from_lines(type=BlockType.OTHER, name="other", lines=text.splitlines(keepends=True))],
+        )
+
+    def data(self) -> dict:
+        """Record the content hash and the symbols of each moved block, so that a later resync can skip the
+        unchanged ones without analyzing them again"""
+        dir_path = self.residual_file.path.parent
+        imported_names = sorted(
+            (
+                imported_name
+                for imported_names in self.symbol_table.imports.values()
+                for imported_name in imported_names
+            ),
+            key=lambda imported_name: imported_name.position,
+        )
+        return {
+            "version": SPLIT_MANIFEST_VERSION,
+            "source_path": str(self.original_file.path),
+            "target_block_types": list(self.target_block_types),
+            "lazy_init": self.lazy_init,
+            "group": self.group,
+            "max_lines": self.max_lines,
+            "max_modules": self.max_modules,
+            "min_value_size": self.min_value_size,
+            "value_sidecars": self.value_sidecars,
+            "layout": self.layout_type.value,
+            "type_checking_imports": self.type_checking_imports,
+            "init_sha256": hashlib.sha256(self.init_file.render_bytes()).hexdigest() if self.init_file else None,
+            "global_imports": [imported_name.statement() for imported_name in self.symbol_table.global_imports],
+            "imports": [[imported_name.bound_name, imported_name.statement()] for imported_name in imported_names],
+            "residual_defines": sorted(
+                set().union(*[self.symbol_table.defines.get(block, ()) for block in self.residual_file.blocks])
+            ),
+            "moved_files": [
+                {
+                    "path": file.path.relative_to(dir_path).as_posix(),
+                    "blocks": [
+                        {
+                            "type": block.type.value,
+                            "name": block.name,
+                            "sha256": hashlib.sha256(block.data).hexdigest(),
+                            "defines": sorted(self.symbol_table.defines.get(block, ())),
+                            "uses": sorted(self.symbol_table.uses.get(block, ())),
+                            "annotation_uses": sorted(self.symbol_table.annotation_uses.get(block, ())),
+                        }
+                        for block in file.blocks
+                    ],
+                }
+                for file in self.moved_files
+            ],
+            "data_files": [path.relative_to(dir_path).as_posix() for path in self.data_file_paths],
+        }
+
+    @instrumented
+    def execute(self) -> File:
+        return self.file_from_data(self.residual_file.path.parent, self.data())
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+
+from src.backends.git_backend import GitBackend
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.split_plan import SplitPlan
+from src.instrumentation import instrumented
+from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
+from src.types.block_type import BlockType
+
+
+@dataclass(frozen=True)
+class CommitSplitPlanService:
+    plan: SplitPlan
+    backend: GitBackend
+
+    @instrumented
+    def execute(self) -> None:
+        """Commit the planned snapshots in review-friendly units"""
+
+        # NOTE: The plan knows which blocks share a module, however they were grouped and laid out. A value read
+        #       from a data file is replaced by a loader block of the same name
+        block_paths = {block: file.path for file in self.plan.moved_files for block in file.blocks}
+        value_paths = {block.name: path for block, path in block_paths.items() if block.type == BlockType.VALUE}
+        block_paths.update(
+            (block, value_paths[block.name])
+            for block in self.plan.original_file.blocks
+            if block.type == BlockType.VALUE and block not in block_paths and block.name in value_paths
+        )
+
+        # Move class and function definitions from the original file to new files one by one
+        def git_commit_for_each_move(new_file: File, old_file: File, block: Block):
+            # NOTE: Committed temporarily to avoid creating diffs for reviewers
+            self.backend.commit(
+                f"[Auto] Move {block.type} {block.name} to {new_file.path}.",
+                {new_file.path: new_file.render_bytes(), old_file.path: old_file.render_bytes()},
+            )
+
+        MoveBlocksToNewFilesService(
+            original_file=self.plan.original_file,
+            target_block_types=self.plan.target_block_types,
+            handler_for_each_move=git_commit_for_each_move,
+            block_paths=block_paths,
+            min_value_size=self.plan.min_value_size,
+        ).execute()
+
+        # Move the original file to __init__.py
+        original_file, init_file = self.plan.original_file, self.plan.init_file
+        self.backend.commit(
+            f"[Auto] git mv {original_file.path} {init_file.path}",
+            {original_file.path: None, init_file.path: self.plan.residual_file.render_bytes()},
+        )
+        self.backend.commit(
+            f"[Auto] Attached import statements for moved files to {init_file.path}.",
+            {init_file.path: init_file.render_bytes()},
+        )
+        changes = {
+            file.path: file.render_bytes()
+            for file in [*self.plan.package_files, *self.plan.moved_files, *self.plan.data_files]
+        }
+        if self.plan.split_manifest_file:
+            changes[self.plan.split_manifest_file.path] = self.plan.split_manifest_file.render_bytes()
+        self.backend.commit(
+            f"[Auto] Attached import statements for the moved files to {init_file.path.parent}.", changes
+        )
@@ -1,32 +1,62 @@
 from dataclasses import dataclass
-from typing import Optional
 
+from src.entities.conditional_import import ConditionalImport
 from src.entities.file import File
-from src.types.block_type import BlockType
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
 from src.types.lines import Lines
-from src.utils import to_snake_case
 
 
 @dataclass(frozen=True)
 class GenerateImportStatementService:
-    moved_files: list[File]
-    init_file: File
-    exclude_file: Optional[File] = None
+    symbol_table: SymbolTable
+    file: File
+    # Module each top-level name of the original file can be imported from after the split
+    name_modules: dict[str, str]
+    # How many packages deeper than the original file the file is placed
+    level_offset: int = 0
 
+    @instrumented
     def execute(self) -> Lines:
-        # Generate import statements for moved and non-moved blocks
-        new_dir_path = str(self.init_file.path.parent).replace("/", ".")
-        import_statement = []
+        # Generate import statements only for the names the blocks of the file actually reference
+        defined_names = set().union(*[self.symbol_table.defines.get(block, ()) for block in self.file.blocks])
+        used_names = set().union(*[self.symbol_table.uses.get(block, ()) for block in self.file.blocks])
+        used_names -= defined_names
+        annotation_names = set().union(
+            *[self.symbol_table.annotation_uses.get(block, ()) for block in self.file.blocks]
+        )
+        annotation_names -= defined_names | used_names
         # Add import statements from the original file
-        for non_moved_block in filter(lambda block: block.type == BlockType.IMPORT, self.init_file.blocks):
-            import_statement += non_moved_block.lines
-        # Add import statements for moved blocks
-        for moved_file in filter(lambda file: file != self.exclude_file, self.moved_files):
-            for block in moved_file.blocks:
-                import_statement.append(f"from {new_dir_path}.{to_snake_case(block.name)} import {block.name}\n")
-        # Add import statements for non-moved blocks
-        for non_moved_block in filter(
-            lambda block: block.type not in [BlockType.IMPORT, BlockType.OTHER], self.init_file.blocks
-        ):
-            import_statement.append(f"from {new_dir_path} import {non_moved_block.name}\n")
+        # NOTE: Those only annotations use stay at runtime, as the original file paid for them anyway
+        imported_names = list(self.symbol_table.global_imports)
+        pending_names = used_names | annotation_names
+        while pending_names:
+            new_names = set()
+            for name in pending_names:
+                if name not in self.name_modules:
+                    imported_names += self.symbol_table.imports.get(name, [])
+                    # NOTE: A copied conditional import block needs the names it uses too, e.g. TYPE_CHECKING
+                    for imported_name in self.symbol_table.imports.get(name, []):
+                        if isinstance(imported_name, ConditionalImport):
+                            new_names |= imported_name.uses
+            pending_names = new_names - used_names - annotation_names - defined_names
+            used_names |= pending_names
+        annotation_names -= used_names
+        # NOTE: The names bound by the same conditional import block share its position, and the block is copied once
+        imported_names = list({imported_name.position: imported_name for imported_name in imported_names}.values())
+        imported_names.sort(key=lambda imported_name: (not imported_name.is_future, imported_name.position))
+        import_statement = [imported_name.statement(level_offset=self.level_offset) for imported_name in imported_names]
+        # Add import statements for moved and non-moved blocks
+        for module, name in sorted((self.name_modules[name], name) for name in used_names & self.name_modules.keys()):
+            import_statement.append(f"from {module} import {name}\n")
+        # Names only annotations use are imported for type checkers alone, which breaks the import cycles they made
+        annotation_names &= self.name_modules.keys()
+        if annotation_names:
+            bound_names = {imported_name.bound_name for imported_name in imported_names} | defined_names | used_names
+            if "TYPE_CHECKING" not in bound_names:
+                # NOTE: Type checkers treat any TYPE_CHECKING as true, without importing typing at runtime
+                import_statement.append("TYPE_CHECKING = False\n")
+            import_statement.append("if TYPE_CHECKING:\n")
+            for module, name in sorted((self.name_modules[name], name) for name in annotation_names):
+                import_statement.append(f"    from {module} import {name}\n")
         return import_statement
@@ -0,0 +1,155 @@
+import heapq
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
+from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
+from src.types.block_type import BlockType
+
+
+def strongly_connected_components(graph: list[list[int]]) -> list[list[int]]:
+    """Tarjan's algorithm, without recursion so that long chains of references don't hit the recursion limit"""
+    index_of, low_link = [-1] * len(graph), [0] * len(graph)
+    on_stack, stack, components = [False] * len(graph), [], []
+    counter = 0
+    for root in range(len(graph)):
+        if index_of[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge_index = work.pop()
+            if edge_index == 0:
+                index_of[node] = low_link[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            elif edge_index <= len(graph[node]):
+                # Returning from the previous successor
+                low_link[node] = min(low_link[node], low_link[graph[node][edge_index - 1]])
+            while edge_index < len(graph[node]):
+                successor = graph[node][edge_index]
+                edge_index += 1
+                if index_of[successor] == -1:
+                    work.append((node, edge_index))
+                    work.append((successor, 0))
+                    break
+                if on_stack[successor]:
+                    low_link[node] = min(low_link[node], index_of[successor])
+            else:
+                if low_link[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def pack(weights: list[int], capacity: int) -> list[list[int]]:
+    """Split the sequence into contiguous intervals of at most capacity (items heavier than it stand alone)"""
+    intervals, weight = [], 0
+    for index, item_weight in enumerate(weights):
+        if not intervals or weight + item_weight > capacity:
+            intervals.append([])
+            weight = 0
+        intervals[-1].append(index)
+        weight += item_weight
+    return intervals
+
+
+@dataclass(frozen=True)
+class GroupBlocksService:
+    """Place the blocks to move into shared modules along their references, instead of one module per block"""
+
+    original_file: File
+    target_block_types: list[BlockType]
+    symbol_table: SymbolTable
+    # Budgets of the packing. 0 means no limit. Without either, each group of mutually dependent blocks is a module
+    max_lines: int = 0
+    max_modules: int = 0
+    # Values smaller than this many bytes stay in the original file
+    min_value_size: int = 0
+
+    def _capacity(self, weights: list[int]) -> int:
+        if not self.max_modules or not weights:
+            return self.max_lines
+        # The smallest capacity that fits in max_modules. It wins over max_lines when both can't be met
+        low, high = max(weights), sum(weights)
+        while low < high:
+            middle = (low + high) // 2
+            if len(pack(weights, middle)) <= self.max_modules:
+                high = middle
+            else:
+                low = middle + 1
+        return max(self.max_lines, low)
+
+    @instrumented
+    def execute(self) -> dict[Block, Path]:
+        """Return the path of the module each block to move goes to"""
+        new_dir_path = self.original_file.path.parent / self.original_file.path.stem
+        blocks = [
+            block
+            for block in self.original_file.blocks
+            if MoveBlocksToNewFilesService.is_target(block, self.target_block_types, self.min_value_size)
+        ]
+
+        # 1. Reference graph: each block points to the blocks defining the names it uses
+        definers: dict[str, list[int]] = {}
+        for index, block in enumerate(blocks):
+            for name in self.symbol_table.defines.get(block, ()):
+                definers.setdefault(name, []).append(index)
+        graph = [
+            sorted(
+                {
+                    definer
+                    for name in self.symbol_table.uses.get(block, ())
+                    for definer in definers.get(name, ())
+                    if definer != index
+                }
+            )
+            for index, block in enumerate(blocks)
+        ]
+
+        # 2. Mutually dependent blocks must share a module, or their modules would import each other
+        components = strongly_connected_components(graph)
+        component_of = [0] * len(blocks)
+        for component_index, component in enumerate(components):
+            for index in component:
+                component_of[index] = component_index
+
+        # 3. Order the components so that a module only imports from the modules before it.
+        #    Ties are broken by the position in the original file, to keep neighbouring blocks together
+        dependents: list[set[int]] = [set() for _ in components]
+        dependency_counts = [0] * len(components)
+        for index, successors in enumerate(graph):
+            for successor in {component_of[successor] for successor in successors} - {component_of[index]}:
+                if component_of[index] not in dependents[successor]:
+                    dependents[successor].add(component_of[index])
+                    dependency_counts[component_of[index]] += 1
+        ready = [(component[0], component_index) for component_index, component in enumerate(components)]
+        ready = [item for item in ready if not dependency_counts[item[1]]]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, component_index = heapq.heappop(ready)
+            order.append(component_index)
+            for dependent in dependents[component_index]:
+                dependency_counts[dependent] -= 1
+                if not dependency_counts[dependent]:
+                    heapq.heappush(ready, (components[dependent][0], dependent))
+
+        # 4. Pack contiguous runs of that order, so the modules can't import each other in a cycle either
+        weights = [sum(blocks[index].line_count for index in components[component_index]) for component_index in order]
+        block_paths = {}
+        for interval in pack(weights, self._capacity(weights)):
+            group = sorted(index for position in interval for index in components[order[position]])
+            # NOTE: A module is named after its first block, so a block that stands alone keeps its usual module
+            path = new_dir_path / blocks[group[0]].file_name
+            block_paths.update((blocks[index], path) for index in group)
+        return block_paths
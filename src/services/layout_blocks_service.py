@@ -0,0 +1,97 @@
+import keyword
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.instrumentation import instrumented
+from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
+from src.types.block_type import BlockType
+from src.types.layout_type import LayoutType
+
+PREFIX_LENGTH = 2
+TYPE_DIR_NAMES = {
+    BlockType.IMPORT: "imports",
+    BlockType.FUNCTION: "functions",
+    BlockType.CLASS: "classes",
+    BlockType.VALUE: "values",
+    BlockType.TYPE_ALIAS: "type_aliases",
+    BlockType.CONDITIONAL_IMPORT: "conditional_imports",
+    BlockType.COMMENT: "comments",
+    BlockType.OTHER: "others",
+}
+
+
+def _prefix(stem: str) -> str:
+    """The name of the subpackage of a module with the PREFIX layout"""
+    prefix = (stem.lstrip("_") or stem)[:PREFIX_LENGTH].lower()
+    if not prefix.isidentifier():
+        # e.g. `_1st` or `__`
+        prefix = "_" + prefix
+    return prefix + "_" if keyword.iskeyword(prefix) else prefix
+
+
+def _unique(name: str, is_taken: Callable[[str], bool]) -> str:
+    unique, number = name, 1
+    while is_taken(unique):
+        number += 1
+        unique = f"{name}_{number}"
+    return unique
+
+
+@dataclass(frozen=True)
+class LayoutBlocksService:
+    """Choose the path of the module of each block to move. Blocks of the same name share a module, and the
+    modules of different names never collide, even on case-insensitive file systems: later ones get a suffix"""
+
+    original_file: File
+    target_block_types: list[BlockType]
+    layout_type: LayoutType = LayoutType.FLAT
+    # Values smaller than this many bytes stay in the original file
+    min_value_size: int = 0
+    # The modules GroupBlocksService put the blocks in, to keep them together
+    block_groups: Optional[dict[Block, Path]] = None
+    # The names the original file binds. Importing a submodule binds its name in the package, so the subpackages
+    # and top-level modules must not be named after them, except for the modules of the blocks defining them
+    bound_names: frozenset[str] = frozenset()
+
+    def _dir_name(self, block: Block, stem: str) -> Optional[str]:
+        if self.layout_type == LayoutType.PREFIX:
+            dir_name = _prefix(stem)
+        elif self.layout_type == LayoutType.BY_TYPE:
+            dir_name = TYPE_DIR_NAMES[block.type]
+        else:
+            return None
+        return _unique(dir_name, lambda name: name in self.bound_names)
+
+    @staticmethod
+    def package_files(dir_path: Path, paths: Iterable[Path]) -> list[File]:
+        """The empty __init__.py files of the subpackages of dir_path the paths are in"""
+        package_paths = {
+            parent / "__init__.py" for path in paths for parent in path.parents if dir_path in parent.parents
+        }
+        return [File(path=path, blocks=[]) for path in sorted(package_paths)]
+
+    @instrumented
+    def execute(self) -> dict[Block, Path]:
+        """Return the path of the module each block to move goes to"""
+        new_dir_path = self.original_file.path.parent / self.original_file.path.stem
+        # The blocks of each module, in the order of their first block in the original file
+        modules: dict[object, list[Block]] = {}
+        for block in self.original_file.blocks:
+            if MoveBlocksToNewFilesService.is_target(block, self.target_block_types, self.min_value_size):
+                key = self.block_groups[block] if self.block_groups else block.name
+                modules.setdefault(key, []).append(block)
+
+        block_paths = {}
+        taken_names = set()
+        for blocks in modules.values():
+            stem = self.block_groups[blocks[0]].stem if self.block_groups else Path(blocks[0].file_name).stem
+            dir_name = self._dir_name(blocks[0], stem)
+            dir_path = new_dir_path / dir_name if dir_name else new_dir_path
+            shadowed_names = set() if dir_name else self.bound_names - {block.name for block in blocks}
+            name = _unique(stem, lambda name: (dir_path, name.casefold()) in taken_names or name in shadowed_names)
+            taken_names.add((dir_path, name.casefold()))
+            block_paths.update((block, dir_path / f"{name}.py") for block in blocks)
+        return block_paths
@@ -1,80 +1,191 @@
 import ast
-import re
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator, Optional
 
+from src import instrumentation
 from src.entities.block import Block
 from src.entities.file import File
+from src.entities.imported_name import ImportedName
+from src.entities.source import Source
+from src.instrumentation import instrumented
+from src.services.scan_top_level_statements_service import (
+    ScanTopLevelStatementsService,
+    TopLevelStatement,
+)
 from src.types.block_type import BlockType
+from src.types.loader_type import LoaderType
 
+Classification = tuple[Optional[BlockType], Optional[str]]
 
-def ast2blocktype(node: ast.AST) -> BlockType:
-    if isinstance(node, ast.Import) or isinstance(node, ast.ImportFrom):
-        return BlockType.IMPORT
-    if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-        return BlockType.FUNCTION
-    if isinstance(node, ast.ClassDef):
-        return BlockType.CLASS
-    if isinstance(node, ast.Assign) or isinstance(node, ast.Constant):
-        return BlockType.VALUE
-    return BlockType.OTHER
+
+def _target_name(node: ast.expr) -> Optional[str]:
+    """The first name bound by an assignment target, e.g. `a` for `a, b.c = ...`"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Starred):
+        return _target_name(node.value)
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return next(filter(None, map(_target_name, node.elts)), None)
+    # Attributes and subscripts don't bind a name
+    return None
+
+
+def _dotted_name(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return value and f"{value}.{node.attr}"
+    return None
+
+
+def _child_statements(node: ast.stmt) -> Iterator[ast.stmt]:
+    # In source order
+    yield from getattr(node, "body", [])
+    for handler in getattr(node, "handlers", []):
+        yield from handler.body
+    yield from getattr(node, "orelse", [])
+    yield from getattr(node, "finalbody", [])
+
+
+_CONDITIONAL_NODE_TYPES = tuple(filter(None, (ast.If, ast.Try, getattr(ast, "TryStar", None))))
+
+
+def _is_import_only(node: ast.stmt) -> bool:
+    if isinstance(node, _CONDITIONAL_NODE_TYPES):
+        return all(map(_is_import_only, _child_statements(node)))
+    # NOTE: Assignments provide fallbacks, e.g. `except ImportError: json = None`
+    return isinstance(node, (ast.Import, ast.ImportFrom, ast.Assign, ast.Pass, ast.Raise))
+
+
+def _first_import(node: ast.stmt) -> Optional[ast.stmt]:
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return node
+    return next(filter(None, map(_first_import, _child_statements(node))), None)
+
+
+def _classify_definition(node: ast.stmt) -> Classification:
+    return (BlockType.CLASS if isinstance(node, ast.ClassDef) else BlockType.FUNCTION), node.name
+
+
+def _classify_assign(node: ast.Assign) -> Classification:
+    return BlockType.VALUE, next(filter(None, map(_target_name, node.targets)), None)
+
+
+def _classify_ann_assign(node: ast.AnnAssign) -> Classification:
+    annotation = _dotted_name(node.annotation) or ""
+    block_type = BlockType.TYPE_ALIAS if annotation.split(".")[-1] == "TypeAlias" else BlockType.VALUE
+    return block_type, _target_name(node.target)
+
+
+def _classify_conditional(node: ast.stmt) -> Classification:
+    import_node = _first_import(node)
+    if import_node is None or not _is_import_only(node):
+        return BlockType.OTHER, None
+    alias = import_node.names[0]
+    bound_name = ImportedName(0, isinstance(import_node, ast.ImportFrom), None, alias.name, alias.asname).bound_name
+    return BlockType.CONDITIONAL_IMPORT, None if bound_name == "*" else bound_name
+
+
+def _classify_expression(node: ast.Expr) -> Classification:
+    # NOTE: Strings are comments, folded into the next block
+    if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+        return None, None
+    return BlockType.OTHER, None
+
+
+# How each kind of top-level statement becomes a block: (block type, or None to fold it into the next block; name)
+_CLASSIFIERS: dict[type, Callable[[ast.stmt], Classification]] = {
+    ast.Import: lambda node: (BlockType.IMPORT, None),
+    ast.ImportFrom: lambda node: (BlockType.IMPORT, None),
+    ast.FunctionDef: _classify_definition,
+    ast.AsyncFunctionDef: _classify_definition,
+    ast.ClassDef: _classify_definition,
+    ast.Assign: _classify_assign,
+    ast.AnnAssign: _classify_ann_assign,
+    ast.Expr: _classify_expression,
+    **{node_type: _classify_conditional for node_type in _CONDITIONAL_NODE_TYPES},
+}
+if hasattr(ast, "TypeAlias"):
+    _CLASSIFIERS[ast.TypeAlias] = lambda node: (BlockType.TYPE_ALIAS, node.name.id)
+
+
+def classify(node: ast.stmt) -> Classification:
+    classifier = _CLASSIFIERS.get(type(node))
+    return classifier(node) if classifier else (BlockType.OTHER, None)
+
+
+def _ast_statements(source: Source) -> Iterator[TopLevelStatement]:
+    tree = ast.parse(source.data)
+    return ((*classify(node), node.end_lineno) for node in tree.body)
 
 
 @dataclass(frozen=True)
 class LoadFileService:
     file_path: Path
+    loader_type: LoaderType = LoaderType.AUTO
+    # Files larger than this (in bytes) are loaded with the tokenize loader in the auto mode
+    tokenize_threshold: int = 4 * 1024 * 1024
+    # Content of the file when it has already been read
+    source_data: Optional[bytes] = None
 
     class ParseError(Exception):
         pass
 
+    def _statements(self, source: Source) -> Iterator[TopLevelStatement]:
+        loader_type = self.loader_type
+        if loader_type == LoaderType.AUTO and len(source.data) > self.tokenize_threshold:
+            loader_type = LoaderType.TOKENIZE
+        if loader_type == LoaderType.TOKENIZE:
+            return ScanTopLevelStatementsService(source=source).execute()
+        try:
+            return _ast_statements(source)
+        except SyntaxError as e:
+            if loader_type == LoaderType.AST:
+                raise
+            print(f"Warning: {self.file_path} can't be parsed by this interpreter ({e}). Using the tokenize loader.")
+            return ScanTopLevelStatementsService(source=source).execute()
+
+    @instrumented
     def execute(self) -> File:
         """Read the file and split it into classes, functions, and others"""
-        assert self.file_path.is_file(), f"Error: File '{self.file_path}' does not exist."
-        with self.file_path.open(mode="r") as file:
-            lines = file.readlines()
+        source_data = self.source_data
+        if source_data is None:
+            assert self.file_path.is_file(), f"Error: File '{self.file_path}' does not exist."
+            source_data = self.file_path.read_bytes()
+            instrumentation.count_read(source_data)
+        source = Source.from_bytes(source_data)
         blocks: list[Block] = []
-        tree = ast.parse("".join(lines))
         number = 0
-        for node in ast.iter_child_nodes(tree):
-            if not isinstance(
-                node,
-                (
-                    ast.AsyncFunctionDef,
-                    ast.FunctionDef,
-                    ast.ClassDef,
-                    ast.Module,
-                    ast.Import,
-                    ast.ImportFrom,
-                    ast.Assign,
-                    ast.Constant,
-                ),
-            ):
-                continue
-            if name := getattr(node, "name", None):
-                pass
-            elif isinstance(node, ast.Assign) or isinstance(node, ast.Constant):
-                pattern = re.compile(r"^([a-zA-Z_][a-zA-Z0-9_]*)\s*=")
-                for line in lines[number : node.end_lineno]:
-                    if match := pattern.match(line):
-                        name = match and match.groups()[0]
-            if name is None:
-                name = "other"
-            blocks.append(
-                Block(
-                    lines=lines[number : node.end_lineno],
-                    name=name,
-                    type=ast2blocktype(node=node),
+        try:
+            for block_type, name, end_lineno in self._statements(source):
+                if block_type is None:
+                    continue
+                if name is None:
+                    name = "other"
+                blocks.append(
+                    Block(
+                        type=block_type,
+                        name=name,
+                        source=source,
+                        start=number,
+                        end=end_lineno,
+                    )
                 )
-            )
-            number = node.end_lineno
-        if number < len(lines):
+                number = end_lineno
+        except SyntaxError as e:
+            raise LoadFileService.ParseError(f"Error: Failed to parse '{self.file_path}'. {e}") from e
+        if number < source.line_count:
             blocks.append(
                 Block(
-                    lines=lines[number:],
-                    name="other",
                     type=BlockType.OTHER,
+                    name="other",
+                    source=source,
+                    start=number,
+                    end=source.line_count,
                 )
             )
         # Check if the total number of lines in the split blocks matches the original number of lines
-        assert len(lines) == sum([len(block.lines) for block in blocks])
+        assert source.line_count == sum([block.line_count for block in blocks])
         return File(path=self.file_path, blocks=blocks)
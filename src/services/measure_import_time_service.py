@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+
+from src import instrumentation
+from src.entities.import_time_report import ImportRun, ImportTime
+from src.instrumentation import instrumented
+
+_IMPORT_TIME_PREFIX = "import time:"
+
+
+def parse_import_times(text: str) -> ImportRun:
+    """Parse the `-X importtime` output of one run"""
+    run = {}
+    # NOTE: A module is printed after the modules it imports, which are indented one more level
+    pending: list[tuple[int, str]] = []
+    for line in text.splitlines():
+        if not line.startswith(_IMPORT_TIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(_IMPORT_TIME_PREFIX) :].split("|", 2)
+        if not self_us.strip().isdigit():
+            # The header line
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        while pending and pending[-1][0] > depth:
+            _, child = pending.pop()
+            run[child] = ImportTime(self_us=run[child].self_us, cumulative_us=run[child].cumulative_us, parent=name)
+        run[name] = ImportTime(self_us=int(self_us), cumulative_us=int(cumulative_us), parent=None)
+        pending.append((depth, name))
+    return run
+
+
+@dataclass(frozen=True)
+class MeasureImportTimeService:
+    """Import a module in fresh interpreters with `-X importtime`, from the current directory"""
+
+    class FailedImportError(Exception):
+        pass
+
+    module_name: str
+    repeat: int
+
+    def _run(self, env: dict[str, str]) -> ImportRun:
+        command = [sys.executable, "-X", "importtime", "-c", f"import {self.module_name}"]
+        with instrumentation.span("subprocess"):
+            result = subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            error_lines = [line for line in result.stderr.splitlines() if not line.startswith(_IMPORT_TIME_PREFIX)]
+            raise MeasureImportTimeService.FailedImportError(
+                f"Error: Failed to import '{self.module_name}'.\n" + "\n".join(error_lines)
+            )
+        return parse_import_times(result.stderr)
+
+    @instrumented
+    def execute(self) -> list[ImportRun]:
+        # NOTE: The bytecode is cached in a temporary directory, to leave the working tree clean
+        with tempfile.TemporaryDirectory(prefix="split-pycache-") as temp_dir_path:
+            env = {**os.environ, "PYTHONPYCACHEPREFIX": temp_dir_path}
+            env.pop("PYTHONDONTWRITEBYTECODE", None)
+            # NOTE: The first run only compiles the bytecode, so that every measured run loads it from the cache
+            self._run(env)
+            return [self._run(env) for _ in range(self.repeat)]
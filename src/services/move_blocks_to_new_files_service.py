@@ -1,7 +1,10 @@
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Callable, Optional, Tuple
 
+from src.entities.block import Block
 from src.entities.file import File
+from src.instrumentation import instrumented
 from src.types.block_type import BlockType
 
 
@@ -10,28 +13,38 @@ class MoveBlocksToNewFilesService:
     original_file: File
     target_block_types: list[BlockType]
     handler_for_each_move: Optional[Callable] = None
+    # Path of the module each block goes to, when several blocks share one. A module per block by default
+    block_paths: Optional[dict[Block, Path]] = None
+    # Values smaller than this many bytes stay in the original file
+    min_value_size: int = 0
 
+    @staticmethod
+    def is_target(block: Block, target_block_types: list[BlockType], min_value_size: int = 0) -> bool:
+        if block.type.value not in target_block_types:
+            return False
+        return block.type != BlockType.VALUE or len(block.data) >= min_value_size
+
+    @instrumented
     def execute(self) -> Tuple[File, list[File]]:
-        # Move each class (function) from the input file to individual new files
-        # Create new Module Directory
+        # Move each class (function) from the input file to individual new files in memory
         new_dir_path = self.original_file.path.parent / self.original_file.path.stem
-        new_dir_path.mkdir(parents=True, exist_ok=True)
-        new_files = []
+        new_files: dict[Path, File] = {}
         skipped_blocks = []
 
-        blocks = self.original_file.blocks
+        blocks = list(self.original_file.blocks)
         while blocks:
             block = blocks.pop()
-            if block.type.value not in self.target_block_types:
+            if not self.is_target(block, self.target_block_types, self.min_value_size):
                 skipped_blocks.append(block)
                 continue
             # Create the destination file
-            new_file = File(path=new_dir_path / block.file_name, blocks=[block])
-            old_file = File(path=self.original_file.path, blocks=blocks + list(reversed(skipped_blocks)))
-            new_files.append(new_file)
-            # Write
-            new_file.write()
-            old_file.write()
+            path = (self.block_paths or {}).get(block) or new_dir_path / block.file_name
+            # NOTE: Blocks are moved from the bottom, so a block goes before those already moved to the same file
+            new_file = File(path=path, blocks=[block, *(new_files[path].blocks if path in new_files else [])])
+            new_files[path] = new_file
             if self.handler_for_each_move:
+                # NOTE: The snapshot of the original file is only built when someone needs it
+                old_file = File(path=self.original_file.path, blocks=blocks + list(reversed(skipped_blocks)))
                 self.handler_for_each_move(new_file=new_file, old_file=old_file, block=block)
-        return old_file, new_files
+        old_file = File(path=self.original_file.path, blocks=list(reversed(skipped_blocks)))
+        return old_file, list(new_files.values())
@@ -0,0 +1,109 @@
+import ast
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.instrumentation import instrumented
+from src.types.block_type import BlockType
+
+DATA_FILE_SUFFIX = ".json"
+
+# NOTE: The module is imported on first access of the value, so json is only imported then too. The loader of the
+# module reads the data file, so that it is found in a zip archive as well
+LOADER = """import json as _json
+import os as _os
+
+{target} = _json.loads(__spec__.loader.get_data(_os.path.join(_os.path.dirname(__file__), {data_file_name!r})))
+"""
+
+
+def _is_json(value: Any) -> bool:
+    """Whether JSON gives back an equal value of the same types, e.g. not for tuples or int keys"""
+    if value is None or isinstance(value, (str, int)):
+        return True
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, list):
+        return all(_is_json(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json(item) for key, item in value.items())
+    return False
+
+
+def _assignment(block: Block) -> Optional[ast.stmt]:
+    """The `NAME = literal` or `NAME: annotation = literal` statement of the block, after its folded strings"""
+    try:
+        statements = ast.parse(block.text).body
+    except SyntaxError:
+        return None
+    *strings, statement = statements or [None]
+    if not all(isinstance(string, ast.Expr) and isinstance(string.value, ast.Constant) for string in strings):
+        return None
+    if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+        target = statement.targets[0]
+    elif isinstance(statement, ast.AnnAssign) and statement.value is not None and statement.simple:
+        target = statement.target
+    else:
+        return None
+    # NOTE: The loader binds _data_file while reading the value
+    return statement if isinstance(target, ast.Name) and target.id != "_data_file" else None
+
+
+@dataclass(frozen=True)
+class OffloadValuesService:
+    """Store the moved values that are plain data in a JSON file next to their module, which reads it when imported.
+    The package imports such values on first access, so that importing it no longer builds them"""
+
+    # The moved files, before their import statements are attached
+    moved_files: list[File]
+
+    @staticmethod
+    def loader_file(file: File, data_file: File) -> File:
+        """The moved file with its import statements attached, reading the value from the data file"""
+        *import_blocks, block = file.blocks
+        statement = _assignment(block)
+        target = statement.target.id if isinstance(statement, ast.AnnAssign) else statement.targets[0].id
+        if isinstance(statement, ast.AnnAssign):
+            target += ": " + ast.get_source_segment(block.text, statement.annotation)
+        lines = LOADER.format(data_file_name=data_file.path.name, target=target).splitlines(keepends=True)
+        blocks = [*import_blocks]
+        if statement.lineno > 1:
+            # The comments and strings before the value
+            blocks.append(
+                Block(
+                    type=BlockType.OTHER,
+                    name="other",
+                    source=block.source,
+                    start=block.start,
+                    end=block.start + statement.lineno - 1,
+                )
+            )
+        blocks.append(Block.from_lines(type=BlockType.VALUE, name=block.name, lines=lines))
+        return File(path=file.path, blocks=blocks)
+
+    @instrumented
+    def execute(self) -> dict[Path, File]:
+        """Return the data file of each moved file holding a single such value, by the path of the moved file"""
+        data_files = {}
+        for file in self.moved_files:
+            if len(file.blocks) != 1 or file.blocks[0].type != BlockType.VALUE:
+                continue
+            statement = _assignment(file.blocks[0])
+            if statement is None:
+                continue
+            try:
+                value = ast.literal_eval(statement.value)
+                if not _is_json(value):
+                    continue
+                text = json.dumps(value, indent=2) + "\n"
+            except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                continue
+            data_files[file.path] = File(
+                path=file.path.with_suffix(DATA_FILE_SUFFIX),
+                blocks=[Block.from_lines(type=BlockType.OTHER, name="other", lines=text.splitlines(keepends=True))],
+            )
+        return data_files
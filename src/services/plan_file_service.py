@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src import instrumentation
+from src.entities.split_plan import SplitPlan
+from src.instrumentation import instrumented
+from src.plan_cache import PlanCache
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.types.block_type import BlockType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+
+
+@dataclass(frozen=True)
+class PlanFileService:
+    file_path: Path
+    target_block_types: list[BlockType]
+    loader_type: LoaderType = LoaderType.AUTO
+    cache: Optional[PlanCache] = None
+    lazy_init: bool = False
+    group: bool = False
+    max_lines: int = 0
+    max_modules: int = 0
+    min_value_size: int = 0
+    value_sidecars: bool = False
+    layout_type: LayoutType = LayoutType.FLAT
+    type_checking_imports: bool = False
+    # Content of the file, when the caller has already read it
+    source_data: Optional[bytes] = None
+
+    def _plan(self, source_data: Optional[bytes] = None) -> SplitPlan:
+        original_file = LoadFileService(
+            file_path=self.file_path, loader_type=self.loader_type, source_data=source_data
+        ).execute()
+        return PlanSplitService(
+            original_file=original_file,
+            target_block_types=self.target_block_types,
+            lazy_init=self.lazy_init,
+            group=self.group,
+            max_lines=self.max_lines,
+            max_modules=self.max_modules,
+            min_value_size=self.min_value_size,
+            value_sidecars=self.value_sidecars,
+            layout_type=self.layout_type,
+            type_checking_imports=self.type_checking_imports,
+        ).execute()
+
+    @instrumented
+    def execute(self) -> SplitPlan:
+        """Load and plan the file, or reuse the plan cached for the same content and options"""
+        if self.cache is None:
+            return self._plan(source_data=self.source_data)
+        source_data = self.source_data
+        if source_data is None:
+            assert self.file_path.is_file(), f"Error: File '{self.file_path}' does not exist."
+            source_data = self.file_path.read_bytes()
+            instrumentation.count_read(source_data)
+        key = self.cache.key(
+            source_data,
+            str(self.file_path),
+            list(self.target_block_types),
+            self.loader_type.value,
+            self.lazy_init,
+            (self.group, self.max_lines, self.max_modules),
+            (self.min_value_size, self.value_sidecars),
+            self.layout_type.value,
+            self.type_checking_imports,
+        )
+        plan = self.cache.get(key)
+        if plan is None:
+            plan = self._plan(source_data=source_data)
+            self.cache.put(key, plan)
+        return plan
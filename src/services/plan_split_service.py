@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+
+from src.entities.file import File
+from src.entities.split_plan import SplitPlan
+from src.instrumentation import instrumented
+from src.services.analyze_symbols_service import AnalyzeSymbolsService
+from src.services.attach_import_statements_service import AttachImportStatementsService
+from src.services.build_split_manifest_service import BuildSplitManifestService
+from src.services.group_blocks_service import GroupBlocksService
+from src.services.layout_blocks_service import LayoutBlocksService
+from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
+from src.services.offload_values_service import OffloadValuesService
+from src.services.update_init_file_service import UpdateInitFileService
+from src.types.block_type import BlockType
+from src.types.layout_type import LayoutType
+
+
+@dataclass(frozen=True)
+class PlanSplitService:
+    original_file: File
+    target_block_types: list[BlockType]
+    lazy_init: bool = False
+    # Group mutually dependent blocks into shared modules, and pack the rest under the budgets (0 for no limit)
+    group: bool = False
+    max_lines: int = 0
+    max_modules: int = 0
+    # Leave the values smaller than this many bytes in __init__.py
+    min_value_size: int = 0
+    # Store the moved values that are plain data in JSON files, read on first access
+    value_sidecars: bool = False
+    # How the modules are placed in the new package
+    layout_type: LayoutType = LayoutType.FLAT
+    # Import the names only annotations use under `if TYPE_CHECKING:`
+    type_checking_imports: bool = False
+
+    @instrumented
+    def execute(self) -> SplitPlan:
+        """Compute the final content of every output file without touching the filesystem"""
+        # 1. Analyze which names each block defines and uses, once for the whole split
+        symbol_table = AnalyzeSymbolsService(
+            file=self.original_file, type_checking_imports=self.type_checking_imports
+        ).execute()
+
+        # 2. Move class and function definitions from the original file to new files
+        block_groups = None
+        if self.group:
+            block_groups = GroupBlocksService(
+                original_file=self.original_file,
+                target_block_types=self.target_block_types,
+                symbol_table=symbol_table,
+                max_lines=self.max_lines,
+                max_modules=self.max_modules,
+                min_value_size=self.min_value_size,
+            ).execute()
+        block_paths = LayoutBlocksService(
+            original_file=self.original_file,
+            target_block_types=self.target_block_types,
+            layout_type=self.layout_type,
+            min_value_size=self.min_value_size,
+            block_groups=block_groups,
+            bound_names=symbol_table.bound_names(),
+        ).execute()
+        residual_file, moved_files = MoveBlocksToNewFilesService(
+            original_file=self.original_file,
+            target_block_types=self.target_block_types,
+            block_paths=block_paths,
+            min_value_size=self.min_value_size,
+        ).execute()
+
+        # 3. The rest of the original file becomes __init__.py
+        init_file_path = self.original_file.path.parent / self.original_file.path.stem / "__init__.py"
+        residual_file = File(path=init_file_path, blocks=residual_file.blocks)
+
+        # 4. Resolve the module each top-level name can be imported from after the split
+        name_modules = symbol_table.name_modules([residual_file, *moved_files])
+
+        # 5. Attach import statements for moved files to the __init__.py file
+        ## sort by block type and block name
+        moved_files = sorted(moved_files, key=lambda file: (file.blocks[0].type.value, file.blocks[0].name))
+        data_files = OffloadValuesService(moved_files=moved_files).execute() if self.value_sidecars else {}
+        init_file = UpdateInitFileService(
+            init_file=residual_file,
+            moved_files=moved_files,
+            symbol_table=symbol_table,
+            name_modules=name_modules,
+            lazy_init=self.lazy_init,
+            lazy_value_names=symbol_table.defined_names([file for file in moved_files if file.path in data_files]),
+        ).execute()
+
+        # 6. Record what was moved where, for later resyncs
+        split_manifest_file = BuildSplitManifestService(
+            original_file=self.original_file,
+            target_block_types=self.target_block_types,
+            residual_file=residual_file,
+            moved_files=moved_files,
+            symbol_table=symbol_table,
+            lazy_init=self.lazy_init,
+            group=self.group,
+            max_lines=self.max_lines,
+            max_modules=self.max_modules,
+            min_value_size=self.min_value_size,
+            value_sidecars=self.value_sidecars,
+            layout_type=self.layout_type,
+            type_checking_imports=self.type_checking_imports,
+            data_file_paths=tuple(file.path for file in data_files.values()),
+            init_file=init_file,
+        ).execute()
+
+        # 7. Attach import statements to each moved file, and make the offloaded values read their data files
+        moved_files = AttachImportStatementsService(
+            moved_files=moved_files,
+            init_file=residual_file,
+            symbol_table=symbol_table,
+            name_modules=name_modules,
+        ).execute()
+        moved_files = [
+            OffloadValuesService.loader_file(file, data_files[file.path]) if file.path in data_files else file
+            for file in moved_files
+        ]
+
+        return SplitPlan(
+            original_file=self.original_file,
+            target_block_types=self.target_block_types,
+            residual_file=residual_file,
+            init_file=init_file,
+            moved_files=moved_files,
+            symbol_table=symbol_table,
+            split_manifest_file=split_manifest_file,
+            min_value_size=self.min_value_size,
+            data_files=list(data_files.values()),
+            package_files=LayoutBlocksService.package_files(init_file_path.parent, [file.path for file in moved_files]),
+        )
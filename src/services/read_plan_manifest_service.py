@@ -0,0 +1,75 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from src import instrumentation
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.plan_manifest import PlanManifest
+from src.entities.source import Source
+from src.entities.split_plan import SplitPlan
+from src.instrumentation import instrumented
+from src.services.write_plan_manifest_service import MANIFEST_VERSION
+from src.types.block_type import BlockType
+
+
+@dataclass(frozen=True)
+class ReadPlanManifestService:
+    manifest_path: Path
+
+    class StaleManifestError(Exception):
+        pass
+
+    @staticmethod
+    def _block_from_dict(data: dict, source: Source) -> Block:
+        if "text" in data:
+            return Block.from_lines(type=BlockType(data["type"]), name=data["name"], lines=[data["text"]])
+        start, end = data["lines"]
+        return Block(type=BlockType(data["type"]), name=data["name"], source=source, start=start, end=end)
+
+    def _file_from_dict(self, data: dict, source: Source) -> File:
+        file = File(path=Path(data["path"]), blocks=[self._block_from_dict(block, source) for block in data["blocks"]])
+        if hashlib.sha256(file.render_bytes()).hexdigest() != data["sha256"]:
+            raise ReadPlanManifestService.StaleManifestError(f"Error: The content of '{file.path}' doesn't match.")
+        return file
+
+    @instrumented
+    def execute(self) -> PlanManifest:
+        """Read the plans back, checking that every source file is still the one that was planned"""
+        manifest_data = self.manifest_path.read_bytes()
+        instrumentation.count_read(manifest_data)
+        data = json.loads(manifest_data)
+        assert data["version"] == MANIFEST_VERSION, f"Error: Unsupported manifest version {data['version']}."
+        plans = []
+        for plan in data["plans"]:
+            source_path = Path(plan["source"]["path"])
+            assert source_path.is_file(), f"Error: File '{source_path}' does not exist."
+            source_data = source_path.read_bytes()
+            instrumentation.count_read(source_data)
+            if hashlib.sha256(source_data).hexdigest() != plan["source"]["sha256"]:
+                raise ReadPlanManifestService.StaleManifestError(
+                    f"Error: '{source_path}' has changed since the plan was made. Please plan again."
+                )
+            source = Source(data=source_data, encoding=plan["source"]["encoding"])
+            original_file = File(
+                path=source_path, blocks=[self._block_from_dict(block, source) for block in plan["source"]["blocks"]]
+            )
+            plans.append(
+                SplitPlan(
+                    original_file=original_file,
+                    target_block_types=plan["target_block_types"],
+                    residual_file=self._file_from_dict(plan["residual_file"], source),
+                    init_file=self._file_from_dict(plan["init_file"], source),
+                    moved_files=[self._file_from_dict(file, source) for file in plan["moved_files"]],
+                    split_manifest_file=(
+                        self._file_from_dict(plan["split_manifest_file"], source)
+                        if plan.get("split_manifest_file")
+                        else None
+                    ),
+                    min_value_size=plan.get("min_value_size", 0),
+                    data_files=[self._file_from_dict(file, source) for file in plan.get("data_files", [])],
+                    package_files=[self._file_from_dict(file, source) for file in plan.get("package_files", [])],
+                )
+            )
+        return PlanManifest(branch_name=data["branch_name"], plans=plans)
@@ -0,0 +1,236 @@
+import hashlib
+from dataclasses import dataclass
+
+from src.entities.file import File
+from src.entities.resync_plan import ResyncPlan
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
+from src.services.analyze_symbols_service import AnalyzeSymbolsService
+from src.services.attach_import_statements_service import AttachImportStatementsService
+from src.services.build_split_manifest_service import BuildSplitManifestService
+from src.services.group_blocks_service import GroupBlocksService
+from src.services.layout_blocks_service import LayoutBlocksService
+from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
+from src.services.offload_values_service import OffloadValuesService
+from src.services.update_init_file_service import UpdateInitFileService
+from src.types.layout_type import LayoutType
+from src.utils import to_module_name
+
+
+def _imports_by_name(split_manifest: dict) -> dict[str, list[str]]:
+    imports = {}
+    for bound_name, statement in split_manifest["imports"]:
+        imports.setdefault(bound_name, []).append(statement)
+    return imports
+
+
+@dataclass(frozen=True)
+class ResyncSplitService:
+    # The new version of the original file, and the manifest recorded when it was split
+    original_file: File
+    split_manifest: dict
+
+    def _recorded_name_modules(self, dir_path, init_file_path) -> dict[str, str]:
+        name_modules = dict.fromkeys(self.split_manifest["residual_defines"], to_module_name(init_file_path))
+        for recorded_file in self.split_manifest["moved_files"]:
+            module_name = to_module_name(dir_path / recorded_file["path"])
+            for recorded_block in recorded_file["blocks"]:
+                name_modules.update(dict.fromkeys(recorded_block["defines"], module_name))
+        return name_modules
+
+    def _dirty_names(self, new_split_manifest: dict) -> set[str]:
+        """Names whose import statement in a moved file may differ from the recorded one"""
+        old_imports, new_imports = _imports_by_name(self.split_manifest), _imports_by_name(new_split_manifest)
+        dirty_names = {
+            name for name in old_imports.keys() | new_imports.keys() if old_imports.get(name) != new_imports.get(name)
+        }
+        # NOTE: Import statements are sorted by their position in the original file
+        old_pairs = [tuple(pair) for pair in self.split_manifest["imports"]]
+        new_pairs = [tuple(pair) for pair in new_split_manifest["imports"]]
+        common_pairs = set(old_pairs) & set(new_pairs)
+        old_pairs = [pair for pair in old_pairs if pair in common_pairs]
+        new_pairs = [pair for pair in new_pairs if pair in common_pairs]
+        if old_pairs != new_pairs:
+            dirty_names |= old_imports.keys() | new_imports.keys()
+        return dirty_names
+
+    @instrumented
+    def execute(self) -> ResyncPlan:
+        """Plan the regeneration of the moved files whose block or imports changed since the recorded split"""
+        target_block_types = self.split_manifest["target_block_types"]
+        lazy_init = self.split_manifest.get("lazy_init", False)
+        group = self.split_manifest.get("group", False)
+        max_lines, max_modules = self.split_manifest.get("max_lines", 0), self.split_manifest.get("max_modules", 0)
+        min_value_size = self.split_manifest.get("min_value_size", 0)
+        value_sidecars = self.split_manifest.get("value_sidecars", False)
+        layout_type = LayoutType(self.split_manifest.get("layout", LayoutType.FLAT.value))
+        type_checking_imports = self.split_manifest.get("type_checking_imports", False)
+        init_file_path = self.original_file.path.parent / self.original_file.path.stem / "__init__.py"
+        dir_path = init_file_path.parent
+
+        # 1. Reuse the recorded symbols of the unchanged moved blocks, and analyze only the others and the residual
+        # NOTE: The symbols of a block only depend on its content
+        recorded_blocks = {
+            recorded_block["sha256"]: recorded_block
+            for recorded_file in self.split_manifest["moved_files"]
+            for recorded_block in recorded_file["blocks"]
+        }
+        block_hashes = {}
+        defines, uses, annotation_uses, analyzed_blocks = {}, {}, {}, []
+        for block in self.original_file.blocks:
+            if block.type.value not in target_block_types:
+                analyzed_blocks.append(block)
+                continue
+            block_hashes[block] = hashlib.sha256(block.data).hexdigest()
+            recorded_block = recorded_blocks.get(block_hashes[block])
+            if recorded_block is None:
+                analyzed_blocks.append(block)
+                continue
+            defines[block] = frozenset(recorded_block["defines"])
+            uses[block] = frozenset(recorded_block["uses"])
+            if recorded_block.get("annotation_uses"):
+                annotation_uses[block] = frozenset(recorded_block["annotation_uses"])
+        analyzed = AnalyzeSymbolsService(
+            file=File(path=self.original_file.path, blocks=analyzed_blocks), type_checking_imports=type_checking_imports
+        ).execute()
+        if [imported_name.statement() for imported_name in analyzed.global_imports] != self.split_manifest[
+            "global_imports"
+        ]:
+            # NOTE: `from __future__ import annotations` changes which names the annotations use at runtime
+            defines, uses, annotation_uses = {}, {}, {}
+            analyzed = AnalyzeSymbolsService(
+                file=self.original_file, type_checking_imports=type_checking_imports
+            ).execute()
+        symbol_table = SymbolTable(
+            defines={**defines, **analyzed.defines},
+            uses={**uses, **analyzed.uses},
+            annotation_uses={**annotation_uses, **analyzed.annotation_uses},
+            imports=analyzed.imports,
+            global_imports=analyzed.global_imports,
+        )
+
+        # 2. Move the blocks in memory, as the split did
+        block_groups = None
+        if group:
+            block_groups = GroupBlocksService(
+                original_file=self.original_file,
+                target_block_types=target_block_types,
+                symbol_table=symbol_table,
+                max_lines=max_lines,
+                max_modules=max_modules,
+                min_value_size=min_value_size,
+            ).execute()
+        block_paths = LayoutBlocksService(
+            original_file=self.original_file,
+            target_block_types=target_block_types,
+            layout_type=layout_type,
+            min_value_size=min_value_size,
+            block_groups=block_groups,
+            bound_names=symbol_table.bound_names(),
+        ).execute()
+        residual_file, moved_files = MoveBlocksToNewFilesService(
+            original_file=self.original_file,
+            target_block_types=target_block_types,
+            block_paths=block_paths,
+            min_value_size=min_value_size,
+        ).execute()
+        residual_file = File(path=init_file_path, blocks=residual_file.blocks)
+        moved_files = sorted(moved_files, key=lambda file: (file.blocks[0].type.value, file.blocks[0].name))
+        name_modules = symbol_table.name_modules([residual_file, *moved_files])
+        data_files = OffloadValuesService(moved_files=moved_files).execute() if value_sidecars else {}
+        # NOTE: __init__.py lists every moved name, so it is rebuilt, but only written when it changed
+        init_file = UpdateInitFileService(
+            init_file=residual_file,
+            moved_files=moved_files,
+            symbol_table=symbol_table,
+            name_modules=name_modules,
+            lazy_init=lazy_init,
+            lazy_value_names=symbol_table.defined_names([file for file in moved_files if file.path in data_files]),
+        ).execute()
+
+        # 3. Find the names whose import statements changed
+        build_split_manifest_service = BuildSplitManifestService(
+            original_file=self.original_file,
+            target_block_types=target_block_types,
+            residual_file=residual_file,
+            moved_files=moved_files,
+            symbol_table=symbol_table,
+            lazy_init=lazy_init,
+            group=group,
+            max_lines=max_lines,
+            max_modules=max_modules,
+            min_value_size=min_value_size,
+            value_sidecars=value_sidecars,
+            layout_type=layout_type,
+            type_checking_imports=type_checking_imports,
+            data_file_paths=tuple(file.path for file in data_files.values()),
+            init_file=init_file,
+        )
+        new_split_manifest = build_split_manifest_service.data()
+        recorded_name_modules = self._recorded_name_modules(dir_path, init_file_path)
+        dirty_names = self._dirty_names(new_split_manifest)
+        dirty_names |= {
+            name
+            for name in recorded_name_modules.keys() | name_modules.keys()
+            if recorded_name_modules.get(name) != name_modules.get(name)
+        }
+        all_dirty = new_split_manifest["global_imports"] != self.split_manifest["global_imports"]
+
+        # 4. Regenerate only the moved files with changed blocks or a changed import
+        recorded_file_hashes = {
+            recorded_file["path"]: [recorded_block["sha256"] for recorded_block in recorded_file["blocks"]]
+            for recorded_file in self.split_manifest["moved_files"]
+        }
+        dirty_files = []
+        for file in moved_files:
+            file_hashes = [block_hashes[block] for block in file.blocks]
+            defined_names = set().union(*[symbol_table.defines.get(block, ()) for block in file.blocks])
+            used_names = set().union(
+                *[symbol_table.uses.get(block, ()) for block in file.blocks],
+                *[symbol_table.annotation_uses.get(block, ()) for block in file.blocks],
+            )
+            if (
+                all_dirty
+                or recorded_file_hashes.get(file.path.relative_to(dir_path).as_posix()) != file_hashes
+                or ((used_names - defined_names) & dirty_names)
+            ):
+                dirty_files.append(file)
+        # NOTE: The subpackages of the recorded moved files already exist
+        recorded_dir_paths = {(dir_path / path).parent for path in recorded_file_hashes}
+        changed_files = LayoutBlocksService.package_files(
+            dir_path, [file.path for file in dirty_files if file.path.parent not in recorded_dir_paths]
+        )
+        for file in AttachImportStatementsService(
+            moved_files=dirty_files,
+            init_file=residual_file,
+            symbol_table=symbol_table,
+            name_modules=name_modules,
+        ).execute():
+            if file.path in data_files:
+                changed_files += [OffloadValuesService.loader_file(file, data_files[file.path]), data_files[file.path]]
+            else:
+                changed_files.append(file)
+        moved_paths = {file.path.relative_to(dir_path).as_posix() for file in moved_files}
+        removed_paths = [
+            dir_path / recorded_file["path"]
+            for recorded_file in self.split_manifest["moved_files"]
+            if recorded_file["path"] not in moved_paths
+        ]
+        # The data files of the values that are no longer moved, or no longer plain data
+        removed_paths += [
+            dir_path / path
+            for path in self.split_manifest.get("data_files", [])
+            if path not in new_split_manifest["data_files"]
+        ]
+
+        # 5. Skip __init__.py when it is the same as the recorded one, e.g. when only the body of a block changed
+        if new_split_manifest["init_sha256"] == self.split_manifest.get("init_sha256"):
+            init_file = None
+
+        return ResyncPlan(
+            original_file=self.original_file,
+            init_file=init_file,
+            changed_files=changed_files,
+            removed_paths=removed_paths,
+            split_manifest_file=BuildSplitManifestService.file_from_data(dir_path, new_split_manifest),
+        )
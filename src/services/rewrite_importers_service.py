@@ -0,0 +1,100 @@
+import ast
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.import_index import ImportIndex
+from src.entities.source import Source
+from src.instrumentation import instrumented
+from src.services.build_import_index_service import resolve_module
+from src.types.block_type import BlockType
+from src.types.lines import Lines
+
+
+def _alias_text(alias: ast.alias) -> str:
+    return f"{alias.name} as {alias.asname}" if alias.asname else alias.name
+
+
+@dataclass(frozen=True)
+class RewriteImportersService:
+    import_index: ImportIndex
+    # Original module -> moved name -> the submodule it can be imported from after the split
+    moved_name_modules: dict[str, dict[str, str]]
+    # Files written or removed by the split itself
+    excluded_paths: set[Path]
+
+    def _rewrite_statement(self, node: ast.ImportFrom, indent: str, module: str) -> Lines:
+        """Import the moved names from their submodules, keeping the other names and the relative form as is"""
+        moved_names = self.moved_name_modules[module]
+        dots = "." * node.level
+        kept_aliases = []
+        submodule_aliases = defaultdict(list)
+        for alias in node.names:
+            if alias.name in moved_names:
+                submodule = moved_names[alias.name][len(module) + 1 :]
+                submodule_aliases[f"{node.module}.{submodule}" if node.module else submodule].append(alias)
+            else:
+                kept_aliases.append(alias)
+        lines = []
+        if kept_aliases:
+            lines.append(f"{indent}from {dots}{node.module or ''} import {', '.join(map(_alias_text, kept_aliases))}\n")
+        for target, aliases in sorted(submodule_aliases.items()):
+            lines.append(f"{indent}from {dots}{target} import {', '.join(map(_alias_text, aliases))}\n")
+        return lines
+
+    def _rewrite_file(self, file_path: Path) -> Optional[File]:
+        source = Source.from_bytes(file_path.read_bytes())
+        try:
+            tree = ast.parse(source.data)
+        except SyntaxError:
+            return None
+        replacements = []
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ImportFrom):
+                continue
+            module = resolve_module(node.module, node.level, file_path)
+            if module not in self.moved_name_modules:
+                continue
+            if not any(alias.name in self.moved_name_modules[module] for alias in node.names):
+                continue
+            first_line = source.lines(node.lineno - 1, node.lineno)[0]
+            last_line = source.lines(node.end_lineno - 1, node.end_lineno)[0]
+            indent = first_line[: node.col_offset]
+            # NOTE: Only statements on lines of their own can be replaced.
+            # col_offset is in bytes, but whitespace is ASCII
+            if indent.strip() or last_line.encode(source.encoding)[node.end_col_offset :].strip():
+                continue
+            replacements.append((node.lineno - 1, node.end_lineno, self._rewrite_statement(node, indent, module)))
+        if not replacements:
+            return None
+
+        # Keep the untouched lines as slices of the original source
+        blocks = []
+        number = 0
+        for start, end, lines in sorted(replacements):
+            if start > number:
+                blocks.append(Block(type=BlockType.OTHER, name="other", source=source, start=number, end=start))
+            blocks.append(Block.from_lines(type=BlockType.IMPORT, name="other", lines=lines))
+            number = end
+        if number < source.line_count:
+            blocks.append(Block(type=BlockType.OTHER, name="other", source=source, start=number, end=source.line_count))
+        return File(path=file_path, blocks=blocks)
+
+    @instrumented
+    def execute(self) -> list[File]:
+        """Rewrite the files that import moved names from the original modules to import them from the submodules"""
+        excluded_paths = {path.resolve() for path in self.excluded_paths}
+        file_paths = {
+            file_path
+            for module in self.moved_name_modules
+            for file_path in self.import_index.importers(module)
+            if file_path.resolve() not in excluded_paths
+        }
+        files = []
+        for file_path in sorted(file_paths):
+            if file := self._rewrite_file(file_path):
+                files.append(file)
+        return files
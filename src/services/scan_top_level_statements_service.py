@@ -0,0 +1,311 @@
+import io
+import keyword
+import tokenize
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+from src.entities.source import Source
+from src.types.block_type import BlockType
+
+# (block type, or None for statements folded into the next block; name; last line number)
+TopLevelStatement = Tuple[Optional[BlockType], Optional[str], int]
+
+# NOTE: `match` is a soft keyword, so a match statement is only recognized by its indented block
+_COMPOUND_KEYWORDS = {"if", "for", "while", "try", "with", "def", "class", "async", "@"}
+_CONTINUATION_KEYWORDS = {"else", "elif", "except", "finally"}
+_NON_SIGNIFICANT_TOKENS = {tokenize.NL, tokenize.COMMENT, tokenize.ENCODING, tokenize.ENDMARKER}
+# Statements that may be conditional import blocks, their clause headers, and what they may contain besides assignments
+_CONDITIONAL_KEYWORDS = {"if", "try"}
+_HEADER_KEYWORDS = {"if", "elif", "else", "try", "except", "finally"}
+_IMPORT_ONLY_KEYWORDS = {"import", "from", "pass", "raise"}
+# Tokens that make the preceding name part of an attribute, subscript or call, which don't bind it
+_TRAILER_TOKENS = {".", "(", "["}
+# Tokens after which a bracket opens a tuple or list display rather than a call or subscript
+_DISPLAY_PREFIXES = {",", "(", "[", "*", "="}
+
+
+def _is_text(string: str) -> bool:
+    """Whether a STRING token is a str literal, as opposed to bytes or (before Python 3.12) an f-string"""
+    prefix = string[: len(string) - len(string.lstrip("bBrRuUfF"))]
+    return not set(prefix.lower()) & {"b", "f"}
+
+
+class _Statement:
+    """Classification state of the top-level statement being scanned"""
+
+    __slots__ = (
+        "first",
+        "type",
+        "name",
+        "is_compound",
+        "is_decorator",
+        "is_decided",
+        "is_waiting_for_name",
+        "is_assignment",
+        "is_annotation",
+        "is_dotted_annotation",
+        "is_type_alias_annotation",
+        "has_lambda",
+        "is_comment",
+        "candidates",
+        "pending",
+        "is_conditional",
+        "has_import",
+        "is_import_only",
+        "inner_first",
+        "inner_is_assignment",
+        "inner_is_decided",
+        "import_state",
+        "import_name",
+    )
+
+    def __init__(self, first: str, token_type: int):
+        self.first = first
+        self.type: Optional[BlockType] = None
+        self.name: Optional[str] = None
+        self.is_compound = first in _COMPOUND_KEYWORDS
+        # Decorators are part of the following definition
+        self.is_decorator = first == "@"
+        # Whether the statement is known not to be an assignment, or an `=` or `:` has been found
+        self.is_decided = self.is_compound
+        self.is_waiting_for_name = False
+        # Simple statements: `targets = value` or `target: annotation = value`
+        self.is_assignment = False
+        self.is_annotation = False
+        self.is_dotted_annotation = True
+        self.is_type_alias_annotation = False
+        # NOTE: Once a lambda is found, an `=` may be one of its defaults
+        self.has_lambda = False
+        self.is_comment = token_type == tokenize.STRING and _is_text(first)
+        # Names that may be bound by the current target with their bracket depth, and the name just found, which is
+        # bound unless the next token makes it part of an attribute, subscript or call
+        self.candidates: list[tuple[str, int]] = []
+        self.pending: Optional[tuple[str, int]] = None
+        # Compound `if` and `try` statements: whether they are made of imports only
+        self.is_conditional = first in _CONDITIONAL_KEYWORDS
+        self.has_import = False
+        self.is_import_only = True
+        # First token of the statement nested in it being scanned, or None between statements
+        self.inner_first: Optional[str] = None
+        self.inner_is_assignment = False
+        self.inner_is_decided = False
+        # Bound name of the first import: None, "import" (before the name), "name", "as" or "done"
+        self.import_state: Optional[str] = None
+        self.import_name: Optional[str] = None
+
+    def accept_pending(self, token: str) -> None:
+        if self.pending is not None:
+            if token not in _TRAILER_TOKENS:
+                self.candidates.append(self.pending)
+            self.pending = None
+
+    def take_target_name(self) -> None:
+        """The target before an `=` or `:` is complete: keep its first bound name"""
+        if self.name is None and self.candidates:
+            self.name = self.candidates[0][0]
+        self.candidates = []
+
+    def scan_import_name(self, token_type: int, string: str) -> None:
+        if self.import_state == "import":
+            if token_type == tokenize.NAME:
+                self.import_name = string
+                self.import_state = "name"
+            elif string == "*":
+                self.import_state = "done"
+        elif self.import_state == "name":
+            if string == "as":
+                self.import_state = "as"
+            elif string != "." and token_type != tokenize.NAME:
+                self.import_state = "done"
+        elif self.import_state == "as":
+            self.import_name = string
+            self.import_state = "done"
+        elif string == "import" and self.inner_first in ("import", "from"):
+            self.import_state = "import"
+
+    def end_inner(self) -> None:
+        """A statement nested in a conditional statement ends"""
+        if self.inner_first is None:
+            return
+        if self.import_state == "name":
+            self.import_state = "done"
+        is_allowed = (
+            self.inner_first in _IMPORT_ONLY_KEYWORDS
+            or self.inner_first in _HEADER_KEYWORDS
+            or self.inner_is_assignment
+        )
+        self.has_import |= self.inner_first in ("import", "from")
+        self.is_import_only &= is_allowed
+        self.inner_first = None
+
+    def result(self) -> tuple[Optional[BlockType], Optional[str]]:
+        if self.is_conditional:
+            self.end_inner()
+            if self.has_import and self.is_import_only:
+                return BlockType.CONDITIONAL_IMPORT, self.import_name
+            return BlockType.OTHER, None
+        if self.type is not None:
+            return self.type, self.name
+        if self.is_annotation:
+            return (BlockType.TYPE_ALIAS if self.is_type_alias_annotation else BlockType.VALUE), self.name
+        if self.is_assignment:
+            return BlockType.VALUE, self.name
+        # NOTE: Strings are comments, folded into the next block
+        return (None if self.is_comment else BlockType.OTHER), None
+
+
+@dataclass(frozen=True)
+class ScanTopLevelStatementsService:
+    """Find the top-level statements of a source by streaming its tokens instead of building an AST.
+    Statements are classified like the ast loader does, and syntax the interpreter can't parse is tolerated."""
+
+    source: Source
+
+    def execute(self) -> Iterator[TopLevelStatement]:
+        statement: Optional[_Statement] = None
+        # Whether each open bracket is a tuple or list display, and how many aren't
+        brackets: list[bool] = []
+        trailer_depth = 0
+        indent = 0
+        # Index of the token in the current logical line, and the previous token
+        column = 0
+        previous = ""
+        last_row = 0
+        try:
+            for token_type, string, (row, _), _, _ in tokenize.tokenize(io.BytesIO(self.source.data).readline):
+                if token_type in _NON_SIGNIFICANT_TOKENS:
+                    continue
+                if token_type == tokenize.INDENT:
+                    if indent == 0 and statement is not None and not statement.is_compound:
+                        # `match x:` followed by its cases
+                        statement.is_compound = True
+                        statement.type = BlockType.OTHER
+                        statement.name = None
+                    indent += 1
+                    continue
+                if token_type == tokenize.DEDENT:
+                    indent -= 1
+                    continue
+                if token_type == tokenize.NEWLINE:
+                    if statement is not None and statement.is_conditional:
+                        statement.end_inner()
+                    last_row = row
+                    column = 0
+                    continue
+
+                depth = len(brackets)
+                if column == 0 and indent == 0 and depth == 0:
+                    if statement is None or not (
+                        statement.is_decorator or (statement.is_compound and string in _CONTINUATION_KEYWORDS)
+                    ):
+                        if statement is not None:
+                            yield *statement.result(), last_row
+                        statement = _Statement(first=string, token_type=token_type)
+                is_name = token_type == tokenize.NAME
+
+                if statement is not None and statement.is_conditional:
+                    # Check the statements nested in `if` and `try` statements, at any indentation
+                    if statement.inner_first is None:
+                        statement.inner_first = string
+                        statement.inner_is_assignment = False
+                        statement.inner_is_decided = False
+                    elif depth == 0 and string == ":" and statement.inner_first in _HEADER_KEYWORDS:
+                        # The end of a clause header: a statement may follow on the same line
+                        statement.end_inner()
+                        column += 1
+                        previous = string
+                        continue
+                    elif depth == 0 and string == ";":
+                        statement.end_inner()
+                        column += 1
+                        previous = string
+                        continue
+                    elif depth == 0 and not statement.inner_is_decided and string in ("=", ":"):
+                        statement.inner_is_decided = True
+                        statement.inner_is_assignment = string == "="
+                    if statement.import_state != "done":
+                        statement.scan_import_name(token_type, string)
+
+                elif indent == 0 and statement is not None:
+                    # Classify the statement from its first tokens
+                    if statement.is_comment and (token_type != tokenize.STRING or not _is_text(string)):
+                        statement.is_comment = False
+                    if statement.is_waiting_for_name and is_name:
+                        statement.name = string
+                        statement.is_waiting_for_name = False
+                    elif is_name and string in ("def", "class") and (column == 0 or previous == "async"):
+                        statement.type = BlockType.FUNCTION if string == "def" else BlockType.CLASS
+                        statement.is_decorator = False
+                        statement.is_waiting_for_name = True
+                    elif is_name and column == 0 and string in ("import", "from"):
+                        statement.type = BlockType.IMPORT
+                        statement.is_decided = True
+                    elif is_name and column == 1 and previous == "type" and statement.first == "type":
+                        # NOTE: `type X = ...` is a type alias, not an assignment
+                        statement.type = BlockType.TYPE_ALIAS
+                        statement.name = string
+                        statement.is_decided = True
+                    elif not statement.is_decided and not statement.has_lambda:
+                        self._scan_assignment(statement, token_type, string, column, previous, depth, trailer_depth)
+
+                if token_type == tokenize.OP:
+                    if string in ("(", "[", "{"):
+                        is_display = string != "{" and (column == 0 or previous in _DISPLAY_PREFIXES)
+                        brackets.append(is_display)
+                        trailer_depth += not is_display
+                    elif string in (")", "]", "}"):
+                        # NOTE: Unbalanced brackets are tolerated, as in any source the interpreter can't parse
+                        if brackets:
+                            trailer_depth -= not brackets.pop()
+                    elif string == ";" and depth == 0 and indent == 0 and statement and not statement.is_compound:
+                        # Statements separated by semicolons are separate statements ending on the same line
+                        yield *statement.result(), row
+                        statement = None
+                        column = 0
+                        continue
+                column += 1
+                previous = string
+        except tokenize.TokenError as e:
+            raise SyntaxError(f"Failed to tokenize the source: {e}") from e
+        if statement is not None:
+            yield *statement.result(), last_row
+
+    @staticmethod
+    def _scan_assignment(
+        statement: _Statement,
+        token_type: int,
+        string: str,
+        column: int,
+        previous: str,
+        depth: int,
+        trailer_depth: int,
+    ) -> None:
+        """Find the first name bound by the targets of an assignment, and whether it annotates a type alias"""
+        if string == "lambda":
+            statement.has_lambda = True
+            return
+        if statement.is_annotation:
+            if depth == 0 and string == "=":
+                # Nothing in the value changes the classification
+                statement.is_assignment = True
+                statement.is_decided = True
+                return
+            # `TypeAlias`, `typing.TypeAlias`...
+            statement.is_dotted_annotation &= token_type == tokenize.NAME or string == "."
+            statement.is_type_alias_annotation = statement.is_dotted_annotation and string == "TypeAlias"
+            return
+        statement.accept_pending(string)
+        if token_type == tokenize.NAME and not keyword.iskeyword(string):
+            if trailer_depth == 0 and previous != "." and (column == 0 or previous in _DISPLAY_PREFIXES):
+                statement.pending = (string, depth)
+        elif string in _TRAILER_TOKENS and previous in (")", "]"):
+            # A parenthesized expression followed by a trailer: the names in it aren't bound
+            statement.candidates = [candidate for candidate in statement.candidates if candidate[1] <= depth]
+        elif depth == 0 and string == "=":
+            statement.is_assignment = True
+            statement.take_target_name()
+            # NOTE: Names in the other targets and in the value don't matter once one is found
+            statement.is_decided = statement.name is not None
+        elif depth == 0 and string == ":" and not statement.is_assignment:
+            statement.is_annotation = True
+            statement.take_target_name()
@@ -1,28 +1,125 @@
 from dataclasses import dataclass
 
+from src.entities.block import Block
 from src.entities.file import File
-from src.services.generate_import_statement_service import (
-    GenerateImportStatementService,
-)
+from src.entities.symbol_table import SymbolTable
+from src.instrumentation import instrumented
+from src.types.block_type import BlockType
+from src.types.lines import Lines
+
+LAZY_LOADER = """
+
+def __getattr__(name):
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_NAMES})
+"""
+
+# NOTE: Importing a submodule binds it on the package, which would hide a moved name of the same name from __getattr__
+LAZY_MODULE_GUARD = """
+
+import sys as _sys
+import types as _types
+
+
+class _LazyModule(_types.ModuleType):
+    def __setattr__(self, name, value):
+        if name in _LAZY_NAMES and isinstance(value, _types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+_sys.modules[__name__].__class__ = _LazyModule
+# The submodules imported before, e.g. by the moved modules imported above, are already bound
+for _name in [*_LAZY_NAMES]:
+    if isinstance(globals().get(_name), _types.ModuleType):
+        del globals()[_name]
+del _name
+"""
 
 
 @dataclass(frozen=True)
 class UpdateInitFileService:
     init_file: File
     moved_files: list[File]
+    symbol_table: SymbolTable
+    name_modules: dict[str, str]
+    # Import the moved names on first access with a module-level __getattr__ (PEP 562) instead of eagerly
+    lazy_init: bool = False
+    # Moved values read from data files, imported on first access even without lazy_init
+    lazy_value_names: frozenset[str] = frozenset()
 
-    def execute(self) -> str:
+    @staticmethod
+    def _lazy_loader(lazy_names: list[str], name_modules: dict[str, str]) -> Lines:
+        # NOTE: Type checkers treat any TYPE_CHECKING as true. Importing it from typing would cost more than the rest
+        lines = ["\n", "TYPE_CHECKING = False\n", "if TYPE_CHECKING:\n"]
+        lines += [f"    from {name_modules[name]} import {name}\n" for name in lazy_names]
+        lines += ["\n", "# Moved names, imported from their modules on first access\n", "_LAZY_NAMES = {\n"]
+        lines += [f'    "{name}": "{name_modules[name]}",\n' for name in lazy_names]
+        lines += ["}\n"]
+        lines += LAZY_LOADER.splitlines(keepends=True)
+        # NOTE: Any module or subpackage of the package may have the name of a moved name, e.g. with a layout
+        module_parts = {part for module_name in name_modules.values() for part in module_name.split(".")}
+        if module_parts.intersection(lazy_names):
+            lines += LAZY_MODULE_GUARD.splitlines(keepends=True)
+        return lines
+
+    @instrumented
+    def execute(self) -> File:
         # Generate import statements for the moved Blocks
-        original_init_file_text = self.init_file.path.read_text()
-        import_statement = GenerateImportStatementService(
-            init_file=self.init_file, moved_files=self.moved_files
-        ).execute()
+        used_names = set().union(*[self.symbol_table.uses.get(block, ()) for block in self.init_file.blocks])
+        eager_import_statement = []
+        import_statement = []
+        lazy_names = []
+        for file in self.moved_files:
+            for block in file.blocks:
+                for name in sorted(self.symbol_table.defines.get(block, ())):
+                    line = f"from {self.name_modules[name]} import {name}\n"
+                    # NOTE: Names used by the remaining code must be imported before it. The others are imported after
+                    #       it, so that the moved files can import the remaining names from the package without a cycle.
+                    if name in used_names:
+                        eager_import_statement.append(line)
+                    elif self.lazy_init or name in self.lazy_value_names:
+                        lazy_names.append(name)
+                    else:
+                        import_statement.append(line)
         all_text = (
             '\n__all__ = [\n    "'
             + '",\n    "'.join([block.name for file in self.moved_files for block in file.blocks])
             + '"\n]'
         )
-        # Update __init__.py file
-        new_init_file_text = "".join(import_statement) + original_init_file_text + all_text
-        self.init_file.path.write_text(new_init_file_text)
-        return new_init_file_text
+        # Build the new __init__.py file
+        blocks = self.init_file.blocks
+        number_of_leading_imports = next(
+            (
+                index
+                for index, block in enumerate(blocks)
+                if block.type not in (BlockType.IMPORT, BlockType.CONDITIONAL_IMPORT)
+            ),
+            len(blocks),
+        )
+        new_blocks = blocks[:number_of_leading_imports]
+        if eager_import_statement:
+            new_blocks.append(Block.from_lines(type=BlockType.IMPORT, name="other", lines=eager_import_statement))
+        new_blocks += blocks[number_of_leading_imports:]
+        if import_statement:
+            new_blocks.append(Block.from_lines(type=BlockType.IMPORT, name="other", lines=["\n", *import_statement]))
+        if lazy_names:
+            new_blocks.append(
+                Block.from_lines(
+                    type=BlockType.OTHER, name="other", lines=self._lazy_loader(lazy_names, self.name_modules)
+                )
+            )
+        new_blocks.append(
+            Block.from_lines(type=BlockType.VALUE, name="__all__", lines=all_text.splitlines(keepends=True))
+        )
+        return File(path=self.init_file.path, blocks=new_blocks)
@@ -0,0 +1,141 @@
+import json
+import os
+import py_compile
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src import instrumentation
+from src.entities.split_plan import SplitPlan
+from src.entities.verification_report import ModuleCheck, VerificationReport
+from src.instrumentation import instrumented
+from src.utils import to_module_name
+
+# Run in a fresh interpreter: serve the generated modules from the staging directory ahead of the working tree
+IMPORT_CHECKER = """
+import importlib.abc, importlib.util, json, os, sys, time
+
+modules = json.load(open(sys.argv[1]))
+
+
+class GeneratedModuleFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        file_path = modules.get(name)
+        if file_path is None:
+            return None
+        locations = [os.path.dirname(file_path)] if file_path.endswith("__init__.py") else None
+        return importlib.util.spec_from_file_location(name, file_path, submodule_search_locations=locations)
+
+
+sys.meta_path.insert(0, GeneratedModuleFinder())
+start = time.perf_counter()
+importlib.import_module(sys.argv[2])
+print(time.perf_counter() - start)
+"""
+
+# Seconds before an import that hangs is reported as an error
+IMPORT_TIMEOUT = 60
+
+
+def compile_module(source_path: str, bytecode_path: str, display_path: str) -> tuple[float, Optional[str]]:
+    """Byte-compile a file. Runs in a worker process"""
+    start = time.perf_counter()
+    try:
+        # NOTE: Hash-based .pyc files stay valid after the sources are renamed into place with a new mtime
+        py_compile.compile(
+            source_path,
+            cfile=bytecode_path,
+            dfile=display_path,
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+        )
+    except py_compile.PyCompileError as e:
+        return time.perf_counter() - start, e.msg.strip()
+    return time.perf_counter() - start, None
+
+
+def bytecode_path(path: Path) -> Path:
+    return path.parent / "__pycache__" / f"{path.stem}.{sys.implementation.cache_tag}.pyc"
+
+
+@dataclass(frozen=True)
+class VerifySplitPlansService:
+    """Compile the generated modules in worker processes, then import each one in its own fresh interpreter"""
+
+    plans: list[SplitPlan]
+    # Return the compiled .pyc files, so that they can be written along with the modules
+    write_bytecode: bool = False
+    # Number of workers. None means the number of CPUs
+    jobs: Optional[int] = None
+
+    def _compile(self, dir_path: Path, paths: list[Path]) -> list[tuple[float, Optional[str]]]:
+        arguments = (
+            [str(dir_path / path) for path in paths],
+            [str(dir_path / bytecode_path(path)) for path in paths],
+            [str(path) for path in paths],
+        )
+        if self.jobs == 1 or len(paths) == 1:
+            return list(map(compile_module, *arguments))
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=instrumentation.clear_sinks) as executor:
+            return list(executor.map(compile_module, *arguments, chunksize=16))
+
+    def _import(self, modules_path: Path, module_name: str) -> tuple[float, Optional[str]]:
+        command = [sys.executable, "-c", IMPORT_CHECKER, str(modules_path), module_name]
+        # NOTE: Keep the compiled .pyc files as they are
+        env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(command, env=env, capture_output=True, text=True, timeout=IMPORT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            return time.perf_counter() - start, f"Timed out after {IMPORT_TIMEOUT} seconds"
+        if result.returncode != 0:
+            # The last lines of the traceback, from the generated module that failed, with the paths it will have
+            error = result.stderr.replace(str(modules_path.parent) + os.sep, "")
+            return time.perf_counter() - start, "\n".join(error.strip().splitlines()[-3:])
+        return float(result.stdout.split()[-1]), None
+
+    @instrumented
+    def execute(self) -> VerificationReport:
+        # NOTE: Module names are resolved from the current directory, where the files will be written
+        files = {
+            file.path.relative_to(Path.cwd()) if file.path.is_absolute() else file.path: file
+            for plan in self.plans
+            for file in plan.files
+        }
+        paths = [path for path in files if path.suffix == ".py"]
+        with tempfile.TemporaryDirectory(prefix="split-verify-") as temp_dir_path:
+            dir_path = Path(temp_dir_path)
+            for path, file in files.items():
+                (dir_path / path).parent.mkdir(parents=True, exist_ok=True)
+                (dir_path / path).write_bytes(file.render_bytes())
+
+            # 1. Byte-compile every generated module
+            with instrumentation.span("VerifySplitPlansService.compile"):
+                results = self._compile(dir_path, paths)
+            checks = [
+                ModuleCheck(path=path, module_name=to_module_name(path), stage="compile", seconds=seconds, error=error)
+                for path, (seconds, error) in zip(paths, results)
+            ]
+            if any(check.error for check in checks):
+                return VerificationReport(checks=checks)
+
+            # 2. Import each one in isolation, so that a cycle shows up whichever module is imported first
+            modules_path = dir_path / "modules.json"
+            modules_path.write_text(json.dumps({to_module_name(path): str(dir_path / path) for path in paths}))
+            with instrumentation.span("VerifySplitPlansService.import"):
+                with ThreadPoolExecutor(max_workers=self.jobs or os.cpu_count()) as executor:
+                    results = list(executor.map(lambda path: self._import(modules_path, to_module_name(path)), paths))
+            checks += [
+                ModuleCheck(path=path, module_name=to_module_name(path), stage="import", seconds=seconds, error=error)
+                for path, (seconds, error) in zip(paths, results)
+            ]
+
+            bytecode = {}
+            if self.write_bytecode:
+                bytecode = {bytecode_path(path): (dir_path / bytecode_path(path)).read_bytes() for path in paths}
+        return VerificationReport(checks=checks, bytecode=bytecode)
@@ -0,0 +1,69 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.plan_manifest import PlanManifest
+from src.entities.source import Source
+from src.instrumentation import instrumented
+from src.sinks.staged_directory_sink import StagedDirectorySink
+
+MANIFEST_VERSION = 1
+
+
+def _block_to_dict(block: Block, source: Source) -> dict:
+    if block.source is source:
+        # Lines [start, end) of the source file
+        return {"type": block.type.value, "name": block.name, "lines": [block.start, block.end]}
+    # Generated content such as import statements
+    return {"type": block.type.value, "name": block.name, "text": block.text}
+
+
+def _file_to_dict(file: File, source: Source) -> dict:
+    return {
+        "path": str(file.path),
+        "sha256": hashlib.sha256(file.render_bytes()).hexdigest(),
+        "blocks": [_block_to_dict(block, source) for block in file.blocks],
+    }
+
+
+@dataclass(frozen=True)
+class WritePlanManifestService:
+    manifest_path: Path
+    manifest: PlanManifest
+
+    @instrumented
+    def execute(self) -> dict:
+        """Write the plans as JSON, referring to the source by line ranges and to generated content by text"""
+        plans = []
+        for plan in self.manifest.plans:
+            original_file = plan.original_file
+            source = original_file.blocks[0].source if original_file.blocks else Source(data=b"")
+            plans.append(
+                {
+                    "source": {
+                        "path": str(original_file.path),
+                        "sha256": hashlib.sha256(source.data).hexdigest(),
+                        "encoding": source.encoding,
+                        "blocks": [_block_to_dict(block, source) for block in original_file.blocks],
+                    },
+                    "target_block_types": list(plan.target_block_types),
+                    "residual_file": _file_to_dict(plan.residual_file, source),
+                    "init_file": _file_to_dict(plan.init_file, source),
+                    "moved_files": [_file_to_dict(file, source) for file in plan.moved_files],
+                    "min_value_size": plan.min_value_size,
+                    "data_files": [_file_to_dict(file, source) for file in plan.data_files],
+                    "package_files": [_file_to_dict(file, source) for file in plan.package_files],
+                    "split_manifest_file": (
+                        _file_to_dict(plan.split_manifest_file, source) if plan.split_manifest_file else None
+                    ),
+                }
+            )
+        data = {"version": MANIFEST_VERSION, "branch_name": self.manifest.branch_name, "plans": plans}
+        # NOTE: Staged, so that a failure never leaves a truncated manifest
+        sink = StagedDirectorySink(root_path=self.manifest_path.parent)
+        sink.write(self.manifest_path, (json.dumps(data, indent=2) + "\n").encode("utf-8"))
+        sink.commit()
+        return data
@@ -0,0 +1,59 @@
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+from src import instrumentation
+from src.sinks.output_sink import OutputSink
+
+
+class ArchiveSink(OutputSink):
+    """Pack the output files into a tar or zip archive (by suffix, e.g. `.tar.gz` or `.zip`), leaving the tree as is.
+    The archive only holds the written files, so removals are not recorded."""
+
+    def __init__(self, archive_path: Path):
+        self.archive_path = archive_path
+        self.files: dict[str, bytes] = {}
+
+    @staticmethod
+    def _entry_name(path: Path) -> str:
+        return path.relative_to(path.anchor).as_posix() if path.is_absolute() else path.as_posix()
+
+    def write(self, path: Path, data: bytes) -> None:
+        self.files[self._entry_name(path)] = bytes(data)
+        instrumentation.count_written(len(data))
+
+    def remove(self, path: Path) -> None:
+        self.files.pop(self._entry_name(path), None)
+
+    def _write_archive(self, f) -> None:
+        if self.archive_path.suffix == ".zip":
+            with zipfile.ZipFile(f, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name, data in self.files.items():
+                    archive.writestr(name, data)
+            return
+        compression = self.archive_path.suffix.lstrip(".")
+        mode = f"w:{compression}" if compression in ("gz", "bz2", "xz") else "w"
+        with tarfile.open(fileobj=f, mode=mode) as archive:
+            for name, data in self.files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    def commit(self) -> None:
+        # Write to a temporary file first, so that a failure never leaves a truncated archive
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.archive_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                self._write_archive(f)
+            os.replace(temp_path, self.archive_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self.files = {}
+
+    def abort(self) -> None:
+        self.files = {}
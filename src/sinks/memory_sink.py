@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from src import instrumentation
+from src.sinks.output_sink import OutputSink
+
+
+class MemorySink(OutputSink):
+    """Keep the output files in a dict, e.g. to inspect a split without touching the filesystem"""
+
+    def __init__(self):
+        self.files: dict[Path, bytes] = {}
+        self.removed_paths: set[Path] = set()
+
+    def write(self, path: Path, data: bytes) -> None:
+        if self.files.get(path) == data:
+            instrumentation.count("files_unchanged")
+            return
+        self.files[path] = bytes(data)
+        self.removed_paths.discard(path)
+        instrumentation.count_written(len(data))
+
+    def remove(self, path: Path) -> None:
+        self.files.pop(path, None)
+        self.removed_paths.add(path)
+
+    def abort(self) -> None:
+        self.files.clear()
+        self.removed_paths.clear()
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class OutputSink(ABC):
+    """Collect the output files of a run, and make them visible all at once on commit()"""
+
+    @abstractmethod
+    def write(self, path: Path, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def remove(self, path: Path) -> None:
+        pass
+
+    def commit(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        """Discard everything written since the sink was created"""
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from src import instrumentation
+from src.sinks.output_sink import OutputSink
+from src.utils import has_content
+
+
+class StagedDirectorySink(OutputSink):
+    """Write the files to a hidden staging directory, and rename them into place on commit().
+    A failed run leaves the working tree untouched, and files whose content is unchanged are not rewritten."""
+
+    def __init__(self, root_path: Optional[Path] = None):
+        # NOTE: Staged next to the outputs, so that the renames stay on the same filesystem
+        self.root_path = root_path or Path.cwd()
+        self.staging_dir_path: Optional[Path] = None
+        self.staged_paths: dict[Path, Path] = {}
+        self.removed_paths: list[Path] = []
+        self.staged_count = 0
+
+    def _new_staging_path(self) -> Path:
+        if self.staging_dir_path is None:
+            self.staging_dir_path = Path(tempfile.mkdtemp(prefix=".split-staging-", dir=self.root_path))
+        self.staged_count += 1
+        return self.staging_dir_path / str(self.staged_count)
+
+    def write(self, path: Path, data: bytes) -> None:
+        if path in self.removed_paths:
+            self.removed_paths.remove(path)
+        if has_content(path, data):
+            self.staged_paths.pop(path, None)
+            instrumentation.count("files_unchanged")
+            return
+        staging_path = self.staged_paths.get(path) or self._new_staging_path()
+        staging_path.write_bytes(data)
+        self.staged_paths[path] = staging_path
+        instrumentation.count_written(len(data))
+
+    def remove(self, path: Path) -> None:
+        self.staged_paths.pop(path, None)
+        self.removed_paths.append(path)
+
+    def _cleanup(self) -> None:
+        if self.staging_dir_path is not None:
+            shutil.rmtree(self.staging_dir_path, ignore_errors=True)
+            self.staging_dir_path = None
+        self.staged_paths = {}
+        self.removed_paths = []
+
+    def commit(self) -> None:
+        try:
+            for path, staging_path in self.staged_paths.items():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.replace(staging_path, path)
+                except OSError:
+                    # e.g. the output is on another filesystem than the staging directory
+                    shutil.move(staging_path, path)
+            for path in self.removed_paths:
+                path.unlink(missing_ok=True)
+                instrumentation.count("files_removed")
+        finally:
+            self._cleanup()
+
+    def abort(self) -> None:
+        self._cleanup()
@@ -0,0 +1,64 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.backends.git_backend_factory import create_git_backend
+from src.instrumentation import instrumented
+from src.services.build_split_manifest_service import (
+    SPLIT_MANIFEST_NAME,
+    SPLIT_MANIFEST_VERSION,
+)
+from src.services.load_file_service import LoadFileService
+from src.services.resync_split_service import ResyncSplitService
+from src.sinks.output_sink import OutputSink
+from src.sinks.staged_directory_sink import StagedDirectorySink
+from src.types.git_backend_type import GitBackendType
+from src.types.loader_type import LoaderType
+from src.utils import has_content
+
+
+@dataclass(frozen=True)
+class SplitResyncer:
+    # A newer version of a file that was split before, next to the package it was split into
+    original_file_path: Path
+    git_commit: bool
+    git_backend_type: GitBackendType = GitBackendType.FAST_IMPORT
+    loader_type: LoaderType = LoaderType.AUTO
+    # Where the output files go. The working tree by default
+    sink: Optional[OutputSink] = None
+
+    @instrumented
+    def execute(self):
+        # 1. Read the manifest recorded by the split
+        split_manifest_path = self.original_file_path.parent / self.original_file_path.stem / SPLIT_MANIFEST_NAME
+        assert split_manifest_path.is_file(), f"Error: '{split_manifest_path}' does not exist. Split the file first."
+        split_manifest = json.loads(split_manifest_path.read_bytes())
+        assert split_manifest["version"] == SPLIT_MANIFEST_VERSION, (
+            f"Error: Unsupported split manifest version {split_manifest['version']}."
+        )
+
+        # 2. Load the new version, and plan the regeneration of the changed modules only
+        original_file = LoadFileService(file_path=self.original_file_path, loader_type=self.loader_type).execute()
+        plan = ResyncSplitService(original_file=original_file, split_manifest=split_manifest).execute()
+
+        # 3. Commit the changes on top of the current branch, and write them
+        sink = self.sink or StagedDirectorySink()
+        try:
+            # NOTE: The working tree of the split branch is assumed to match its last commit
+            changes = {file.path: file.render_bytes() for file in plan.files}
+            changes = {path: data for path, data in changes.items() if not has_content(path, data)}
+            changes.update(dict.fromkeys([path for path in plan.removed_paths if path.exists()]))
+            if self.git_commit and changes:
+                backend = create_git_backend(self.git_backend_type)
+                backend.use_current_branch()
+                changes[original_file.path] = None
+                backend.commit(
+                    f"[Auto] Resync {plan.split_manifest_file.path.parent} with {original_file.path}.", changes
+                )
+                backend.close()
+            plan.write(sink)
+        except BaseException:
+            sink.abort()
+            raise
+        sink.commit()
@@ -0,0 +1,199 @@
+import json
+import os
+import socketserver
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from src.entities.split_plan import SplitPlan
+from src.plan_store import PlanStore
+from src.services.apply_split_plans_service import ApplySplitPlansService
+from src.types.block_type import BlockType
+from src.types.git_backend_type import GitBackendType
+from src.types.layout_type import LayoutType
+from src.types.loader_type import LoaderType
+from src.utils import to_branch_name
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class InvalidParamsError(Exception):
+    pass
+
+
+def _plan_options(params: dict) -> dict[str, Any]:
+    """The options of PlanFileService taken from the parameters of a request, with the defaults of the command"""
+    try:
+        return {
+            "target_block_types": list(params.get("targets", [BlockType.CLASS.value, BlockType.FUNCTION.value])),
+            "loader_type": LoaderType(params.get("loader", LoaderType.AUTO.value)),
+            "lazy_init": bool(params.get("lazy_init", False)),
+            "group": bool(params.get("group", False)),
+            "max_lines": int(params.get("max_lines", 0)),
+            "max_modules": int(params.get("max_modules", 0)),
+            "min_value_size": int(params.get("min_value_size", 0)),
+            "value_sidecars": bool(params.get("value_sidecars", False)),
+            "layout_type": LayoutType(params.get("layout", LayoutType.FLAT.value)),
+            "type_checking_imports": bool(params.get("type_checking_imports", False)),
+        }
+    except (TypeError, ValueError) as e:
+        raise InvalidParamsError(str(e)) from e
+
+
+def _is_shutdown_request(line: bytes) -> bool:
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(request, dict) and request.get("method") == "shutdown"
+
+
+@dataclass
+class SplitServer:
+    """Answer JSON-RPC 2.0 requests, one JSON object per line, keeping the plans warm between requests.
+    Paths are relative to the directory the server runs in, as for the command"""
+
+    store: PlanStore = field(default_factory=PlanStore)
+    # Number of requests handled at once
+    workers: Optional[int] = None
+    # NOTE: Applying a split writes to the working tree and git, so only one runs at a time
+    _apply_lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _shutdown: threading.Event = field(default_factory=threading.Event, init=False)
+
+    class SocketPathError(Exception):
+        pass
+
+    def _file_path(self, params: dict) -> Path:
+        if not isinstance(params.get("path"), str):
+            raise InvalidParamsError("'path' is required")
+        return Path(params["path"])
+
+    def plan(self, params: dict) -> dict:
+        """The output files of the split, without writing anything"""
+        plan = self.store.get(self._file_path(params), **_plan_options(params))
+        return {
+            "files": [{"path": str(file.path), "content": file.render()} for file in plan.files],
+            "removed_paths": [str(plan.original_file.path)],
+            "moved_names": plan.moved_name_modules(),
+        }
+
+    def apply(self, params: dict) -> dict:
+        """Write the output files, and commit them to a new branch with `git: true`"""
+        file_path = self._file_path(params)
+        git_commit = bool(params.get("git", False))
+        git_backend_type = GitBackendType(params.get("git_backend", GitBackendType.FAST_IMPORT.value))
+        with self._apply_lock:
+            plan: SplitPlan = self.store.get(file_path, **_plan_options(params))
+            branch_name = to_branch_name(file_path)
+            ApplySplitPlansService(
+                plans=[plan],
+                git_commit=git_commit,
+                branch_name=branch_name,
+                git_backend_type=git_backend_type,
+                verify=bool(params.get("verify", False)),
+            ).execute()
+            # The original file no longer exists
+            self.store.invalidate(file_path)
+        return {"files": [str(file.path) for file in plan.files], "branch": branch_name if git_commit else None}
+
+    def invalidate(self, params: dict) -> dict:
+        """Forget the plans of a file, e.g. when the editor knows it changed, or all of them"""
+        file_path = self._file_path(params) if params.get("path") is not None else None
+        return {"invalidated": self.store.invalidate(file_path)}
+
+    def stats(self, params: dict) -> dict:
+        return {"plans": len(self.store), "bytes": self.store.size, "max_bytes": self.store.max_bytes}
+
+    def shutdown(self, params: dict) -> None:
+        self._shutdown.set()
+
+    METHODS = ("plan", "apply", "invalidate", "stats", "shutdown")
+
+    def handle(self, request: Any) -> Optional[dict]:
+        """Answer one request. Notifications (requests without an id) get no response"""
+        if (
+            not isinstance(request, dict)
+            or request.get("jsonrpc") != "2.0"
+            or not isinstance(request.get("method"), str)
+        ):
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": INVALID_REQUEST, "message": "Invalid Request"}}
+        request_id = request.get("id")
+        params = request.get("params", {})
+        try:
+            if request["method"] not in self.METHODS:
+                error = {"code": METHOD_NOT_FOUND, "message": f"Method not found: {request['method']}"}
+            elif not isinstance(params, dict):
+                error = {"code": INVALID_PARAMS, "message": "'params' must be an object"}
+            else:
+                response = {"jsonrpc": "2.0", "id": request_id, "result": getattr(self, request["method"])(params)}
+                return response if "id" in request else None
+        except InvalidParamsError as e:
+            error = {"code": INVALID_PARAMS, "message": str(e)}
+        except Exception as e:
+            error = {"code": SERVER_ERROR, "message": str(e) or type(e).__name__}
+        return {"jsonrpc": "2.0", "id": request_id, "error": error} if "id" in request else None
+
+    def handle_line(self, line: bytes) -> Optional[bytes]:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": "Parse error"}}
+        else:
+            response = self.handle(request)
+        return None if response is None else json.dumps(response).encode("utf-8") + b"\n"
+
+    def serve_stdio(self, stdin: IO[bytes], stdout: IO[bytes]) -> None:
+        """Read requests from stdin until EOF or a shutdown request, and answer them as they complete"""
+        write_lock = threading.Lock()
+
+        def answer(line: bytes) -> None:
+            response = self.handle_line(line)
+            if response is not None:
+                with write_lock:
+                    stdout.write(response)
+                    stdout.flush()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for line in stdin:
+                if not line.strip():
+                    continue
+                future = executor.submit(answer, line)
+                if _is_shutdown_request(line):
+                    # Stop reading, and let the pending requests complete
+                    future.result()
+                    break
+
+    def serve_unix(self, socket_path: Path) -> None:
+        """Accept connections on a Unix socket until a shutdown request. Each connection is served by a thread"""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = server.handle_line(line) if line.strip() else None
+                    if response is not None:
+                        self.wfile.write(response)
+                    if server._shutdown.is_set():
+                        threading.Thread(target=unix_server.shutdown).start()
+                        return
+
+        # NOTE: Only a stale socket is replaced, never a file the path happens to name
+        if os.path.lexists(socket_path):
+            if not stat.S_ISSOCK(socket_path.lstat().st_mode):
+                raise self.SocketPathError(f"Error: {socket_path} exists and is not a socket")
+            socket_path.unlink()
+        with socketserver.ThreadingUnixStreamServer(str(socket_path), Handler) as unix_server:
+            unix_server.daemon_threads = True
+            os.chmod(socket_path, 0o600)
+            try:
+                unix_server.serve_forever()
+            finally:
+                socket_path.unlink(missing_ok=True)
@@ -6,5 +6,9 @@ class BlockType(enum.Enum):
     FUNCTION = "function"
     CLASS = "class"
     VALUE = "value"
+    # `type X = ...` and `X: TypeAlias = ...`
+    TYPE_ALIAS = "type_alias"
+    # `if TYPE_CHECKING:` or `try: import ...` blocks made of imports (and assignments, pass and raise) only
+    CONDITIONAL_IMPORT = "conditional_import"
     COMMENT = "comment"
     OTHER = "other"
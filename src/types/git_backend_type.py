@@ -0,0 +1,6 @@
+import enum
+
+
+class GitBackendType(enum.Enum):
+    FAST_IMPORT = "fast-import"
+    SHELL = "shell"
@@ -0,0 +1,10 @@
+import enum
+
+
+class LayoutType(enum.Enum):
+    # Every module in the new package
+    FLAT = "flat"
+    # Modules in subpackages named after the first two letters of their names, e.g. `fo/foo_bar.py`
+    PREFIX = "prefix"
+    # Modules in a subpackage per block type, e.g. `classes/foo_bar.py`
+    BY_TYPE = "by-type"
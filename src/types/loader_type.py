@@ -0,0 +1,8 @@
+import enum
+
+
+class LoaderType(enum.Enum):
+    # Use the tokenize loader above a size threshold or when the ast module can't parse the file
+    AUTO = "auto"
+    AST = "ast"
+    TOKENIZE = "tokenize"
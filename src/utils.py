@@ -1,16 +1,60 @@
 import re
 import subprocess
+from pathlib import Path
+from typing import Optional
 
+from src import instrumentation
 
-def git(sub_command: str):
+
+def git(sub_command: str, input: Optional[bytes] = None, cwd: Optional[Path] = None):
     command = f"git {sub_command}"
     print(command)
-    result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with instrumentation.span("subprocess"):
+        result = subprocess.run(
+            command,
+            shell=True,
+            input=input,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
     if result.returncode != 0:
         raise Exception(f"Failed to execute the command: {command}. {result.stderr=}")
     return result.stdout.decode("utf-8")
 
 
+def git_stage(path: str, data: Optional[bytes], cwd: Optional[Path] = None) -> None:
+    """Stage in-memory content (or the removal of a file when data is None) without touching the working tree"""
+    if data is None:
+        git(f"rm --cached --quiet --ignore-unmatch -- {path}", cwd=cwd)
+        return
+    object_id = git("hash-object -w --stdin", input=data, cwd=cwd).strip()
+    git(f"update-index --add --cacheinfo 100644,{object_id},{path}", cwd=cwd)
+
+
+def to_branch_name(path: Path) -> str:
+    """The branch a single file is split on"""
+    return "split/" + str(path).replace("/", "_").replace(".py", "")
+
+
+def has_content(path: Path, data: bytes) -> bool:
+    """Whether the file exists with exactly this content. The size is compared first to avoid reading most files"""
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def to_module_name(path: Path) -> str:
+    """Convert a file path relative to the import root to its dotted module name"""
+    parts = path.with_suffix("").parts
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
 # Function to convert class name to snake case
 def to_snake_case(class_name: str) -> str:
     try:
@@ -0,0 +1,140 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.backends.git_backend import GitBackend
+from src.code_splitter import CodeSplitter
+from src.directory_splitter import DirectorySplitter
+from src.services.commit_split_plan_service import CommitSplitPlanService
+from src.types.git_backend_type import GitBackendType
+
+SAMPLE_FILE_PATH = Path("tests/samples/models.py").resolve()
+
+
+def _run(*args: str) -> str:
+    return subprocess.run(args, check=True, stdout=subprocess.PIPE).stdout.decode("utf-8")
+
+
+@pytest.fixture
+def git_identity(monkeypatch):
+    for key in ["AUTHOR", "COMMITTER"]:
+        monkeypatch.setenv(f"GIT_{key}_NAME", "tester")
+        monkeypatch.setenv(f"GIT_{key}_EMAIL", "tester@example.com")
+        monkeypatch.setenv(f"GIT_{key}_DATE", "2020-01-01T00:00:00+00:00")
+
+
+def _split_in_new_repository(path: Path, git_backend_type: GitBackendType, monkeypatch) -> str:
+    (path / "pkg").mkdir(parents=True)
+    shutil.copy(SAMPLE_FILE_PATH, path / "pkg" / "models.py")
+    monkeypatch.chdir(path)
+    _run("git", "init", "--quiet")
+    _run("git", "add", ".")
+    _run("git", "commit", "--quiet", "-m", "init")
+    CodeSplitter(
+        original_file_path=Path("pkg/models.py"),
+        git_commit=True,
+        target_block_types=["class", "function"],
+        git_backend_type=git_backend_type,
+    ).execute()
+    assert _run("git", "status", "--porcelain") == ""
+    assert _run("git", "branch", "--show-current") == "split/pkg_models\n"
+    return _run("git", "log", "--format=%H %T %B")
+
+
+def test_fast_import_backend_matches_shell_backend(tmp_path, monkeypatch, git_identity):
+    shell_log = _split_in_new_repository(tmp_path / "shell", GitBackendType.SHELL, monkeypatch)
+    fast_import_log = _split_in_new_repository(tmp_path / "fast_import", GitBackendType.FAST_IMPORT, monkeypatch)
+    # Same trees and messages, and even the same commit ids with a fixed identity and date
+    assert fast_import_log == shell_log
+    assert len(fast_import_log.splitlines()) > 19 * 2
+
+
+def test_fast_import_backend_existing_branch(tmp_path, monkeypatch, git_identity):
+    _split_in_new_repository(tmp_path, GitBackendType.FAST_IMPORT, monkeypatch)
+    _run("git", "checkout", "--quiet", "HEAD~19")
+    with pytest.raises(GitBackend.BranchExistsError, match="a branch named 'split/pkg_models' already exists"):
+        CodeSplitter(
+            original_file_path=Path("pkg/models.py"),
+            git_commit=True,
+            target_block_types=["class", "function"],
+        ).execute()
+    assert (tmp_path / "pkg" / "models.py").exists()
+
+
+def test_fast_import_backend_keeps_staged_changes(tmp_path, monkeypatch, git_identity):
+    (tmp_path / "pkg").mkdir()
+    shutil.copy(SAMPLE_FILE_PATH, tmp_path / "pkg" / "models.py")
+    (tmp_path / "other.txt").write_text("a\n")
+    monkeypatch.chdir(tmp_path)
+    _run("git", "init", "--quiet")
+    _run("git", "add", ".")
+    _run("git", "commit", "--quiet", "-m", "init")
+    (tmp_path / "other.txt").write_text("b\n")
+    _run("git", "add", "other.txt")
+
+    CodeSplitter(
+        original_file_path=Path("pkg/models.py"),
+        git_commit=True,
+        target_block_types=["class", "function"],
+        git_backend_type=GitBackendType.FAST_IMPORT,
+    ).execute()
+
+    # The unrelated change is still staged, like after `git checkout -b`, and the split files match the branch
+    assert _run("git", "status", "--porcelain") == "M  other.txt\n"
+    assert _run("git", "diff", "--cached", "--name-only") == "other.txt\n"
+
+
+@pytest.mark.parametrize("git_backend_type", [GitBackendType.FAST_IMPORT, GitBackendType.SHELL])
+def test_worktree_mode(tmp_path, monkeypatch, git_identity, git_backend_type):
+    _split_in_new_repository(tmp_path / "split", git_backend_type, monkeypatch)
+    split_messages = _run("git", "log", "--format=%B")
+    split_tree = _run("git", "rev-parse", "HEAD:pkg/models")
+    path = tmp_path / "worktree"
+    (path / "pkg").mkdir(parents=True)
+    shutil.copy(SAMPLE_FILE_PATH, path / "pkg" / "models.py")
+    shutil.copy(SAMPLE_FILE_PATH, path / "pkg" / "other_models.py")
+    monkeypatch.chdir(path)
+    _run("git", "init", "--quiet", "--initial-branch", "main")
+    _run("git", "add", ".")
+    _run("git", "commit", "--quiet", "-m", "init")
+
+    DirectorySplitter(
+        dir_path=Path("pkg"),
+        git_commit=True,
+        target_block_types=["class", "function"],
+        git_backend_type=git_backend_type,
+        jobs=2,
+        worktree=True,
+    ).execute()
+
+    # The checkout is untouched, and each file was split on its own branch
+    assert _run("git", "status", "--porcelain") == ""
+    assert _run("git", "branch", "--show-current") == "main\n"
+    assert sorted(path.rglob("*.py")) == [path / "pkg" / "models.py", path / "pkg" / "other_models.py"]
+    assert _run("git", "worktree", "list", "--porcelain").count("worktree ") == 1
+    assert _run("git", "log", "--format=%B", "split/pkg_models") == split_messages
+    assert _run("git", "rev-parse", "split/pkg_models:pkg/models") == split_tree
+    other_tree = _run("git", "ls-tree", "-r", "--name-only", "split/pkg_other_models")
+    assert "pkg/other_models/__init__.py\n" in other_tree and "pkg/models.py\n" in other_tree
+
+    # A failed split leaves neither a worktree nor a branch behind
+    with pytest.raises(GitBackend.BranchExistsError, match="a branch named 'split/pkg_models' already exists"):
+        CodeSplitter(
+            original_file_path=Path("pkg/models.py"),
+            git_commit=True,
+            target_block_types=["class", "function"],
+            worktree=True,
+        ).execute()
+    _run("git", "branch", "-D", "split/pkg_models")
+    monkeypatch.setattr(CommitSplitPlanService, "execute", lambda self: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        CodeSplitter(
+            original_file_path=Path("pkg/models.py"),
+            git_commit=True,
+            target_block_types=["class", "function"],
+            worktree=True,
+        ).execute()
+    assert _run("git", "worktree", "list", "--porcelain").count("worktree ") == 1
+    assert _run("git", "branch", "--list", "split/pkg_models") == ""
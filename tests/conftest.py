@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from src.entities.split_plan import SplitPlan
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.sinks.staged_directory_sink import StagedDirectorySink
+
+
+@pytest.fixture
+def split_package(tmp_path, monkeypatch) -> Callable[..., SplitPlan]:
+    """Split a source saved as `<name>.py` in a temporary current directory with the options of PlanSplitService,
+    and write the package there unless write=False"""
+    # NOTE: Module names are resolved from the current directory
+    monkeypatch.chdir(tmp_path)
+
+    def split(source: str, name: str, write: bool = True, **options) -> SplitPlan:
+        original_file_path = Path(f"{name}.py")
+        original_file_path.write_text(source)
+        original_file = LoadFileService(file_path=original_file_path).execute()
+        options = {"target_block_types": ["class", "function"], **options}
+        plan = PlanSplitService(original_file=original_file, **options).execute()
+        if write:
+            sink = StagedDirectorySink()
+            plan.write(sink)
+            sink.commit()
+        return plan
+
+    return split
+
+
+@pytest.fixture
+def import_check() -> Callable[[str], None]:
+    """Run a check in a fresh interpreter from the current directory, so that it imports the split package anew"""
+
+    def check(code: str) -> None:
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    return check
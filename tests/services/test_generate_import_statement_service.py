@@ -0,0 +1,166 @@
+import pytest
+
+from src.types.layout_type import LayoutType
+from src.utils import to_module_name
+
+SOURCE = """from __future__ import annotations
+
+import os.path
+from typing import Callable, Optional
+from . import sibling_module as sibling
+
+DEFAULT = os.path.join("a", "b")
+
+
+class Base:
+    pass
+
+
+class Child(Base):
+    callback: Optional[Callable] = None
+
+
+def helper() -> str:
+    return sibling.name + DEFAULT
+"""
+
+
+def _rendered(plan):
+    return {file.path.name: file.render() for file in plan.files}
+
+
+def test_generate_import_statement_service_only_referenced_names(split_package):
+    files = _rendered(split_package(SOURCE, "models", write=False))
+
+    assert files["base.py"] == "from __future__ import annotations\n\n\nclass Base:\n    pass\n"
+    assert files["child.py"].startswith(
+        "from __future__ import annotations\n"
+        "from typing import Callable\n"
+        "from typing import Optional\n"
+        "from models.base import Base\n"
+    )
+    # Relative imports are one package deeper after the split
+    assert files["helper.py"].startswith(
+        "from __future__ import annotations\nfrom .. import sibling_module as sibling\nfrom models import DEFAULT\n"
+    )
+
+
+def test_update_init_file_service_imports_moved_names_after_remaining_code(split_package):
+    init_text = _rendered(split_package(SOURCE, "models", write=False))["__init__.py"]
+
+    assert init_text.index('DEFAULT = os.path.join("a", "b")') < init_text.index("from models.base import Base")
+    assert "from models import" not in init_text
+
+
+ANNOTATED_SOURCE = """from __future__ import annotations
+
+from typing import Literal
+
+
+class User:
+    kind: Literal["Role"] = "User"
+
+    def add(self, street: str) -> Address:
+        address: Address = make_address(self, street)
+        return address
+
+
+class Address:
+    owner: "User"
+
+
+def make_address(owner: User, street: str) -> Address:
+    return Address()
+
+
+class Role:
+    pass
+"""
+
+
+def test_generate_import_statement_service_annotation_only_names(split_package):
+    files = _rendered(split_package(ANNOTATED_SOURCE, "models", write=False, type_checking_imports=True))
+
+    # No annotation is evaluated with `from __future__ import annotations`. The strings of Literal aren't names
+    assert files["user.py"].startswith(
+        "from __future__ import annotations\n"
+        "from typing import Literal\n"
+        "from models.make_address import make_address\n"
+        "TYPE_CHECKING = False\n"
+        "if TYPE_CHECKING:\n"
+        "    from models.address import Address\n"
+        "\n"
+    )
+    assert files["address.py"].startswith(
+        "from __future__ import annotations\n"
+        "TYPE_CHECKING = False\n"
+        "if TYPE_CHECKING:\n"
+        "    from models.user import User\n"
+    )
+    assert files["make_address.py"].startswith(
+        "from __future__ import annotations\n"
+        "from models.address import Address\n"
+        "TYPE_CHECKING = False\n"
+        "if TYPE_CHECKING:\n"
+        "    from models.user import User\n"
+    )
+
+
+def test_generate_import_statement_service_evaluated_annotations(split_package):
+    source = ANNOTATED_SOURCE.replace("from __future__ import annotations\n\n", "")
+    files = _rendered(split_package(source, "models", write=False, type_checking_imports=True))
+
+    # Without the future import, only the annotations of local variables and strings aren't evaluated
+    assert files["make_address.py"].startswith("from models.address import Address\nfrom models.user import User\n\n")
+    assert "TYPE_CHECKING" not in files["user.py"]
+    assert "    from models.user import User\n" in files["address.py"]
+
+
+def test_generate_import_statement_service_without_type_checking_imports(split_package):
+    files = _rendered(split_package(ANNOTATED_SOURCE, "models", write=False))
+
+    assert not any("TYPE_CHECKING" in text for text in files.values())
+    assert "from models.address import Address\n" in files["user.py"]
+
+
+MUTUAL_SOURCE = """from __future__ import annotations
+
+LIMIT = 10
+
+
+class Group:
+    members: list[User]
+
+    def __init__(self):
+        self.members = []
+
+
+class User:
+    def group(self) -> Group:
+        return Group()
+"""
+
+MUTUAL_CHECK = """\
+import models
+
+assert isinstance(models.User().group(), models.Group)
+# The names imported for type checkers only aren't bound at runtime
+assert not hasattr(models.Group, "User")
+"""
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"lazy_init": True},
+        {"layout_type": LayoutType.PREFIX},
+        {"target_block_types": ["class", "function", "value"]},
+    ],
+)
+def test_generate_import_statement_service_mutually_referencing_classes(split_package, import_check, options):
+    plan = split_package(MUTUAL_SOURCE, "models", type_checking_imports=True, **options)
+
+    # The module of Group imports User for type checkers only, so importing either module first works
+    for module in ["models", *(to_module_name(file.path) for file in plan.moved_files)]:
+        import_check(f"import {module}\n" + MUTUAL_CHECK)
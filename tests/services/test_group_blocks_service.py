@@ -0,0 +1,104 @@
+from src.services.analyze_symbols_service import AnalyzeSymbolsService
+from src.services.group_blocks_service import (
+    GroupBlocksService,
+    pack,
+    strongly_connected_components,
+)
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+
+SOURCE = """\
+class Base:
+    def to_dict(self):
+        return encode(self)
+
+
+def encode(value):
+    return {"base": isinstance(value, Base)}
+
+
+class Child(Base):
+    pass
+
+
+def is_even(n):
+    return n == 0 or is_odd(n - 1)
+
+
+def is_odd(n):
+    return n != 0 and is_even(n - 1)
+
+
+def standalone():
+    return 1
+
+
+class GrandChild(Child):
+    pass
+"""
+
+
+def group(tmp_path, **budgets) -> dict[str, list[str]]:
+    original_file_path = tmp_path / "models.py"
+    original_file_path.write_text(SOURCE)
+    original_file = LoadFileService(file_path=original_file_path).execute()
+    block_paths = GroupBlocksService(
+        original_file=original_file,
+        target_block_types=["class", "function"],
+        symbol_table=AnalyzeSymbolsService(file=original_file).execute(),
+        **budgets,
+    ).execute()
+    groups = {}
+    for block, path in block_paths.items():
+        groups.setdefault(path.name, []).append(block.name)
+    return groups
+
+
+def test_strongly_connected_components():
+    # 0 -> 1 -> 2 -> 0, 3 -> 2
+    assert sorted(strongly_connected_components([[1], [2], [0], [2]])) == [[0, 1, 2], [3]]
+    # A long chain doesn't hit the recursion limit
+    assert len(strongly_connected_components([[index + 1] for index in range(5000)] + [[]])) == 5001
+
+
+def test_pack():
+    assert pack([3, 2, 5, 1], 5) == [[0, 1], [2], [3]]
+    assert pack([3, 2], 0) == [[0], [1]]
+
+
+def test_group_blocks_merges_mutually_dependent_blocks(tmp_path):
+    assert group(tmp_path) == {
+        "base.py": ["Base", "encode"],
+        "child.py": ["Child"],
+        "is_even.py": ["is_even", "is_odd"],
+        "standalone.py": ["standalone"],
+        "grand_child.py": ["GrandChild"],
+    }
+
+
+def test_group_blocks_packs_under_budgets(tmp_path):
+    assert group(tmp_path, max_modules=2) == {
+        "base.py": ["Base", "encode", "Child"],
+        "is_even.py": ["is_even", "is_odd", "standalone", "GrandChild"],
+    }
+    assert len(group(tmp_path, max_lines=1000)) == 1
+    # A group larger than the budget is kept whole
+    assert group(tmp_path, max_lines=1)["base.py"] == ["Base", "encode"]
+
+
+def test_grouped_modules_do_not_import_each_other_in_a_cycle(tmp_path):
+    (tmp_path / "models.py").write_text(SOURCE)
+    original_file = LoadFileService(file_path=tmp_path / "models.py").execute()
+    plan = PlanSplitService(
+        original_file=original_file, target_block_types=["class", "function"], group=True, max_lines=12
+    ).execute()
+
+    imports = {}
+    for file in plan.moved_files:
+        import_lines = [line for line in file.render().splitlines() if line.startswith("from ")]
+        imports[file.path.stem] = {line.split()[1].rpartition(".")[2] for line in import_lines}
+    for module, imported_modules in imports.items():
+        for imported_module in imported_modules:
+            assert module not in imports.get(imported_module, ()), (module, imported_module)
+    assert sum(len(file.blocks) - 1 for file in plan.moved_files) == 7
+    assert '"group": true' in plan.split_manifest_file.render()
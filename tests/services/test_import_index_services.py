@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from src import instrumentation
+from src.plan_cache import PlanCache
+from src.services.build_import_index_service import BuildImportIndexService
+from src.services.rewrite_importers_service import RewriteImportersService
+
+
+def _write_tree(tmp_path, files):
+    for name, text in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(text)
+
+
+def test_build_import_index_service(tmp_path, monkeypatch):
+    _write_tree(
+        tmp_path,
+        {
+            "pkg/__init__.py": "from .models import A\n",
+            "pkg/sub/use.py": "from ..models import B\nfrom pkg.models import (\n    C,\n)\nimport os\n",
+            "app.py": "from pkg import models\n",
+            ".hidden/use.py": "from pkg.models import A\n",
+        },
+    )
+    monkeypatch.chdir(tmp_path)
+    cache = PlanCache(dir_path=tmp_path / ".cache")
+
+    with instrumentation.collect() as report:
+        import_index = BuildImportIndexService(root_path=Path("."), cache=cache).execute()
+        assert BuildImportIndexService(root_path=Path("."), cache=cache).execute() == import_index
+
+    assert sorted(import_index.importers("pkg.models")) == [Path("pkg/__init__.py"), Path("pkg/sub/use.py")]
+    assert import_index.importers("pkg") == [Path("app.py")]
+    # The second run reuses the cached entries
+    assert report.counters["import_index_files_scanned"] == 3
+
+
+def test_rewrite_importers_service(tmp_path, monkeypatch):
+    _write_tree(
+        tmp_path,
+        {
+            "pkg/other.py": "from .models import (\n    A,\n    value,\n)\n",
+            "app.py": (
+                '"""from pkg.models import A"""\n'
+                "from pkg.models import A as Alias, B, value\n"
+                "\n\ndef f():\n"
+                "    from pkg.models import B\n"
+                "    from pkg.models import A  # comment\n"
+            ),
+            "pkg/models/__init__.py": "from pkg.models.a import A\n",
+        },
+    )
+    monkeypatch.chdir(tmp_path)
+    import_index = BuildImportIndexService(root_path=Path(".")).execute()
+
+    files = RewriteImportersService(
+        import_index=import_index,
+        moved_name_modules={"pkg.models": {"A": "pkg.models.a", "B": "pkg.models.b"}},
+        excluded_paths={Path("pkg/models/__init__.py")},
+    ).execute()
+
+    assert {file.path: file.render() for file in files} == {
+        Path("app.py"): (
+            '"""from pkg.models import A"""\n'
+            "from pkg.models import value\n"
+            "from pkg.models.a import A as Alias\n"
+            "from pkg.models.b import B\n"
+            "\n\ndef f():\n"
+            "    from pkg.models.b import B\n"
+            "    from pkg.models import A  # comment\n"
+        ),
+        Path("pkg/other.py"): "from .models import value\nfrom .models.a import A\n",
+    }
@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import pytest
+
+from src.services.analyze_symbols_service import AnalyzeSymbolsService
+from src.services.layout_blocks_service import LayoutBlocksService
+from src.services.load_file_service import LoadFileService
+from src.types.layout_type import LayoutType
+
+SOURCE = """\
+CODES = {"a": 1}
+codes = {"b": 2}
+
+
+class FooBar:
+    pass
+
+
+def foo_bar() -> FooBar:
+    return FooBar()
+
+
+def helper():
+    return 1
+
+
+def helper():
+    return 2
+
+
+class _Hidden:
+    pass
+
+
+class Fo:
+    pass
+
+
+classes = []
+fo = 1
+"""
+
+CHECK = """\
+import shapes
+
+assert shapes.CODES == {"a": 1} and shapes.codes == {"b": 2}
+assert isinstance(shapes.foo_bar(), shapes.FooBar)
+assert shapes.helper() == 2 and shapes._Hidden and shapes.Fo
+# The small values stay in __init__.py, and no module or subpackage replaces them
+assert shapes.classes == [] and shapes.fo == 1
+"""
+
+
+def layout(tmp_path, layout_type: LayoutType) -> dict[str, str]:
+    original_file_path = tmp_path / "shapes.py"
+    original_file_path.write_text(SOURCE)
+    original_file = LoadFileService(file_path=original_file_path).execute()
+    block_paths = LayoutBlocksService(
+        original_file=original_file,
+        target_block_types=["value", "class", "function"],
+        layout_type=layout_type,
+        min_value_size=16,
+        bound_names=AnalyzeSymbolsService(file=original_file).execute().bound_names(),
+    ).execute()
+    return {block.name: path.relative_to(tmp_path / "shapes").as_posix() for block, path in block_paths.items()}
+
+
+def test_flat_layout(tmp_path):
+    # Names that map to the same file name, even when only their case differs, get a suffix in order. Modules named
+    # like another name of the original file get one first, as importing them would replace it in the package
+    assert layout(tmp_path, LayoutType.FLAT) == {
+        "CODES": "CODES.py",
+        "codes": "codes_2.py",
+        "FooBar": "foo_bar_2.py",
+        "foo_bar": "foo_bar.py",
+        "helper": "helper.py",
+        "_Hidden": "__hidden.py",
+        "Fo": "fo_2.py",
+    }
+
+
+def test_prefix_layout(tmp_path):
+    assert layout(tmp_path, LayoutType.PREFIX) == {
+        "CODES": "co/CODES.py",
+        "codes": "co/codes_2.py",
+        "FooBar": "fo_2/foo_bar.py",
+        "foo_bar": "fo_2/foo_bar_2.py",
+        "helper": "he/helper.py",
+        "_Hidden": "hi/__hidden.py",
+        "Fo": "fo_2/fo.py",
+    }
+
+
+def test_by_type_layout(tmp_path):
+    # Only names in the same subpackage collide, and subpackages aren't named like the names of the original file
+    assert layout(tmp_path, LayoutType.BY_TYPE) == {
+        "CODES": "values/CODES.py",
+        "codes": "values/codes_2.py",
+        "FooBar": "classes_2/foo_bar.py",
+        "foo_bar": "functions/foo_bar.py",
+        "helper": "functions/helper.py",
+        "_Hidden": "classes_2/__hidden.py",
+        "Fo": "classes_2/fo.py",
+    }
+
+
+def test_package_files():
+    paths = [Path("pkg/fo/foo.py"), Path("pkg/fo/foo_2.py"), Path("pkg/ba/bar.py"), Path("pkg/top.py")]
+    package_files = LayoutBlocksService.package_files(Path("pkg"), paths)
+    assert [file.path for file in package_files] == [Path("pkg/ba/__init__.py"), Path("pkg/fo/__init__.py")]
+    assert all(file.blocks == [] for file in package_files)
+
+
+@pytest.mark.parametrize("layout_type", list(LayoutType))
+def test_split_package_imports(split_package, import_check, layout_type):
+    plan = split_package(
+        SOURCE, "shapes", target_block_types=["value", "class", "function"], layout_type=layout_type, min_value_size=16
+    )
+
+    # Both definitions of helper share a module, and each subpackage has an empty __init__.py
+    assert len({file.path for file in plan.moved_files}) == 7
+    assert all(file.path.read_text() == "" for file in plan.package_files)
+    assert len(plan.package_files) == {LayoutType.FLAT: 0, LayoutType.PREFIX: 4, LayoutType.BY_TYPE: 3}[layout_type]
+    import_check(CHECK)
@@ -11,7 +11,7 @@ def test_load_file_service():
     service = LoadFileService(file_path=Path("tests/samples/models.py"))
     result = service.execute()
     assert result.path == Path("tests/samples/models.py")
-    assert result.blocks[0] == Block(
+    assert result.blocks[0] == Block.from_lines(
         type=BlockType.IMPORT,
         name="other",
         lines=[
@@ -23,28 +23,32 @@ def test_load_file_service():
             "import sys\n",
         ],
     )
-    assert result.blocks[1] == Block(type=BlockType.IMPORT, name="other", lines=["from dataclasses import dataclass\n"])
-    assert result.blocks[2] == Block(
+    assert result.blocks[1] == Block.from_lines(
+        type=BlockType.IMPORT, name="other", lines=["from dataclasses import dataclass\n"]
+    )
+    assert result.blocks[2] == Block.from_lines(
         type=BlockType.IMPORT, name="other", lines=["from typing import (\n", "    Callable\n", ")\n"]
     )
-    assert result.blocks[3] == Block(type=BlockType.IMPORT, name="other", lines=["from pathlib import Path\n"])
-    assert result.blocks[4] == Block(type=BlockType.VALUE, name="StrAlias", lines=["\n", "StrAlias = str\n"])
-    assert result.blocks[5] == Block(
+    assert result.blocks[3] == Block.from_lines(
+        type=BlockType.IMPORT, name="other", lines=["from pathlib import Path\n"]
+    )
+    assert result.blocks[4] == Block.from_lines(type=BlockType.VALUE, name="StrAlias", lines=["\n", "StrAlias = str\n"])
+    assert result.blocks[5] == Block.from_lines(
         type=BlockType.VALUE,
         name="FunctionAlias",
         lines=["# This is very important value\n", "FunctionAlias = Callable[[], None]\n"],
     )
-    assert result.blocks[6] == Block(
+    assert result.blocks[6] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithMetaKlass",
         lines=["\n", "\n", "class KlassWithMetaKlass:\n", "    class Meta:\n", "        abstract = True\n"],
     )
-    assert result.blocks[7] == Block(
+    assert result.blocks[7] == Block.from_lines(
         type=BlockType.CLASS,
         name="_KlassNameStartWithUnderScore",
         lines=["\n", "\n", "class _KlassNameStartWithUnderScore:\n", "    pass\n"],
     )
-    assert result.blocks[8] == Block(
+    assert result.blocks[8] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithComment1",
         lines=[
@@ -59,7 +63,7 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[9] == Block(
+    assert result.blocks[9] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithComment2",
         lines=[
@@ -75,7 +79,7 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[10] == Block(
+    assert result.blocks[10] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithComment3",
         lines=[
@@ -87,12 +91,12 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[11] == Block(
+    assert result.blocks[11] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithDecorator",
         lines=["\n", "\n", "@dataclass(frozen=True)\n", "class KlassWithDecorator:\n", "    pass\n"],
     )
-    assert result.blocks[12] == Block(
+    assert result.blocks[12] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithCommentAndDecorator",
         lines=[
@@ -111,11 +115,13 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[13] == Block(
+    assert result.blocks[13] == Block.from_lines(
         type=BlockType.VALUE, name="class_value1", lines=["\n", "\n", 'class_value1 = "default1"\n']
     )
-    assert result.blocks[14] == Block(type=BlockType.VALUE, name="class_value2", lines=['class_value2 = "default2"\n'])
-    assert result.blocks[15] == Block(
+    assert result.blocks[14] == Block.from_lines(
+        type=BlockType.VALUE, name="class_value2", lines=['class_value2 = "default2"\n']
+    )
+    assert result.blocks[15] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithMember",
         lines=[
@@ -126,7 +132,7 @@ def test_load_file_service():
             "    meta: KlassWithMetaKlass\n",
         ],
     )
-    assert result.blocks[16] == Block(
+    assert result.blocks[16] == Block.from_lines(
         type=BlockType.CLASS,
         name="KlassWithFunction",
         lines=[
@@ -137,22 +143,23 @@ def test_load_file_service():
             "        pass\n",
         ],
     )
-    assert result.blocks[17] == Block(
+    # The main guard is a block of its own, which stays in __init__.py
+    assert result.blocks[17] == Block.from_lines(
+        type=BlockType.OTHER,
+        name="other",
+        lines=["\n", "\n", 'if __name__ == "__main__":\n', '    print("Hello, World!")\n', "    sys.exit(0)\n"],
+    )
+    assert result.blocks[18] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="_function_start_with_underscore",
         lines=[
-            "\n",
-            "\n",
-            'if __name__ == "__main__":\n',
-            '    print("Hello, World!")\n',
-            "    sys.exit(0)\n",
             "\n",
             "\n",
             "def _function_start_with_underscore(klass: KlassWithComment2):\n",
             "    print(klass)\n",
         ],
     )
-    assert result.blocks[18] == Block(
+    assert result.blocks[19] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="function_with_comment1",
         lines=[
@@ -167,7 +174,7 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[19] == Block(
+    assert result.blocks[20] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="function_with_comment2",
         lines=[
@@ -183,7 +190,7 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[20] == Block(
+    assert result.blocks[21] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="function_with_comment3",
         lines=[
@@ -195,13 +202,15 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[21] == Block(
+    assert result.blocks[22] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="function_with_decorator",
         lines=["\n", "\n", "@staticmethod\n", "def function_with_decorator():\n", "    pass\n"],
     )
-    assert result.blocks[22] == Block(type=BlockType.VALUE, name="def_value", lines=["\n", "\n", "def_value = 1\n"])
-    assert result.blocks[23] == Block(
+    assert result.blocks[23] == Block.from_lines(
+        type=BlockType.VALUE, name="def_value", lines=["\n", "\n", "def_value = 1\n"]
+    )
+    assert result.blocks[24] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="function_with_comment_and_decorator",
         lines=[
@@ -213,12 +222,40 @@ def test_load_file_service():
             "    pass\n",
         ],
     )
-    assert result.blocks[24] == Block(
+    assert result.blocks[25] == Block.from_lines(
         type=BlockType.FUNCTION,
         name="function_with_async",
         lines=["\n", "\n", "async def function_with_async():\n", "    pass\n"],
     )
-    assert result.blocks[25] == Block(type=BlockType.VALUE, name="last_value", lines=["\n", "\n", "last_value = 100\n"])
+    assert result.blocks[26] == Block.from_lines(
+        type=BlockType.VALUE, name="last_value", lines=["\n", "\n", "last_value = 100\n"]
+    )
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("a, b = 1, 2\n", (BlockType.VALUE, "a")),
+        ("a.b = c = 1\n", (BlockType.VALUE, "c")),
+        ("a[0] = 1\n", (BlockType.VALUE, "other")),
+        ("x: int = 1\n", (BlockType.VALUE, "x")),
+        ('X = """\ny = 1\n"""\n', (BlockType.VALUE, "X")),
+        ("Alias: TypeAlias = int\n", (BlockType.TYPE_ALIAS, "Alias")),
+        ("type Alias = int\n", (BlockType.TYPE_ALIAS, "Alias")),
+        ("if TYPE_CHECKING:\n    from a import B\n", (BlockType.CONDITIONAL_IMPORT, "B")),
+        (
+            "try:\n    import ujson as json\nexcept ImportError:\n    json = None\n",
+            (BlockType.CONDITIONAL_IMPORT, "json"),
+        ),
+        ("if DEBUG:\n    import pdb\n    pdb.set_trace()\n", (BlockType.OTHER, "other")),
+        ("__all__ += ['a']\n", (BlockType.OTHER, "other")),
+    ],
+)
+def test_load_file_service_classifies_statements(tmp_path, source, expected):
+    file_path = tmp_path / "module.py"
+    file_path.write_text(source)
+    # NOTE: Before Python 3.12, `type` statements are found by the tokenize loader
+    assert [(block.type, block.name) for block in LoadFileService(file_path=file_path).execute().blocks] == [expected]
 
 
 def test_load_file_service_non_existent_file():
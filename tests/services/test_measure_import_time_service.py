@@ -0,0 +1,60 @@
+from src.entities.import_time_report import ImportTime, ImportTimeReport
+from src.services.measure_import_time_service import (
+    MeasureImportTimeService,
+    parse_import_times,
+)
+
+IMPORT_TIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 | _io
+import time:        30 |         30 |       json.scanner
+import time:        50 |         80 |     json.decoder
+import time:        20 |        100 |   json
+import time:        10 |         10 |   pkg.models.light
+import time:        40 |        150 | pkg.models
+"""
+
+
+def test_parse_import_times():
+    run = parse_import_times(IMPORT_TIME_OUTPUT)
+
+    assert run["_io"] == ImportTime(self_us=100, cumulative_us=100, parent=None)
+    assert run["json.scanner"].parent == "json.decoder"
+    assert run["json.decoder"].parent == "json"
+    assert run["json"] == ImportTime(self_us=20, cumulative_us=100, parent="pkg.models")
+    assert run["pkg.models.light"].parent == "pkg.models"
+    assert run["pkg.models"] == ImportTime(self_us=40, cumulative_us=150, parent=None)
+
+
+def test_import_time_report():
+    def run(cumulative_us):
+        return {"pkg.models": ImportTime(self_us=1, cumulative_us=cumulative_us, parent=None)}
+
+    after_run = parse_import_times(IMPORT_TIME_OUTPUT)
+    report = ImportTimeReport(
+        module_name="pkg.models",
+        before_runs=[run(100), run(140), run(1000)],
+        after_runs=[after_run, after_run],
+        tolerance=10.0,
+    )
+
+    assert report.before_us == 140
+    assert report.after_us == 150
+    assert not report.is_regression
+    assert report.offenders() == [("pkg.models.light", 10, 10, None)]
+    assert "after:  0.15 ms (+7.1%" in report.format()
+    assert ImportTimeReport(**{**report.__dict__, "tolerance": 5.0}).is_regression
+
+
+def test_measure_import_time_service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("from pkg.sub import value\n")
+    (tmp_path / "pkg" / "sub.py").write_text("value = 1\n")
+
+    runs = MeasureImportTimeService(module_name="pkg", repeat=2).execute()
+
+    assert len(runs) == 2
+    assert all(run["pkg.sub"].parent == "pkg" for run in runs)
+    # The bytecode is not written to the working tree
+    assert not list(tmp_path.rglob("__pycache__"))
@@ -0,0 +1,82 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.services.load_file_service import LoadFileService
+from src.services.move_blocks_to_new_files_service import MoveBlocksToNewFilesService
+from src.services.offload_values_service import OffloadValuesService
+
+SOURCE = """\
+import enum
+
+# Codes by name
+CODES: dict[str, int] = {
+    "alpha": 1,
+    "beta": 2,
+}
+PAIRS = [(1, 2), (3, 4), (5, 6)]
+SMALL = [1]
+
+
+class Color(enum.Enum):
+    RED = 1
+"""
+
+CHECK = """\
+import sys
+
+import datapkg
+
+# Only the module of the value read from its data file isn't imported
+assert "datapkg.PAIRS" in sys.modules and "datapkg.CODES" not in sys.modules
+assert datapkg.CODES == {"alpha": 1, "beta": 2}
+assert datapkg.CODES is sys.modules["datapkg.CODES"].CODES
+assert datapkg.PAIRS == [(1, 2), (3, 4), (5, 6)] and datapkg.SMALL == [1]
+"""
+
+
+def test_value_sidecars(split_package, import_check):
+    plan = split_package(
+        SOURCE, "datapkg", target_block_types=["value", "class"], min_value_size=16, value_sidecars=True
+    )
+
+    assert [file.path for file in plan.data_files] == [Path("datapkg/CODES.json")]
+    assert [file.path.name for file in plan.moved_files] == ["color.py", "CODES.py", "PAIRS.py"]
+    assert Path("datapkg/CODES.py").read_text() == (
+        "\n# Codes by name\n"
+        "import json as _json\nimport os as _os\n\n"
+        "CODES: dict[str, int] = _json.loads(__spec__.loader.get_data(_os.path.join(_os.path.dirname(__file__), "
+        "'CODES.json')))\n"
+    )
+    assert "SMALL = [1]\n" in plan.init_file.render()
+    import_check(CHECK)
+
+    # The data files are read from a zip archive too, e.g. a zipapp
+    with zipfile.ZipFile("datapkg.zip", "w") as archive:
+        for path in Path("datapkg").rglob("*"):
+            archive.write(path)
+    import_check(f"import sys\nsys.path.insert(0, 'datapkg.zip')\n{CHECK}assert '.zip' in datapkg.__file__\n")
+
+
+@pytest.mark.parametrize(
+    "text, is_offloaded",
+    [
+        ('TABLE = {"a": [1, 2.5, None, True], "b": {"c": "d"}}\n', True),
+        ('"""Doc"""\nTABLE: list = ["a", -1]\n', True),
+        ("TABLE = (1, 2)\n", False),
+        ('TABLE = {1: "a"}\n', False),
+        ("TABLE = [1e400]\n", False),
+        ("TABLE = OTHER = [1]\n", False),
+        ("TABLE = [len]\n", False),
+        ("TABLE: list\n", False),
+    ],
+)
+def test_offload_values_service(tmp_path, text, is_offloaded):
+    (tmp_path / "models.py").write_text(text)
+    original_file = LoadFileService(file_path=tmp_path / "models.py").execute()
+    _, moved_files = MoveBlocksToNewFilesService(original_file=original_file, target_block_types=["value"]).execute()
+
+    data_files = OffloadValuesService(moved_files=moved_files).execute()
+
+    assert bool(data_files) == is_offloaded
@@ -0,0 +1,51 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.entities.plan_manifest import PlanManifest
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.services.read_plan_manifest_service import ReadPlanManifestService
+from src.services.write_plan_manifest_service import WritePlanManifestService
+
+
+def _write_manifest(tmp_path):
+    original_file_path = tmp_path / "models.py"
+    shutil.copy(Path("tests/samples/models.py"), original_file_path)
+    original_file = LoadFileService(file_path=original_file_path).execute()
+    plan = PlanSplitService(original_file=original_file, target_block_types=["class", "function"]).execute()
+    manifest_path = tmp_path / "plan.json"
+    WritePlanManifestService(
+        manifest_path=manifest_path, manifest=PlanManifest(branch_name="split/models", plans=[plan])
+    ).execute()
+    return plan, manifest_path
+
+
+def test_plan_manifest_round_trip(tmp_path):
+    plan, manifest_path = _write_manifest(tmp_path)
+
+    data = json.loads(manifest_path.read_text())
+    moved_file = data["plans"][0]["moved_files"][0]
+    assert moved_file["path"] == str(tmp_path / "models" / "klass_with_comment1.py")
+    assert moved_file["blocks"][1] == {"type": "class", "name": "KlassWithComment1", "lines": [24, 33]}
+    assert not (tmp_path / "models").exists()
+
+    manifest = ReadPlanManifestService(manifest_path=manifest_path).execute()
+    assert manifest.branch_name == "split/models"
+    [read_plan] = manifest.plans
+    assert read_plan.original_file == plan.original_file
+    assert read_plan.residual_file == plan.residual_file
+    assert [(file.path, file.render()) for file in read_plan.files] == [
+        (file.path, file.render()) for file in plan.files
+    ]
+
+
+def test_plan_manifest_stale_source(tmp_path):
+    _, manifest_path = _write_manifest(tmp_path)
+    with (tmp_path / "models.py").open(mode="a") as f:
+        f.write("\nnew_value = 1\n")
+
+    with pytest.raises(ReadPlanManifestService.StaleManifestError):
+        ReadPlanManifestService(manifest_path=manifest_path).execute()
@@ -0,0 +1,86 @@
+import shutil
+from pathlib import Path
+
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.sinks.staged_directory_sink import StagedDirectorySink
+
+
+def test_plan_split_service_does_not_touch_filesystem(tmp_path):
+    original_file_path = tmp_path / "models.py"
+    shutil.copy(Path("tests/samples/models.py"), original_file_path)
+    original_text = original_file_path.read_text()
+    original_file = LoadFileService(file_path=original_file_path).execute()
+
+    plan = PlanSplitService(original_file=original_file, target_block_types=["class", "function"]).execute()
+
+    assert original_file_path.read_text() == original_text
+    assert not (tmp_path / "models").exists()
+    assert plan.init_file.path == tmp_path / "models" / "__init__.py"
+    assert len(plan.moved_files) == 16
+    assert plan.moved_files[0].path == tmp_path / "models" / "klass_with_comment1.py"
+    assert plan.moved_files[0].render().endswith("class KlassWithComment1:\n    pass\n")
+    assert plan.init_file.render().endswith('    "function_with_decorator"\n]')
+
+
+def test_split_plan_write(tmp_path):
+    original_file_path = tmp_path / "models.py"
+    shutil.copy(Path("tests/samples/models.py"), original_file_path)
+    original_file = LoadFileService(file_path=original_file_path).execute()
+    plan = PlanSplitService(original_file=original_file, target_block_types=["class"]).execute()
+
+    sink = StagedDirectorySink(root_path=tmp_path)
+    plan.write(sink)
+    # Nothing is visible before the commit
+    assert original_file_path.exists()
+    assert not (tmp_path / "models").exists()
+    sink.commit()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["models"]
+    assert sorted(path.name for path in (tmp_path / "models").iterdir()) == sorted(
+        ["__init__.py", ".split-manifest.json", *[file.path.name for file in plan.moved_files]]
+    )
+    for file in plan.files:
+        assert file.path.read_text() == file.render()
+
+
+def test_plan_split_service_copies_conditional_imports():
+    source = (
+        b"import sys\n\n"
+        b"if sys.version_info >= (3, 11):\n    import tomllib\nelse:\n    import tomli as tomllib\n\n"
+        b"try:\n    import ujson as json\nexcept ImportError:\n    json = None\n\n\n"
+        b"def convert(text):\n    return json.dumps(tomllib.loads(text))\n"
+    )
+    original_file = LoadFileService(file_path=Path("pkg/models.py"), source_data=source).execute()
+
+    plan = PlanSplitService(original_file=original_file, target_block_types=["function"]).execute()
+
+    # The moved function binds the names as the original module did, instead of importing them from the package
+    assert plan.moved_files[0].render() == (
+        "import sys\n"
+        "if sys.version_info >= (3, 11):\n    import tomllib\nelse:\n    import tomli as tomllib\n"
+        "try:\n    import ujson as json\nexcept ImportError:\n    json = None\n\n\n"
+        "def convert(text):\n    return json.dumps(tomllib.loads(text))\n"
+    )
+    assert "json = None\n\nfrom pkg.models.convert import convert\n" in plan.init_file.render()
+
+
+def test_plan_split_service_names_modules_importable():
+    source = b"class And:\n    pass\n\n\ndef __init__(self):\n    pass\n"
+    original_file = LoadFileService(file_path=Path("pkg/models.py"), source_data=source).execute()
+
+    plan = PlanSplitService(original_file=original_file, target_block_types=["class", "function"]).execute()
+
+    assert [file.path for file in plan.moved_files] == [Path("pkg/models/and_.py"), Path("pkg/models/__init___.py")]
+    assert "from pkg.models.and_ import And\n" in plan.init_file.render()
+
+
+def test_plan_split_service_keeps_coding_cookie():
+    source = "# -*- coding: koi8-r -*-\n\n\ndef greet():\n    return 'привет'\n".encode("koi8-r")
+    original_file = LoadFileService(file_path=Path("pkg/models.py"), source_data=source).execute()
+
+    plan = PlanSplitService(original_file=original_file, target_block_types=["function"]).execute()
+
+    data = plan.moved_files[0].render_bytes()
+    assert data.startswith(b"# -*- coding: koi8-r -*-\n")
+    compile(data, "greet.py", "exec")
@@ -0,0 +1,114 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.services.load_file_service import LoadFileService
+from src.services.plan_split_service import PlanSplitService
+from src.services.resync_split_service import ResyncSplitService
+
+
+def _plan(tmp_path, text, **options):
+    (tmp_path / "models.py").write_text(text)
+    original_file = LoadFileService(file_path=tmp_path / "models.py").execute()
+    return PlanSplitService(original_file=original_file, target_block_types=["class", "function"], **options).execute()
+
+
+@pytest.mark.parametrize(
+    "old, new, changed_file_names, removed_file_names",
+    [
+        (
+            "def function_with_comment1(path: Path):",
+            "def function_with_comment1(path: Path, x=1):",
+            ["function_with_comment1.py"],
+            [],
+        ),
+        (
+            "class KlassWithMember:\n    value: StrAlias",
+            "class KlassWithMember:\n    value: int",
+            ["klass_with_member.py"],
+            [],
+        ),
+        # NOTE: The blank lines before a block belong to it
+        (
+            "def function_with_comment1(path: Path):\n    pass\n",
+            "",
+            ["function_with_comment2.py"],
+            ["function_with_comment1.py"],
+        ),
+        ("StrAlias = str", "OtherAlias = str", ["klass_with_member.py"], []),
+        ("import sys\n", "import sys\nimport re\n", [], []),
+    ],
+)
+def test_resync_split_service(tmp_path, old, new, changed_file_names, removed_file_names):
+    text = Path("tests/samples/models.py").read_text()
+    assert old in text
+    split_manifest = json.loads(_plan(tmp_path, text).split_manifest_file.render())
+    new_plan = _plan(tmp_path, text.replace(old, new))
+
+    resync_plan = ResyncSplitService(original_file=new_plan.original_file, split_manifest=split_manifest).execute()
+
+    assert [file.path.name for file in resync_plan.changed_files] == changed_file_names
+    assert [path.name for path in resync_plan.removed_paths] == removed_file_names
+    # The rewritten files are the same as those of a split from scratch
+    new_files = {file.path: file.render() for file in new_plan.files}
+    for file in resync_plan.files:
+        assert file.render() == new_files[file.path]
+
+
+@pytest.mark.parametrize(
+    "old, new, is_init_changed",
+    [
+        (
+            "def function_with_comment1(path: Path):\n    pass\n",
+            "def function_with_comment1(path: Path):\n    return 1\n",
+            False,
+        ),
+        ("def function_with_comment1(path: Path):\n    pass\n", "", True),
+    ],
+)
+def test_resync_split_service_init_file(tmp_path, old, new, is_init_changed):
+    text = Path("tests/samples/models.py").read_text()
+    split_manifest = json.loads(_plan(tmp_path, text).split_manifest_file.render())
+    new_plan = _plan(tmp_path, text.replace(old, new))
+
+    resync_plan = ResyncSplitService(original_file=new_plan.original_file, split_manifest=split_manifest).execute()
+
+    # __init__.py is only rewritten when the moved names change
+    init_file_path = tmp_path / "models" / "__init__.py"
+    assert (init_file_path in [file.path for file in resync_plan.files]) == is_init_changed
+    assert (resync_plan.init_file is not None) == is_init_changed
+
+
+def test_resync_split_service_value_sidecars(tmp_path):
+    def plan(text):
+        (tmp_path / "models.py").write_text(text)
+        original_file = LoadFileService(file_path=tmp_path / "models.py").execute()
+        return PlanSplitService(
+            original_file=original_file, target_block_types=["value"], value_sidecars=True
+        ).execute()
+
+    split_manifest = json.loads(plan('A = {"x": 1}\nB = [1]\n').split_manifest_file.render())
+    new_plan = plan('A = {"x": (1,)}\nB = [1]\nC = [2]\n')
+
+    resync_plan = ResyncSplitService(original_file=new_plan.original_file, split_manifest=split_manifest).execute()
+
+    # A is no longer plain JSON data, so it is defined by its module again
+    assert [file.path.name for file in resync_plan.changed_files] == ["A.py", "C.py", "C.json"]
+    assert [path.name for path in resync_plan.removed_paths] == ["A.json"]
+    new_files = {file.path: file.render() for file in new_plan.files}
+    for file in resync_plan.files:
+        assert file.render() == new_files[file.path]
+
+
+def test_resync_split_service_future_annotations(tmp_path):
+    text = "X = 1\n\n\nclass A:\n    def b(self) -> B:\n        return self.other\n\n\nclass B:\n    pass\n"
+    split_manifest = json.loads(_plan(tmp_path, text, type_checking_imports=True).split_manifest_file.render())
+    new_plan = _plan(tmp_path, "from __future__ import annotations\n\n" + text, type_checking_imports=True)
+
+    # The recorded uses of the unchanged blocks no longer hold: B is only needed by type checkers now
+    resync_plan = ResyncSplitService(original_file=new_plan.original_file, split_manifest=split_manifest).execute()
+
+    new_files = {file.path: file.render() for file in new_plan.files}
+    assert "if TYPE_CHECKING:\n" in new_files[tmp_path / "models" / "a.py"]
+    assert {file.path: file.render() for file in resync_plan.files} == new_files
@@ -0,0 +1,63 @@
+import sysconfig
+from pathlib import Path
+
+import pytest
+
+from src.services.load_file_service import LoadFileService
+from src.types.block_type import BlockType
+from src.types.loader_type import LoaderType
+
+SOURCES = [
+    "import os; import sys\nx = 1; y = 2\n",
+    "if True: a = 1; b = 2\nelse:\n    c = 3\nd = 4\n",
+    "try:\n    import ujson as json\nexcept ImportError:\n    import json\nfinally:\n    pass\n\nvalue = json\n",
+    "@decorator(a=1)\n# comment\n@other\nasync def f(x: int = 1) -> dict:\n    return {1: 2}\n    # trailing\n\nz = 1",
+    "x: int = 1\na[1:2] = 3\nb += 1\nc = lambda d=1: d\nprint(e == 1)\nf = \\\n    2\n",
+    'TABLE = {\n    "a": 1,\n    "b": [\n        2,\n    ],\n}\nmatch = 1\ntype = 2\n\n\nclass A: pass\n',
+    "def g():\n    '''doc'''\n\n\n\n'''\nmodule comment\n'''\n# comment\nclass B(\n    A,\n):\n    x = 1\n",
+    "",
+    "\n\n# only comments\n",
+    "a, b = 1, 2\n(c).d, e = f = 3\nx[0], y = 4\nz: int\n"
+    "T: typing.TypeAlias = int\nU: TypeAlias[int] = 1\ng = lambda h=1: h\n",
+    "if TYPE_CHECKING:\n    from a import B\ntry:\n    import ujson as json\nexcept ImportError:\n    json = None\n",
+    "if x: import a; import b\nif y:\n    import c\n    print(c)\nmatch z:\n    case 1:\n        pass\n",
+    "'doc'\nb'bytes'\nf'{x}'\n__all__ += ['a']\nwith a as b:\n    c = 1\n",
+]
+
+
+def _keys(file_path: Path, loader_type: LoaderType):
+    file = LoadFileService(file_path=file_path, loader_type=loader_type).execute()
+    return [(block.type, block.name, block.start, block.end) for block in file.blocks]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_tokenize_loader_matches_ast_loader(tmp_path, source):
+    file_path = tmp_path / "module.py"
+    file_path.write_text(source)
+    assert _keys(file_path, LoaderType.TOKENIZE) == _keys(file_path, LoaderType.AST)
+
+
+@pytest.mark.parametrize("name", ["ast.py", "dataclasses.py", "typing.py", "tokenize.py", "argparse.py"])
+def test_tokenize_loader_matches_ast_loader_on_stdlib(name):
+    file_path = Path(sysconfig.get_paths()["stdlib"]) / name
+    assert _keys(file_path, LoaderType.TOKENIZE) == _keys(file_path, LoaderType.AST)
+
+
+def test_tokenize_loader_matches_ast_loader_on_sample():
+    file_path = Path("tests/samples/models.py")
+    assert _keys(file_path, LoaderType.TOKENIZE) == _keys(file_path, LoaderType.AST)
+
+
+def test_auto_loader_falls_back_to_tokenize_loader(tmp_path):
+    # Syntax no interpreter can parse, but whose top-level statements can still be found
+    file_path = tmp_path / "module.py"
+    file_path.write_text("import os\n\n\nclass A:\n    x = ?!\n\n\ndef f():\n    pass\n")
+
+    with pytest.raises(LoadFileService.ParseError):
+        LoadFileService(file_path=file_path, loader_type=LoaderType.AST).execute()
+    file = LoadFileService(file_path=file_path, loader_type=LoaderType.AUTO).execute()
+    assert [(block.type, block.name) for block in file.blocks] == [
+        (BlockType.IMPORT, "other"),
+        (BlockType.CLASS, "A"),
+        (BlockType.FUNCTION, "f"),
+    ]
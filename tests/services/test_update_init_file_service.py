@@ -0,0 +1,59 @@
+SOURCE = """\
+from dataclasses import dataclass
+
+
+@dataclass
+class Base:
+    name: str
+
+
+class Child(Base):
+    pass
+
+
+def helper():
+    return Child("child")
+
+
+DEFAULT = Base("default")
+"""
+
+CHECK = """\
+import sys
+
+import lazypkg
+
+# Only the module of the name used by the remaining code is imported
+assert [name for name in sys.modules if name.startswith("lazypkg.")] == ["lazypkg.base"]
+assert "helper" in dir(lazypkg) and "Child" in lazypkg.__all__
+assert lazypkg.helper().name == "child"
+assert lazypkg.helper is sys.modules["lazypkg.helper"].helper
+lazy_modules = sorted(name for name in sys.modules if name.startswith("lazypkg."))
+assert lazy_modules == ["lazypkg.base", "lazypkg.child", "lazypkg.helper"]
+try:
+    lazypkg.missing
+except AttributeError:
+    pass
+else:
+    raise AssertionError("missing")
+"""
+
+
+def test_lazy_init_imports_moved_modules_on_first_access(split_package, import_check):
+    plan = split_package(SOURCE, "lazypkg", lazy_init=True)
+
+    init_text = plan.init_file.render()
+    # Base is used by the remaining code, so it is still imported eagerly
+    assert "from lazypkg.base import Base\n" in init_text
+    assert "if TYPE_CHECKING:\n    from lazypkg.child import Child\n" in init_text
+    assert '    "helper": "lazypkg.helper",\n' in init_text
+    import_check(CHECK)
+
+
+def test_eager_init_by_default(split_package, import_check):
+    plan = split_package(SOURCE, "lazypkg")
+
+    init_text = plan.init_file.render()
+    assert "__getattr__" not in init_text
+    assert "from lazypkg.helper import helper\n" in init_text
+    import_check("import sys, lazypkg; assert 'lazypkg.helper' in sys.modules")
@@ -0,0 +1,92 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from src.entities.block import Block
+from src.entities.file import File
+from src.entities.split_plan import SplitPlan
+from src.entities.verification_report import VerificationReport
+from src.services.apply_split_plans_service import ApplySplitPlansService
+from src.services.verify_split_plans_service import VerifySplitPlansService
+from src.sinks.memory_sink import MemorySink
+from src.types.block_type import BlockType
+
+SOURCE = """\
+def is_even(n):
+    return n == 0 or is_odd(n - 1)
+
+
+def is_odd(n):
+    return n != 0 and is_even(n - 1)
+
+
+def standalone():
+    return is_even(2)
+"""
+
+
+def test_verify_reports_circular_imports(tmp_path, split_package):
+    plan = split_package(SOURCE, "parity", write=False, target_block_types=["function"])
+
+    report = VerifySplitPlansService(plans=[plan], jobs=2).execute()
+
+    assert {check.module_name for check in report.failures} == {
+        "parity",
+        "parity.is_even",
+        "parity.is_odd",
+        "parity.standalone",
+    }
+    assert all(check.stage == "import" and check.is_cycle for check in report.failures)
+    assert "parity/is_odd.py: circular import" in report.format()
+    # Nothing is written to the working tree
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["parity.py"]
+
+
+def test_verify_writes_bytecode_of_grouped_modules(split_package):
+    plan = split_package(SOURCE, "parity", write=False, target_block_types=["function"], group=True)
+
+    report = VerifySplitPlansService(plans=[plan], write_bytecode=True, jobs=1).execute()
+
+    assert not report.failures
+    assert sorted(check.module_name for check in report.checks if check.stage == "import") == [
+        "parity",
+        "parity.is_even",
+        "parity.standalone",
+    ]
+    assert sorted(path.as_posix() for path in report.bytecode) == sorted(
+        importlib.util.cache_from_source(path)
+        for path in ["parity/__init__.py", "parity/is_even.py", "parity/standalone.py"]
+    )
+    assert all(data.startswith(importlib.util.MAGIC_NUMBER) for data in report.bytecode.values())
+
+
+def test_verify_reports_compile_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    broken_file = File(
+        path=Path("broken/__init__.py"),
+        blocks=[Block.from_lines(type=BlockType.FUNCTION, name="f", lines=["def f(:\n", "    pass\n"])],
+    )
+    plan = SplitPlan(
+        original_file=broken_file,
+        target_block_types=[],
+        residual_file=broken_file,
+        init_file=broken_file,
+        moved_files=[],
+    )
+
+    report = VerifySplitPlansService(plans=[plan]).execute()
+
+    assert [(check.module_name, check.stage) for check in report.failures] == [("broken", "compile")]
+
+
+def test_apply_stops_before_writing_when_verification_fails(split_package):
+    plan = split_package(SOURCE, "parity", write=False, target_block_types=["function"])
+    sink = MemorySink()
+
+    with pytest.raises(VerificationReport.VerificationError):
+        ApplySplitPlansService(
+            plans=[plan], git_commit=False, branch_name="split/parity", sink=sink, verify=True
+        ).execute()
+
+    assert not sink.files and not sink.removed_paths
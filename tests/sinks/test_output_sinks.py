@@ -0,0 +1,80 @@
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.sinks.archive_sink import ArchiveSink
+from src.sinks.memory_sink import MemorySink
+from src.sinks.staged_directory_sink import StagedDirectorySink
+
+
+def test_staged_directory_sink_commit(tmp_path):
+    (tmp_path / "models.py").write_text("class A:\n    pass\n")
+    sink = StagedDirectorySink(root_path=tmp_path)
+
+    sink.write(tmp_path / "models" / "a.py", b"class A:\n    pass\n")
+    sink.write(tmp_path / "models" / "__init__.py", b"from models.a import A\n")
+    sink.remove(tmp_path / "models.py")
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.startswith(".")) == ["models.py"]
+    sink.commit()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["models"]
+    assert (tmp_path / "models" / "a.py").read_bytes() == b"class A:\n    pass\n"
+    assert (tmp_path / "models" / "__init__.py").read_bytes() == b"from models.a import A\n"
+
+
+def test_staged_directory_sink_abort(tmp_path):
+    (tmp_path / "models.py").write_text("class A:\n    pass\n")
+    sink = StagedDirectorySink(root_path=tmp_path)
+
+    sink.write(tmp_path / "models" / "a.py", b"class A:\n    pass\n")
+    sink.remove(tmp_path / "models.py")
+    sink.abort()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["models.py"]
+
+
+def test_staged_directory_sink_skips_unchanged_content(tmp_path):
+    unchanged_path, changed_path = tmp_path / "unchanged.py", tmp_path / "changed.py"
+    for path in [unchanged_path, changed_path]:
+        path.write_bytes(b"x = 1\n")
+        os.utime(path, ns=(0, 0))
+    sink = StagedDirectorySink(root_path=tmp_path)
+
+    sink.write(unchanged_path, b"x = 1\n")
+    sink.write(changed_path, b"x = 2\n")
+    sink.commit()
+
+    assert unchanged_path.stat().st_mtime_ns == 0
+    assert changed_path.read_bytes() == b"x = 2\n"
+    assert changed_path.stat().st_mtime_ns != 0
+
+
+def test_memory_sink():
+    sink = MemorySink()
+    sink.write(Path("models/a.py"), b"class A:\n    pass\n")
+    sink.remove(Path("models.py"))
+
+    assert sink.files == {Path("models/a.py"): b"class A:\n    pass\n"}
+    assert sink.removed_paths == {Path("models.py")}
+
+
+@pytest.mark.parametrize("name", ["out.zip", "out.tar", "out.tar.gz"])
+def test_archive_sink(tmp_path, name):
+    archive_path = tmp_path / name
+    sink = ArchiveSink(archive_path=archive_path)
+    sink.write(Path("models/a.py"), b"class A:\n    pass\n")
+    sink.write(Path("models/__init__.py"), b"from models.a import A\n")
+    sink.remove(Path("models.py"))
+    assert not archive_path.exists()
+    sink.commit()
+
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            files = {name: archive.read(name) for name in archive.namelist()}
+    else:
+        with tarfile.open(archive_path) as archive:
+            files = {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+    assert files == {"models/a.py": b"class A:\n    pass\n", "models/__init__.py": b"from models.a import A\n"}
@@ -0,0 +1,42 @@
+import pytest
+
+from src.api import split_many, split_source
+
+SOURCE = "import os\n\n\nclass A:\n    pass\n\n\ndef f():\n    return A(), os.sep\n"
+
+
+def test_split_source_does_not_touch_the_filesystem(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    outputs = split_source(SOURCE, "pkg/models.py")
+
+    assert sorted(outputs) == [
+        "pkg/models/.split-manifest.json",
+        "pkg/models/__init__.py",
+        "pkg/models/a.py",
+        "pkg/models/f.py",
+    ]
+    assert outputs["pkg/models/f.py"] == "import os\nfrom pkg.models.a import A\n\n\ndef f():\n    return A(), os.sep\n"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_split_source_options():
+    outputs = split_source(SOURCE, "models.py", targets=["class"], lazy_init=True)
+    assert sorted(outputs) == ["models/.split-manifest.json", "models/__init__.py", "models/a.py"]
+    source = "# -*- coding: latin-1 -*-\nclass Caf\xe9:\n    name = '\xe9'\n".encode("latin-1")
+    assert "name = '\xe9'" in split_source(source, "models.py")["models/caf\xe9.py"]
+    with pytest.raises(ValueError):
+        split_source(SOURCE, "/abs/models.py")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_split_many(jobs):
+    items = (
+        (SOURCE.replace("class A", f"class A{number}").replace("A()", f"A{number}()"), f"m{number}.py")
+        for number in range(20)
+    )
+
+    results = list(split_many(items, jobs=jobs, targets=["class"]))
+
+    assert [module_path for module_path, _ in results] == [f"m{number}.py" for number in range(20)]
+    assert all(f"m{number}/a{number}.py" in outputs for number, (_, outputs) in enumerate(results))
@@ -0,0 +1,51 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.directory_splitter import DirectorySplitter
+
+SAMPLE_FILE_PATH = Path("tests/samples/models.py").resolve()
+
+
+def test_directory_splitter(tmp_path, monkeypatch):
+    for name in ["a/models.py", "a/b/models.py", "a/b/other.py"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(SAMPLE_FILE_PATH, tmp_path / name)
+    (tmp_path / "a" / "small.py").write_text("class Small:\n    pass\n")
+    (tmp_path / "a" / "__init__.py").touch()
+    monkeypatch.chdir(tmp_path)
+
+    splitter = DirectorySplitter(
+        dir_path=Path("a"), git_commit=False, target_block_types=["class"], jobs=2, min_lines=10
+    )
+    splitter.execute()
+
+    assert (tmp_path / "a" / "small.py").exists()
+    assert (tmp_path / "a" / "__init__.py").exists()
+    for name in ["a/models", "a/b/models", "a/b/other"]:
+        assert not (tmp_path / f"{name}.py").exists()
+        assert (
+            (tmp_path / name / "klass_with_member.py")
+            .read_text()
+            .startswith(f"from {name.replace('/', '.')} import StrAlias\n")
+        )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_directory_splitter_parse_errors(tmp_path, monkeypatch, jobs):
+    (tmp_path / "pkg").mkdir()
+    for name in ["a", "c"]:
+        shutil.copy(SAMPLE_FILE_PATH, tmp_path / "pkg" / f"{name}.py")
+    (tmp_path / "pkg" / "b.py").write_text("def broken(:\n    pass\n")
+    monkeypatch.chdir(tmp_path)
+
+    splitter = DirectorySplitter(dir_path=Path("pkg"), git_commit=False, target_block_types=["class"], jobs=jobs)
+    with pytest.raises(DirectorySplitter.UnparsedFilesError, match=r"1 of 3 files:\nError: Failed to parse 'pkg/b.py'"):
+        splitter.execute()
+
+    # The other files are split all the same
+    assert (tmp_path / "pkg" / "b.py").exists()
+    for name in ["a", "c"]:
+        assert not (tmp_path / "pkg" / f"{name}.py").exists()
+        assert (tmp_path / "pkg" / name / "__init__.py").exists()
@@ -0,0 +1,73 @@
+import shutil
+from pathlib import Path
+
+from src import instrumentation
+from src.code_splitter import CodeSplitter
+from src.directory_splitter import DirectorySplitter
+
+SAMPLE_FILE_PATH = Path("tests/samples/models.py").resolve()
+
+
+class ListSink(instrumentation.MetricsSink):
+    def __init__(self):
+        self.events = []
+
+    def record_span(self, name, seconds):
+        self.events.append(("span", name))
+
+    def record_count(self, name, value):
+        self.events.append(("count", name, value))
+
+
+def test_report_spans_and_counters(tmp_path, monkeypatch):
+    shutil.copy(SAMPLE_FILE_PATH, tmp_path / "models.py")
+    monkeypatch.chdir(tmp_path)
+
+    with instrumentation.collect() as report:
+        CodeSplitter(original_file_path=Path("models.py"), git_commit=False, target_block_types=["class"]).execute()
+
+    spans = report.to_dict()["spans"]
+    for name in ["CodeSplitter.execute", "CodeSplitter.plan", "CodeSplitter.apply", "LoadFileService.execute"]:
+        assert spans[name]["count"] == 1
+    assert spans["CodeSplitter.execute"]["seconds"] >= spans["CodeSplitter.plan"]["seconds"]
+    written = [path for path in Path("models").iterdir()]
+    assert report.counters["files_read"] == 1
+    assert report.counters["bytes_read"] == SAMPLE_FILE_PATH.stat().st_size
+    assert report.counters["files_written"] == len(written)
+    assert report.counters["bytes_written"] == sum(path.stat().st_size for path in written)
+    assert report.counters["files_removed"] == 1
+
+
+def test_custom_sink_and_worker_reports(tmp_path, monkeypatch):
+    for name in ["a/one.py", "a/two.py"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(SAMPLE_FILE_PATH, tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+
+    sink = ListSink()
+    with instrumentation.collect(sink), instrumentation.collect() as report:
+        DirectorySplitter(dir_path=Path("a"), git_commit=False, target_block_types=["class"], jobs=2).execute()
+
+    # The measurements of the worker processes are merged into the parent's sinks
+    assert report.spans["LoadFileService.execute"]["count"] == 2
+    assert report.counters["files_read"] == 2
+    assert ("span", "LoadFileService.execute") in sink.events
+    assert ("count", "files_read", 1) in sink.events
+    # Nothing is recorded outside collect()
+    instrumentation.count("files_read")
+    assert report.counters["files_read"] == 2
+
+
+def test_profile(tmp_path):
+    report = instrumentation.Report()
+    with instrumentation.collect(report), instrumentation.profile(tmp_path / "profile", report):
+        with instrumentation.span("step"):
+            sum(range(1000))
+
+    assert sorted(path.name for path in (tmp_path / "profile").iterdir()) == [
+        "profile.pstats",
+        "report.json",
+        "tracemalloc.snapshot",
+        "tracemalloc.txt",
+    ]
+    assert '"step"' in (tmp_path / "profile" / "report.json").read_text()
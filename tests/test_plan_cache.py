@@ -0,0 +1,50 @@
+import os
+import shutil
+from pathlib import Path
+
+from src.plan_cache import PlanCache
+from src.services.load_file_service import LoadFileService
+from src.services.plan_file_service import PlanFileService
+
+
+def test_plan_cache_key():
+    assert PlanCache.key(b"x = 1\n", "a.py") == PlanCache.key(b"x = 1\n", "a.py")
+    assert PlanCache.key(b"x = 1\n", "a.py") != PlanCache.key(b"x = 2\n", "a.py")
+    assert PlanCache.key(b"x = 1\n", "a.py") != PlanCache.key(b"x = 1\n", "b.py")
+
+
+def test_plan_cache_get_and_put(tmp_path):
+    cache = PlanCache(dir_path=tmp_path)
+    assert cache.get("missing") is None
+    cache.put("key", {"value": 1})
+    assert cache.get("key") == {"value": 1}
+    (tmp_path / "broken.pickle").write_bytes(b"broken")
+    assert cache.get("broken") is None
+
+
+def test_plan_cache_evict_least_recently_used(tmp_path):
+    cache = PlanCache(dir_path=tmp_path, max_bytes=2500)
+    for number, key in enumerate(["a", "b", "c"]):
+        cache.put(key, b"x" * 1000)
+        os.utime(tmp_path / f"{key}.pickle", ns=(number * 10**9, number * 10**9))
+    cache.get("a")
+
+    cache.evict()
+
+    assert sorted(path.stem for path in tmp_path.glob("*.pickle")) == ["a", "c"]
+
+
+def test_plan_file_service_warm_run_skips_parsing(tmp_path, monkeypatch):
+    file_path = tmp_path / "models.py"
+    shutil.copy(Path("tests/samples/models.py"), file_path)
+    cache = PlanCache(dir_path=tmp_path / "cache")
+    cold_plan = PlanFileService(file_path=file_path, target_block_types=["class"], cache=cache).execute()
+
+    def fail(self):
+        raise AssertionError("The file must not be parsed again")
+
+    monkeypatch.setattr(LoadFileService, "execute", fail)
+    warm_plan = PlanFileService(file_path=file_path, target_block_types=["class"], cache=cache).execute()
+
+    assert [file.render() for file in warm_plan.files] == [file.render() for file in cold_plan.files]
+    assert warm_plan.symbol_table == cold_plan.symbol_table
@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+from src.code_splitter import CodeSplitter
+from src.split_resyncer import SplitResyncer
+
+SAMPLE_FILE_PATH = Path("tests/samples/models.py").resolve()
+
+
+def test_split_resyncer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    text = SAMPLE_FILE_PATH.read_text()
+    Path("models.py").write_text(text)
+    CodeSplitter(original_file_path=Path("models.py"), git_commit=False, target_block_types=["class"]).execute()
+    for path in Path("models").iterdir():
+        os.utime(path, ns=(0, 0))
+
+    Path("models.py").write_text(
+        text.replace("class KlassWithComment1:\n    pass", "class KlassWithComment1:\n    x = 1")
+    )
+    SplitResyncer(original_file_path=Path("models.py"), git_commit=False).execute()
+
+    assert not Path("models.py").exists()
+    assert Path("models/klass_with_comment1.py").read_text().endswith("class KlassWithComment1:\n    x = 1\n")
+    touched_names = sorted(path.name for path in Path("models").iterdir() if path.stat().st_mtime_ns != 0)
+    assert touched_names == [".split-manifest.json", "klass_with_comment1.py"]
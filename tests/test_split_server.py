@@ -0,0 +1,129 @@
+import io
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src import instrumentation
+from src.plan_store import PlanStore
+from src.split_server import INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, SplitServer
+
+SOURCE = "import os\n\n\nclass A:\n    pass\n\n\ndef f():\n    return A()\n"
+
+
+def request(request_id, method, **params):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+
+
+@pytest.fixture
+def module_path(tmp_path, monkeypatch):
+    # NOTE: Paths are relative to the directory the server runs in
+    monkeypatch.chdir(tmp_path)
+    Path("models.py").write_text(SOURCE)
+    return Path("models.py")
+
+
+def test_plan_store_reuses_plans_until_the_content_changes(module_path):
+    store = PlanStore()
+    with instrumentation.collect() as report:
+        plan = store.get(module_path, target_block_types=["class", "function"])
+        assert store.get(module_path, target_block_types=["class", "function"]) is plan
+        # Touched but unchanged
+        module_path.write_text(SOURCE)
+        assert store.get(module_path, target_block_types=["class", "function"]) is plan
+        module_path.write_text(SOURCE + "\n\ndef g():\n    pass\n")
+        assert store.get(module_path, target_block_types=["class", "function"]) is not plan
+    assert report.counters["memory_cache_hits"] == 2
+    assert report.counters["memory_cache_misses"] == 2
+    assert len(store) == 1
+
+
+def test_plan_store_evicts_least_recently_used_plans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("a", "b", "c"):
+        Path(f"{name}.py").write_text(SOURCE)
+    store = PlanStore(max_bytes=1)
+    for name in ("a", "b", "c"):
+        store.get(Path(f"{name}.py"), target_block_types=["class"])
+    assert len(store) == 1
+    assert store.invalidate(Path("c.py")) == 1
+    assert len(store) == 0 and store.size == 0
+
+
+def test_split_server_handle(module_path):
+    server = SplitServer()
+
+    result = server.handle(request(1, "plan", path="models.py"))["result"]
+    paths = [file["path"] for file in result["files"]]
+    assert paths == [
+        "models/__init__.py",
+        "models/a.py",
+        "models/f.py",
+        "models/.split-manifest.json",
+    ]
+    assert result["moved_names"] == {"A": "models.a", "f": "models.f"}
+    assert server.handle(request(2, "stats"))["result"]["plans"] == 1
+    assert server.handle(request(3, "plan", path=1))["error"]["code"] == INVALID_PARAMS
+    assert server.handle(request(3, "invalidate", path=["models.py"]))["error"]["code"] == INVALID_PARAMS
+    assert server.handle(request(4, "frob"))["error"]["code"] == METHOD_NOT_FOUND
+    assert "does not exist" in server.handle(request(5, "plan", path="missing.py"))["error"]["message"]
+    # Notifications get no response
+    assert server.handle({"jsonrpc": "2.0", "method": "stats"}) is None
+
+    assert server.handle(request(6, "apply", path="models.py"))["result"] == {"files": paths, "branch": None}
+    assert sorted(path.as_posix() for path in Path("models").iterdir()) == sorted(paths)
+    assert not module_path.exists()
+    assert server.handle(request(7, "stats"))["result"]["plans"] == 0
+
+
+def test_split_server_serve_stdio(module_path):
+    lines = [json.dumps(request(index, "plan", path="models.py")) for index in range(8)]
+    lines += ["{not json", json.dumps(request(99, "shutdown")), json.dumps(request(100, "stats"))]
+    stdout = io.BytesIO()
+
+    SplitServer(workers=4).serve_stdio(io.BytesIO("\n".join(lines).encode("utf-8") + b"\n"), stdout)
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    # Answered as they complete. Nothing is read after the shutdown request
+    assert sorted(str(response["id"]) for response in responses) == sorted(
+        [str(index) for index in range(8)] + ["None", "99"]
+    )
+    assert next(response for response in responses if response["id"] is None)["error"]["code"] == PARSE_ERROR
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available")
+def test_split_server_serve_unix(module_path, tmp_path):
+    socket_path = tmp_path / "server.sock"
+    thread = threading.Thread(target=SplitServer().serve_unix, args=(socket_path,))
+    thread.start()
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        stream = client.makefile("rwb")
+        for message in (request(1, "plan", path="models.py"), request(2, "shutdown")):
+            stream.write(json.dumps(message).encode("utf-8") + b"\n")
+            stream.flush()
+        responses = [json.loads(stream.readline()) for _ in range(2)]
+    thread.join(timeout=10)
+
+    assert responses[0]["result"]["moved_names"] == {"A": "models.a", "f": "models.f"}
+    assert responses[1] == {"jsonrpc": "2.0", "id": 2, "result": None}
+    assert not thread.is_alive()
+    assert not socket_path.exists()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available")
+def test_split_server_serve_unix_keeps_other_files(tmp_path):
+    socket_path = tmp_path / "server.sock"
+    socket_path.write_text("not a socket")
+
+    with pytest.raises(SplitServer.SocketPathError, match="is not a socket"):
+        SplitServer().serve_unix(socket_path)
+    assert socket_path.read_text() == "not a socket"
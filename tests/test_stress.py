@@ -0,0 +1,36 @@
+import ast
+import json.decoder
+from pathlib import Path
+
+from benchmarks.stress import check_file, find_files, public_names
+from src.types.loader_type import LoaderType
+
+SAMPLE_PATH = Path(__file__).parent / "samples" / "models.py"
+
+
+def test_find_files_deduplicates_overlapping_roots():
+    samples_path = SAMPLE_PATH.parent
+
+    assert find_files([samples_path, SAMPLE_PATH]) == find_files([samples_path])
+    assert SAMPLE_PATH in find_files([samples_path])
+
+
+def test_check_file():
+    for path in [SAMPLE_PATH, Path(json.decoder.__file__)]:
+        for loader_type in [LoaderType.AST, LoaderType.TOKENIZE]:
+            result = check_file(path, loader_type, ["class", "function"])
+
+            assert result["error"] is None
+            assert result["skipped"] is None
+            assert result["bytes"] == path.stat().st_size
+
+
+def test_public_names():
+    tree = ast.parse(
+        "import os.path\nfrom typing import Any as _Any\n"
+        "try:\n    import ujson as json\nexcept ImportError:\n    json = None\n"
+        "a, (b, *c) = 1, (2, 3)\nd: int\ne: int = 0\n_f = 0\n"
+        "class G:\n    h = 0\n"
+    )
+
+    assert public_names(tree.body) == {"os", "json", "a", "b", "c", "e", "G"}